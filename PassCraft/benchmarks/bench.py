@@ -0,0 +1,272 @@
+"""
+PassCraft Benchmarks
+Measures generation throughput, time to first candidate, memory and output speed
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from passcraft.engine import DEFAULT_ARITY, CandidateEngine, parse_profile
+from passcraft.leet import LeetExpander
+from passcraft.rules import parse_rules
+from passcraft.sinks import FileSink
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+# Relative change beyond which a metric counts as a regression
+DEFAULT_THRESHOLD = 0.10
+
+# Synthetic profiles, from the four-field example up to long extended ones
+PROFILES = {
+    'example': ("John Smith", "1990-05-15", "New York", "123-456-7890"),
+    'long': ("Maria Elena Garcia Lopez", "1985-12-03", "San Francisco", "+1 (415) 555-0199"),
+    'sparse': ("Alice", "", "", ""),
+    # Fifteen extra typed fields, as in a well-researched profile
+    'fields': ("John Smith", "1990-05-15", "New York", "123-456-7890", {
+        'pet': "Rex", 'partner': "Ann Marie", 'child': ["Emma", "Liam"], 'mother': "Linda",
+        'father': "Robert", 'nickname': "Johnny", 'hobby': "rock climbing", 'employer': "Acme Corp",
+        'team': "Red Sox", 'school': "Lincoln High", 'street': "Elm Street", 'favorite_number': 7,
+        'house_number': 42, 'anniversary': "2015-06-20", 'hometown': "Boston",
+    }),
+}
+
+
+def suffix_rules() -> List[str]:
+    """Two-digit suffix rules, like a large suffix list"""
+    return [f"${a} ${b}" for a in "0123456789" for b in "0123456789"]
+
+
+def mixed_rules() -> List[str]:
+    """A rule file in the style of best64: case, affixes, leet and reordering"""
+    rules = [":", "l", "u", "c", "C", "t", "r", "d", "f", "{", "}", "[", "]", "k", "K", "q"]
+    rules += [f"${ch}" for ch in "!@#$%&*123"]
+    rules += [f"^{ch}" for ch in "!@#1"]
+    rules += [f"c ${ch}" for ch in "!1234567890"]
+    rules += [f"s{a}{b}" for a, b in ["a@", "a4", "e3", "i1", "i!", "o0", "s$", "s5", "t7", "g9"]]
+    rules += ["<8 u", "<8 c $1", ">5 ]", "T0", "T0 T1", "i3_", "o0X", "D2", "x04", "$2 $0 $2 $4"]
+    return rules
+
+
+# Case name -> (profile, engine options, order)
+CASES = {
+    'example': ('example', {}, 'stream'),
+    'example-likely': ('example', {}, 'likely'),
+    'long': ('long', {}, 'stream'),
+    'sparse': ('sparse', {}, 'stream'),
+    'extended-leet': ('long', {'patterns': 'extended', 'leet': {'per_word': None, 'total': None}}, 'stream'),
+    'extended-mixed-rules': ('long', {'patterns': 'extended', 'rules': 'mixed'}, 'stream'),
+    'suffix-100': ('long', {'rules': 'suffix'}, 'stream'),
+    'mixed-rules': ('long', {'rules': 'mixed'}, 'stream'),
+    'mixed-rules-likely': ('example', {'rules': 'mixed'}, 'likely'),
+    'no-dedup': ('long', {'rules': 'mixed', 'dedup': False}, 'stream'),
+    'fields-arity-3': ('fields', {'arity': 3, 'dedup': False}, 'stream'),
+}
+
+RULE_SETS = {'suffix': suffix_rules, 'mixed': mixed_rules}
+
+
+def build_engine(options: dict) -> CandidateEngine:
+    """Create the engine a case describes"""
+    rules = None
+    if 'leet' in options:
+        rules = LeetExpander(**options['leet'])
+    elif 'rules' in options:
+        rules = parse_rules(RULE_SETS[options['rules']]())
+    return CandidateEngine(dedup=options.get('dedup', True), patterns=options.get('patterns', 'standard'),
+                           rules=rules, arity=options.get('arity', DEFAULT_ARITY))
+
+
+def iter_case(name: str):
+    """Build the engine from scratch and return the case's candidate stream"""
+    profile, options, order = CASES[name]
+    engine = build_engine(options)
+    data = parse_profile(*PROFILES[profile])
+    return engine.iter_likely(data) if order == 'likely' else engine.iter_candidates(data)
+
+
+def measure_generation(name: str) -> dict:
+    """Candidates per second and time to the first candidate"""
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for _ in iter_case(name):
+        count += 1
+        if first is None:
+            first = time.perf_counter() - start
+    seconds = time.perf_counter() - start
+    return {
+        'candidates': count,
+        'seconds': round(seconds, 4),
+        'candidates_per_sec': int(count / seconds) if seconds else 0,
+        'first_candidate_ms': round((first or 0.0) * 1000, 3),
+    }
+
+
+def measure_output(name: str) -> dict:
+    """Bytes per second written to a raw wordlist"""
+    with tempfile.TemporaryDirectory(prefix='passcraft-bench-') as directory:
+        report = FileSink(os.path.join(directory, 'out.txt'), header=False).consume(iter_case(name))
+    return {'output_bytes': report['bytes'], 'output_bytes_per_sec': report['bytes_per_sec']}
+
+
+def measure_memory(name: str) -> dict:
+    """Peak traced Python allocations while generating"""
+    tracemalloc.start()
+    try:
+        for _ in iter_case(name):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'tracemalloc_peak_kb': peak // 1024}
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Peak resident set size of this process"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_case(name: str, repeat: int = 5) -> dict:
+    """Measure one case in this process, keeping the fastest of several runs"""
+    runs = [measure_generation(name) for _ in range(repeat)]
+    result = min(runs, key=lambda run: run['seconds'])
+    result['first_candidate_ms'] = min(run['first_candidate_ms'] for run in runs)
+    # Peak RSS is read before the output and tracing passes can raise it
+    result['peak_rss_kb'] = peak_rss_kb()
+    output = [measure_output(name) for _ in range(repeat)]
+    result.update(max(output, key=lambda run: run['output_bytes_per_sec']))
+    result.update(measure_memory(name))
+    return result
+
+
+def run_isolated(name: str, repeat: int) -> dict:
+    """Run a case in a fresh interpreter so peak RSS belongs to that case alone"""
+    command = [sys.executable, os.path.abspath(__file__), '--case', name, '--repeat', str(repeat), '--json']
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def git_commit() -> Optional[str]:
+    """Current commit of the repository, if available"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], check=True, capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def baseline_path(name: str) -> str:
+    """Path of a named baseline"""
+    return name if name.endswith('.json') else os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Print changes against a baseline and return the regressions"""
+    # Metric -> True when higher is better
+    metrics = {
+        'candidates_per_sec': True,
+        'first_candidate_ms': False,
+        'output_bytes_per_sec': True,
+        'peak_rss_kb': False,
+        'tracemalloc_peak_kb': False,
+    }
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"   {name}: no baseline", file=sys.stderr)
+            continue
+        if old['candidates'] != result['candidates']:
+            print(f"⚠️  {name}: candidate count changed {old['candidates']} -> {result['candidates']}",
+                  file=sys.stderr)
+        for metric, higher_is_better in metrics.items():
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            flag = "❌" if worse > threshold else "  "
+            print(f"{flag} {name:20} {metric:22} {before:>12} -> {after:>12} ({change:+.1%})", file=sys.stderr)
+            if worse > threshold:
+                regressions.append(f"{name} {metric}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Benchmark entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark PassCraft candidate generation')
+    parser.add_argument('--case', action='append', choices=sorted(CASES),
+                        help='case to run (repeatable, default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement, fastest kept (default: 5)')
+    parser.add_argument('--json', action='store_true', help='print raw JSON results')
+    parser.add_argument('--save', metavar='NAME', help='save results as a baseline')
+    parser.add_argument('--compare', metavar='NAME', help='compare results with a saved baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative change reported as a regression (default: 0.10)')
+    args = parser.parse_args(argv)
+
+    names = args.case or list(CASES)
+    if args.json and len(names) == 1:
+        # Single case mode, used for isolated runs
+        print(json.dumps(run_case(names[0], args.repeat)))
+        return 0
+
+    results = {}
+    for name in names:
+        result = run_isolated(name, args.repeat)
+        results[name] = result
+        if not args.json:
+            print(f"⏱️  {name:20} {result['candidates']:>9} candidates  "
+                  f"{result['candidates_per_sec']:>9}/s  first {result['first_candidate_ms']:>7} ms  "
+                  f"RSS {result['peak_rss_kb']} KB  traced {result['tracemalloc_peak_kb']} KB  "
+                  f"{result['output_bytes_per_sec'] / 1e6:.1f} MB/s", file=sys.stderr)
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        document = {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'results': results,
+        }
+        with open(baseline_path(args.save), 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        print(f"💾 Baseline saved to: {baseline_path(args.save)}", file=sys.stderr)
+
+    if args.compare:
+        with open(baseline_path(args.compare), 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"📊 Compared with {args.compare} (commit {baseline.get('commit')}):", file=sys.stderr)
+        regressions = compare(results, baseline['results'], args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regressions", file=sys.stderr)
+            return 1
+        print("✅ No regressions", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+"""
+PassCraft - password candidate generation from personal information
+"""
+
+from .engine import (
+    CandidateEngine,
+    Plan,
+    parse_profile,
+    write_candidates,
+)
+
+__all__ = [
+    'CandidateEngine',
+    'Plan',
+    'parse_profile',
+    'write_candidates',
+]
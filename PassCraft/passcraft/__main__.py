@@ -0,0 +1,7 @@
+"""Allow running the command line with python -m passcraft"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+PassCraft Audit Mode
+Checks candidates against a local hash list so only matched accounts are ever written
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Collection, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Candidates handed to a worker at a time; salted hashes cost thousands of
+# digest rounds per candidate, so their blocks are smaller to keep workers busy
+AUDIT_CHUNK = 4096
+SALTED_CHUNK = 64
+
+# Unsalted digests by hex length
+HEX_LENGTHS = {32: 'md5', 40: 'sha1', 64: 'sha256'}
+
+HASHERS = {
+    'md5': hashlib.md5,
+    'sha1': hashlib.sha1,
+    'sha256': hashlib.sha256,
+}
+
+# Hash list shared by every task of a worker process
+_hashes = None
+
+
+class SaltedHash(NamedTuple):
+    """A PBKDF2 hash with its own salt and iteration count"""
+    account: str
+    digest: str
+    iterations: int
+    salt: bytes
+    key: bytes
+
+
+def ab64_decode(text: str) -> bytes:
+    """Decode passlib's adapted base64, which uses '.' for '+' and drops padding"""
+    text = text.replace('.', '+')
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+def parse_hash(text: str, account: str):
+    """Parse one hash as an (algorithm, digest) pair or a SaltedHash"""
+    if text.startswith('pbkdf2_'):
+        # Django: pbkdf2_sha256$iterations$salt$base64 key
+        scheme, iterations, salt, key = text.split('$')
+        digest = scheme[len('pbkdf2_'):]
+        return SaltedHash(account, digest, int(iterations), salt.encode('utf-8'), base64.b64decode(key))
+    if text.startswith('$pbkdf2'):
+        # passlib: $pbkdf2-sha256$iterations$ab64 salt$ab64 key, plain $pbkdf2$ being SHA-1
+        _, scheme, iterations, salt, key = text.split('$')
+        digest = scheme.partition('-')[2] or 'sha1'
+        return SaltedHash(account, digest, int(iterations), ab64_decode(salt), ab64_decode(key))
+    algorithm = HEX_LENGTHS.get(len(text))
+    if algorithm is None:
+        raise ValueError(f"unrecognized hash {text!r}")
+    return algorithm, bytes.fromhex(text)
+
+
+class HashList:
+    """Unsalted digests indexed for lookup, plus salted hashes checked one by one"""
+
+    def __init__(self):
+        self.unsalted: Dict[str, Dict[bytes, List[str]]] = {}
+        self.salted: List[SaltedHash] = []
+        self.accounts: set = set()
+        self.skipped: List[str] = []
+
+    def add(self, text: str, account: str):
+        """Add a hash for an account"""
+        parsed = parse_hash(text, account)
+        if isinstance(parsed, SaltedHash):
+            if parsed.digest not in hashlib.algorithms_available:
+                raise ValueError(f"unsupported PBKDF2 digest {parsed.digest!r}")
+            self.salted.append(parsed)
+        else:
+            algorithm, digest = parsed
+            self.unsalted.setdefault(algorithm, {}).setdefault(digest, []).append(account)
+        self.accounts.add(account)
+
+    def verify(self, candidates: List[str], found: Collection[str] = ()) -> List[Tuple[str, str, str]]:
+        """Return (account, scheme, candidate) for every candidate matching a hash
+
+        Salted hashes of accounts in `found`, or matched earlier in the block,
+        are not checked again; unsalted lookups cost too little to bother.
+        """
+        matches = []
+        tables = [(name, HASHERS[name], table) for name, table in self.unsalted.items()]
+        salted = [entry for entry in self.salted if entry.account not in found]
+        pbkdf2 = hashlib.pbkdf2_hmac
+        for word in candidates:
+            data = word.encode('utf-8', 'surrogatepass')
+            matched = len(matches)
+            for name, hasher, table in tables:
+                accounts = table.get(hasher(data).digest())
+                if accounts:
+                    matches.extend((account, name, word) for account in accounts)
+            for entry in salted:
+                key = pbkdf2(entry.digest, data, entry.salt, entry.iterations, len(entry.key))
+                if hmac.compare_digest(key, entry.key):
+                    matches.append((entry.account, f"pbkdf2-{entry.digest}", word))
+            if salted and len(matches) > matched:
+                accounts = {match[0] for match in matches[matched:]}
+                salted = [entry for entry in salted if entry.account not in accounts]
+        return matches
+
+
+def parse_hashes(lines: Iterable[str]) -> HashList:
+    """Read 'account:hash' lines (or bare hashes), skipping blanks, comments and unknown formats"""
+    hashes = HashList()
+    for number, line in enumerate(lines, 1):
+        text = line.strip()
+        if not text or text.startswith('#'):
+            continue
+        account, separator, value = text.rpartition(':')
+        if not separator:
+            account = f"line {number}"
+        try:
+            hashes.add(value.strip(), account)
+        except (ValueError, binascii.Error):
+            hashes.skipped.append(text)
+    return hashes
+
+
+def load_hashes(path: str) -> HashList:
+    """Load a local hash file exported for an audit"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return parse_hashes(f)
+
+
+def _init_worker(hashes: HashList):
+    """Keep the hash list for every block this worker verifies"""
+    global _hashes
+    _hashes = hashes
+
+
+def _verify_block(block: List[str], found: Collection[str] = ()) -> List[Tuple[str, str, str]]:
+    """Verify a block of candidates inside a worker"""
+    return _hashes.verify(block, found)
+
+
+def iter_blocks(candidates: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Group a candidate stream into lists of `size`"""
+    iterator = iter(candidates)
+    while True:
+        block = list(islice(iterator, size))
+        if not block:
+            return
+        yield block
+
+
+class Auditor:
+    """Streams candidates into hash verifiers across a pool of worker processes"""
+
+    def __init__(self, hashes: HashList, workers: Optional[int] = None, chunk: Optional[int] = None):
+        self.hashes = hashes
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk = chunk or (SALTED_CHUNK if hashes.salted else AUDIT_CHUNK)
+        self.count = 0
+        self.seconds = 0.0
+        self.found: set = set()
+        self._salted_accounts = {entry.account for entry in hashes.salted}
+
+    def iter_matches(self, candidates: Iterable[str]) -> Iterator[Tuple[str, str, str]]:
+        """Yield (account, scheme, candidate) matches, stopping once every account is found"""
+        start = time.perf_counter()
+        try:
+            if self.workers == 1:
+                for block in iter_blocks(candidates, self.chunk):
+                    self.count += len(block)
+                    yield from self._accept(self.hashes.verify(block, self.found))
+                    if self.done:
+                        return
+                return
+            yield from self._iter_pooled(candidates)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def _iter_pooled(self, candidates: Iterable[str]) -> Iterator[Tuple[str, str, str]]:
+        # A bounded window of blocks in flight keeps memory flat however long the stream
+        window = self.workers * 2
+        pending = deque()
+        executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                       initargs=(self.hashes,))
+        try:
+            for block in iter_blocks(candidates, self.chunk):
+                self.count += len(block)
+                # Accounts matched so far go with each block so workers stop
+                # paying for their salted hashes; blocks already in flight
+                # still check them
+                found = self.found & self._salted_accounts
+                pending.append(executor.submit(_verify_block, block, found))
+                if len(pending) >= window:
+                    yield from self._accept(pending.popleft().result())
+                    if self.done:
+                        return
+            while pending:
+                yield from self._accept(pending.popleft().result())
+                if self.done:
+                    return
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _accept(self, matches: List[Tuple[str, str, str]]) -> Iterator[Tuple[str, str, str]]:
+        # An account is reported once, even if several candidates or schemes match it
+        for match in matches:
+            if match[0] not in self.found:
+                self.found.add(match[0])
+                yield match
+
+    @property
+    def done(self) -> bool:
+        """Whether every account in the hash list has been matched"""
+        return len(self.found) >= len(self.hashes.accounts)
+
+    def report(self) -> dict:
+        """Candidates checked, accounts matched and throughput"""
+        return {
+            'count': self.count,
+            'accounts': len(self.hashes.accounts),
+            'matched': len(self.found),
+            'seconds': round(self.seconds, 4),
+            'per_sec': int(self.count / self.seconds) if self.seconds else 0,
+        }
@@ -0,0 +1,155 @@
+"""
+PassCraft Batch Mode
+Generates one wordlist per profile across a pool of worker processes
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from .engine import DEFAULT_ARITY, CandidateEngine
+from .profiles import ProfileParser
+from .rules import load_rules
+from .sinks import COMPRESSORS, FileSink
+from .templates import load_templates
+
+# Engine and output compression shared by every task of a worker process
+_engine = None
+_compression = None
+
+
+def load_profiles(path: str) -> Iterator[dict]:
+    """Read profiles from a CSV or JSONL file"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.lower().endswith(('.jsonl', '.json', '.ndjson')):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+def target_filename(index: int, profile: dict) -> str:
+    """Build a unique, filesystem-safe wordlist name for a profile"""
+    label = str(profile.get('id') or profile.get('name') or 'target')
+    slug = re.sub(r'[^a-z0-9]+', '_', label.lower()).strip('_') or 'target'
+    return f"{index:05d}_{slug}.txt"
+
+
+def _init_worker(dedup: bool, rules_path: Optional[str], compression: Optional[str],
+                 templates_path: Optional[str] = None, arity: int = DEFAULT_ARITY):
+    """Create the per-process engine once, compiling rules and templates a single time"""
+    global _engine, _compression
+    _compression = compression
+    rules = load_rules(rules_path) if rules_path else None
+    templates = load_templates(templates_path) if templates_path else None
+    _engine = CandidateEngine(dedup=dedup, rules=rules, templates=templates, arity=arity)
+
+
+def generate_target(task: tuple) -> dict:
+    """Generate the wordlist of a single parsed profile inside a worker"""
+    index, profile, data, output_dir = task
+    filename = target_filename(index, profile)
+    if _compression:
+        filename += COMPRESSORS[_compression][1]
+    path = os.path.join(output_dir, filename)
+    start = time.perf_counter()
+
+    report = FileSink(path, _compression, header=False).consume(_engine.iter_candidates(data))
+
+    return {
+        'index': index,
+        'id': profile.get('id', ''),
+        'name': profile.get('name', ''),
+        'file': filename,
+        'count': report['count'],
+        'bytes': report['disk_bytes'],
+        'seconds': round(time.perf_counter() - start, 4),
+    }
+
+
+def run_batch(profiles_path: str, output_dir: str, workers: Optional[int] = None,
+              chunksize: int = 8, dedup: bool = True, rules_path: Optional[str] = None,
+              compression: Optional[str] = None, templates_path: Optional[str] = None,
+              arity: int = DEFAULT_ARITY) -> dict:
+    """Generate wordlists for every profile and write a manifest"""
+    if templates_path:
+        # Fail before starting workers if the template file does not compile
+        load_templates(templates_path)
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+
+    # Profiles are parsed here in one pass, so date formats are detected once per
+    # column and repeated values are parsed once for the whole file; columns beyond
+    # the core fields and id are typed fields, such as pet or team:text
+    parser = ProfileParser()
+    tasks = ((index, profile, data, output_dir)
+             for index, (profile, data) in enumerate(parser.parse_all(load_profiles(profiles_path)), 1))
+
+    targets: List[dict] = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(dedup, rules_path, compression, templates_path, arity)) as executor:
+        for entry in executor.map(generate_target, tasks, chunksize=chunksize):
+            targets.append(entry)
+
+    manifest = {
+        'generated_on': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'source': os.path.abspath(profiles_path),
+        'workers': workers or os.cpu_count(),
+        'chunksize': chunksize,
+        'dedup': dedup,
+        'rules': os.path.abspath(rules_path) if rules_path else None,
+        'compression': compression,
+        'templates': os.path.abspath(templates_path) if templates_path else None,
+        'arity': arity,
+        'parsing': parser.report(),
+        'targets': len(targets),
+        'total_passwords': sum(entry['count'] for entry in targets),
+        'seconds': round(time.perf_counter() - start, 4),
+        'files': targets,
+    }
+    with open(os.path.join(output_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point for batch generation"""
+    parser = argparse.ArgumentParser(
+        prog='passcraft.batch',
+        description='Generate one wordlist per profile from a CSV or JSONL file.')
+    parser.add_argument('profiles', help='CSV or JSONL file with name, dob, city, phone, optional id and other fields')
+    parser.add_argument('-o', '--output-dir', default='wordlists', help='directory for wordlists and manifest.json')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('-c', '--chunksize', type=int, default=8, help='profiles handed to a worker at a time')
+    parser.add_argument('--no-dedup', action='store_true', help='keep duplicate candidates')
+    parser.add_argument('-r', '--rules', metavar='FILE', help='hashcat/John rule file for the variation stage')
+    parser.add_argument('--compress', choices=sorted(COMPRESSORS), help='compress every wordlist')
+    parser.add_argument('-t', '--templates', metavar='FILE', help='template file replacing the combination patterns')
+    parser.add_argument('--arity', type=int, default=DEFAULT_ARITY, metavar='N',
+                        help=f'most fields joined into one candidate (default: {DEFAULT_ARITY})')
+    args = parser.parse_args(argv)
+
+    manifest = run_batch(args.profiles, args.output_dir, workers=args.workers,
+                         chunksize=args.chunksize, dedup=not args.no_dedup,
+                         rules_path=args.rules, compression=args.compress,
+                         templates_path=args.templates, arity=args.arity)
+
+    print(f"✅ Generated {manifest['total_passwords']} passwords for "
+          f"{manifest['targets']} targets in {manifest['seconds']}s")
+    issues = manifest['parsing']['issue_count']
+    if issues:
+        print(f"⚠️  {issues} profile entries could not be parsed, see 'parsing' in the manifest")
+    print(f"📁 Manifest: {os.path.join(args.output_dir, 'manifest.json')}")
+
+
+if __name__ == "__main__":
+    main()
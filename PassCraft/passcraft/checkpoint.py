@@ -0,0 +1,85 @@
+"""
+PassCraft Checkpoints
+Records how far the flushed output reaches so an interrupted run can resume
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, Iterator, Optional
+
+# Candidates written between checkpoint saves
+CHECKPOINT_EVERY = 100000
+
+
+def run_key(settings: dict) -> str:
+    """Fingerprint of the profile and options a checkpoint belongs to"""
+    encoded = json.dumps(settings, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class Checkpoint:
+    """A small JSON file holding the base word a run has reached and how many of its candidates are written"""
+
+    def __init__(self, path: str, key: str):
+        self.path = path
+        self.key = key
+
+    def load(self) -> Optional[dict]:
+        """Return the saved state if it belongs to this run"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('key') != self.key:
+            return None
+        return state
+
+    def save(self, position: int, done: bool = False, skip: int = 0, sizes: Optional[Dict[str, int]] = None):
+        """Write the position atomically so a crash never leaves a torn file"""
+        temp = self.path + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump({'key': self.key, 'position': position, 'skip': skip, 'done': done, 'sizes': sizes or {}}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
+
+def iter_checkpointed(candidates: Iterable[str], engine, sink, checkpoint: Checkpoint, end: int,
+                      every: int = CHECKPOINT_EVERY, skipped: int = 0) -> Iterator[str]:
+    """Pass candidates through, marking the sink and saving the position regularly
+
+    A checkpoint names the base word being expanded, how many of its
+    candidates are already written and how large each output file was at that
+    point. A resumed run cuts the files back to those sizes, dropping whatever
+    an interruption let through after the checkpoint, then skips the written
+    candidates and starts with the next one. Deduplication does not carry
+    across a resume: the resumed run starts with an empty set and can write
+    again a candidate the interrupted run already wrote. `skipped` is the
+    number of candidates of the first base word the resumed stream has left out.
+    """
+    # A candidate handed to the sink is written before the next one is asked
+    # for, and engine.position stays on a base word until all of its
+    # variations have been asked for, so after a flush every base word before
+    # position is on disk along with `in_word` candidates of position itself
+    position = engine.position
+    in_word = skipped
+    written = 0
+    deduplicator = engine.deduplicator
+    for word in candidates:
+        if engine.position != position:
+            position = engine.position
+            in_word = 0
+        yield word
+        in_word += 1
+        written += 1
+        if written % every == 0 and not deduplicator.deferring:
+            # Candidates a spilled dedup holds back for the end belong to base
+            # words before position, so the checkpoint stays put until they are out
+            checkpoint.save(position, skip=in_word, sizes=sink.mark())
+    # The stream can also stop early, for example at a --limit
+    if engine.position >= end:
+        sink.flush()
+        checkpoint.save(engine.position, done=True)
+    elif not deduplicator.deferring:
+        checkpoint.save(position, skip=in_word, sizes=sink.mark())
@@ -0,0 +1,424 @@
+"""
+PassCraft Command Line
+Non-interactive generation from flags or a JSON profile on stdin
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .audit import Auditor, HashList, load_hashes
+from .checkpoint import Checkpoint, iter_checkpointed, run_key
+from .compact import CompactSet
+from .engine import DEFAULT_ARITY, FIELD_TYPES, PATTERN_SETS, CandidateEngine, parse_profile, profile_fields
+from .leet import LeetExpander
+from .oracle import MembershipOracle
+from .policy import CLASS_NAMES, Policy, parse_require
+from .rules import load_rules
+from .sinks import COMPRESSORS, STREAM_BUFFER, StreamSink, open_sink, parse_size
+from .stats import RunStats
+from .templates import TemplateError, load_templates
+
+PROFILE_FIELDS = ['name', 'dob', 'city', 'phone']
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the command line"""
+    parser = argparse.ArgumentParser(
+        prog='passcraft',
+        description='Generate a password wordlist from personal information. '
+                    'For many profiles at once use: python -m passcraft.batch')
+    parser.add_argument('--name', help='full name')
+    parser.add_argument('--dob', help="date of birth (YYYY-MM-DD, DD-MM-YYYY, MM/DD/YYYY, ...) or a range: "
+                                      "1990, 1985-1990, 1990-05, 'age 30-35' or DATE..DATE")
+    parser.add_argument('--city', help='city')
+    parser.add_argument('--phone', help='phone number')
+    parser.add_argument('--field', action='append', default=[], metavar='NAME[:TYPE]=VALUE',
+                        help=f"any other profile field, repeatable, e.g. pet=Rex or team:text='Red Sox' "
+                             f"(types: {', '.join(FIELD_TYPES)})")
+    parser.add_argument('--arity', type=int, default=DEFAULT_ARITY, metavar='N',
+                        help=f'most fields joined into one candidate (default: {DEFAULT_ARITY})')
+    parser.add_argument('--stdin', action='store_true',
+                        help='read a JSON object with name, dob, city, phone and other fields from stdin')
+    parser.add_argument('-o', '--output', help='output file (default: stdout)')
+    parser.add_argument('--compress', choices=sorted(COMPRESSORS),
+                        help='compress the output (also inferred from a .gz/.bz2/.xz name)')
+    parser.add_argument('--raw', action='store_true', help='write candidates only, without the comment header')
+    shards = parser.add_mutually_exclusive_group()
+    shards.add_argument('--shards', type=int, metavar='N', help='deal candidates round-robin into N files')
+    shards.add_argument('--shard-bytes', metavar='SIZE', help='start a new file every SIZE bytes (e.g. 512M)')
+    shards.add_argument('--shard-by-length', action='store_true', help='write one file per candidate length')
+    parser.add_argument('-p', '--patterns', choices=sorted(PATTERN_SETS), default='standard',
+                        help='pattern set to generate from')
+    parser.add_argument('-t', '--templates', metavar='FILE',
+                        help='template file replacing the combination patterns of the pattern set')
+    parser.add_argument('--hex', action='store_true',
+                        help='write candidates with non-ASCII or control characters as $HEX[...], as hashcat reads them')
+    parser.add_argument('--buffer-size', type=parse_size, metavar='SIZE',
+                        help='bytes of candidates joined into each write, e.g. 4M (default: 1M, 64K for stdout and shards)')
+    parser.add_argument('--store', metavar='FILE',
+                        help='also save the candidates as a sorted, prefix-compressed set file that can be memory-mapped')
+    parser.add_argument('--no-dedup', action='store_true', help='keep duplicate candidates')
+    parser.add_argument('--dedup-memory', type=int, default=256, metavar='MB',
+                        help='memory for exact dedup before spilling to disk (default: 256)')
+    parser.add_argument('--spill-dir', metavar='DIR', help='directory for dedup spill files (default: system temp)')
+    parser.add_argument('--no-variations', action='store_true', help='skip the variation stage')
+    parser.add_argument('--order', choices=['stream', 'likely'], default='stream',
+                        help="'likely' emits candidates in descending estimated likelihood")
+    parser.add_argument('--limit', type=int, metavar='N', help='stop after N candidates')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='count the candidates per stage without generating them')
+    parser.add_argument('--skip', type=int, default=0, metavar='N',
+                        help='start at base word N of the keyspace instead of the beginning')
+    parser.add_argument('--partition', type=parse_partition, metavar='I/N',
+                        help='generate only part I of N equal parts of the keyspace, e.g. 2/4')
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help='save progress to FILE and resume from it after an interruption (needs -o); '
+                             'dedup does not carry across a resume, so the resumed run can repeat earlier candidates, '
+                             'and once dedup spills to disk progress is kept from before its first possible repeat')
+    parser.add_argument('--check', metavar='PASSWORD',
+                        help="report whether PASSWORD would be generated from the profile instead of generating "
+                             "('-' reads passwords from stdin, one per line); exits 1 if any would be")
+    parser.add_argument('--stats', nargs='?', const='-', metavar='FILE',
+                        help='write per-stage timings and counts as JSON to FILE (default: stderr)')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='run under cProfile, saving the profile to FILE and printing the top functions')
+    parser.add_argument('-r', '--rules', metavar='FILE',
+                        help='hashcat/John rule file replacing the built-in variations')
+    parser.add_argument('--leet', action='store_true',
+                        help='expand every combination of leetspeak substitutions as the variation stage')
+    parser.add_argument('--leet-per-word', type=int, default=32, metavar='N',
+                        help='leet forms kept per word, 0 for no limit (default: 32)')
+    parser.add_argument('--leet-total', type=int, default=10000, metavar='N',
+                        help='leet forms kept per run, 0 for no limit (default: 10000)')
+    audit = parser.add_argument_group('audit mode', 'for authorized audits: check candidates against '
+                                      'a local hash list and write only the matched accounts')
+    audit.add_argument('--audit', metavar='HASHFILE',
+                       help='account:hash lines (MD5, SHA-1, SHA-256 hex or PBKDF2 in Django/passlib format)')
+    audit.add_argument('--workers', type=int, metavar='N', help='hashing processes (default: CPU count)')
+    policy = parser.add_argument_group('password policy', 'only emit candidates the target system would accept')
+    policy.add_argument('--min-length', type=int, default=0, metavar='N', help='minimum candidate length')
+    policy.add_argument('--max-length', type=int, metavar='N', help='maximum candidate length')
+    policy.add_argument('--require', type=parse_require, default=[], metavar='CLASSES',
+                        help=f"character classes every candidate needs, comma separated ({', '.join(CLASS_NAMES)})")
+    policy.add_argument('--min-classes', type=int, default=0, metavar='N',
+                        help='minimum number of distinct character classes')
+    policy.add_argument('--banned', default='', metavar='CHARS', help='characters the target rejects')
+    policy.add_argument('--match', metavar='REGEX', help='regular expression candidates must match')
+    return parser
+
+
+def build_policy(args: argparse.Namespace) -> Optional[Policy]:
+    """Create the password policy from the flags, if any were given"""
+    if not (args.min_length or args.max_length is not None or args.require
+            or args.min_classes or args.banned or args.match):
+        return None
+    return Policy(min_length=args.min_length, max_length=args.max_length, require=args.require,
+                  min_classes=args.min_classes, banned=args.banned, pattern=args.match)
+
+
+def iter_stored(candidates: Iterable[str], store: CompactSet) -> Iterator[str]:
+    """Pass candidates through, adding each one to a compact set"""
+    add = store.add
+    for word in candidates:
+        add(word)
+        yield word
+
+
+def parse_partition(text: str) -> Tuple[int, int]:
+    """Parse a partition such as 2/4 into (part, parts)"""
+    try:
+        part, parts = (int(value) for value in text.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid partition {text!r}, expected I/N such as 2/4")
+    if not 1 <= part <= parts:
+        raise argparse.ArgumentTypeError(f"partition {text!r} is out of range")
+    return part, parts
+
+
+def read_profile(args: argparse.Namespace) -> dict:
+    """Collect profile fields from stdin JSON and flags, flags taking priority"""
+    profile = {}
+    if args.stdin:
+        profile.update(json.load(sys.stdin))
+    for field in PROFILE_FIELDS:
+        value = getattr(args, field)
+        if value is not None:
+            profile[field] = value
+    for entry in args.field:
+        key, separator, value = entry.partition('=')
+        if not separator:
+            raise ValueError(f"invalid field {entry!r}, expected NAME[:TYPE]=VALUE")
+        # Repeating a field gives it several values, such as one per child
+        existing = profile.get(key)
+        if existing is None:
+            profile[key] = value
+        else:
+            profile[key] = (existing if isinstance(existing, list) else [existing]) + [value]
+    return profile
+
+
+def run_audit(hashes: HashList, candidates, output: Optional[str], workers: Optional[int]) -> dict:
+    """Check candidates against a hash list, writing account:scheme:password for each match"""
+    auditor = Auditor(hashes, workers=workers)
+    if output:
+        # Matches are plaintext passwords, so the file is readable by its owner only
+        out = os.fdopen(os.open(output, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8')
+    else:
+        out = sys.stdout
+    try:
+        for account, scheme, word in auditor.iter_matches(candidates):
+            print(f"{account}:{scheme}:{word}", file=out, flush=True)
+    finally:
+        if output:
+            out.close()
+    report = auditor.report()
+    print(f"🔍 Checked {report['count']} candidates against {report['accounts']} accounts: "
+          f"{report['matched']} matched ({report['per_sec']}/s)", file=sys.stderr)
+    return report
+
+
+def check_passwords(oracle: MembershipOracle, passwords) -> int:
+    """Print whether each password is derivable from the profile; 1 if any is"""
+    derivable = 0
+    for password in passwords:
+        source = oracle.explain(password)
+        if source is None:
+            print(f"✅ {password}: not derivable from the profile")
+            continue
+        derivable += 1
+        variation = f", variation {source['variation']!r}" if source['variation'] else ""
+        print(f"❌ {password}: derivable ({source['stage'] or 'enumerated'} pattern{variation})")
+    return 1 if derivable else 0
+
+
+def print_keyspace(keyspace: dict, has_policy: bool = False):
+    """Print a dry-run count per stage"""
+    print("📊 Keyspace by stage:")
+    for stage, counts in keyspace['stages'].items():
+        print(f"   {stage}: {counts['plans']} plans, {counts['base']} base words, "
+              f"{counts['variations']} variations")
+    accuracy = "exact" if keyspace['exact'] else "estimated"
+    print(f"🔢 {keyspace['total']} candidates before dedup ({accuracy})")
+    print(f"🔢 ~{keyspace['unique_estimate']} candidates after dedup (estimated)")
+    if has_policy:
+        print("⚠️  Counts are before the password policy is applied")
+
+
+def print_date_range(components: dict):
+    """Print what a partial date of birth expands to, before anything is generated"""
+    print(f"📅 Date of birth between {components['first']} and {components['last']}: {components['days']} days, "
+          f"{components['total']} date components ({components['day_strings']} day strings, "
+          f"{components['month_days']} mmdd/ddmm, {components['years']} years)", file=sys.stderr)
+
+
+def write_stats(report: dict, target: str):
+    """Write a stats report as JSON to a file, or to stderr for '-'"""
+    text = json.dumps(report, indent=2)
+    if target == '-':
+        print(text, file=sys.stderr)
+        return
+    with open(target, 'w', encoding='utf-8') as f:
+        f.write(text + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.profile:
+        return run(parser, args)
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(run, parser, args)
+    finally:
+        profiler.dump_stats(args.profile)
+        print(f"🔬 Profile saved to: {args.profile}", file=sys.stderr)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(15)
+
+
+def run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    """Generate the wordlist the parsed arguments describe"""
+    try:
+        profile = read_profile(args)
+    except ValueError as e:
+        parser.error(str(e))
+    if not any(profile.get(field) for field in PROFILE_FIELDS) and not profile_fields(profile):
+        parser.error("no information given; use --name/--dob/--city/--phone/--field or --stdin")
+
+    rules = None
+    if args.rules and args.leet:
+        parser.error("--rules and --leet cannot be combined")
+    if args.leet or args.patterns == 'extended':
+        rules = LeetExpander(per_word=args.leet_per_word or None, total=args.leet_total or None)
+    if args.rules:
+        rules = load_rules(args.rules)
+        if rules.skipped:
+            print(f"⚠️  Skipped {len(rules.skipped)} unsupported rules in {args.rules}", file=sys.stderr)
+
+    hashes = None
+    if args.audit:
+        if args.checkpoint or args.raw or args.compress or args.shards or args.shard_bytes or args.shard_by_length:
+            parser.error("--audit writes only matches; it cannot be combined with output options")
+        try:
+            hashes = load_hashes(args.audit)
+        except OSError as e:
+            parser.error(str(e))
+        if hashes.skipped:
+            print(f"⚠️  Skipped {len(hashes.skipped)} unrecognized hashes in {args.audit}", file=sys.stderr)
+        if not hashes.accounts:
+            parser.error(f"no usable hashes in {args.audit}")
+
+    templates = None
+    if args.templates:
+        try:
+            templates = load_templates(args.templates)
+        except (OSError, TemplateError) as e:
+            parser.error(str(e))
+
+    try:
+        policy = build_policy(args)
+    except (ValueError, re.error) as e:
+        parser.error(str(e))
+
+    # Stages are only instrumented when a report was asked for
+    stats = RunStats() if args.stats else None
+    engine = CandidateEngine(dedup=not args.no_dedup, variations=not args.no_variations,
+                             patterns=args.patterns, rules=rules,
+                             dedup_memory=args.dedup_memory * 1024 * 1024, spill_dir=args.spill_dir,
+                             policy=policy, stats=stats, templates=templates, arity=args.arity)
+    fields = [profile.get(field) or "" for field in PROFILE_FIELDS] + [profile_fields(profile)]
+    try:
+        data = stats.call('parse', parse_profile, *fields) if stats else parse_profile(*fields)
+    except ValueError as e:
+        parser.error(str(e))
+    if data['dob_range']:
+        print_date_range(data['dob_range'].components())
+    if args.dry_run:
+        print_keyspace(engine.count(data), policy is not None)
+        return 0
+    if args.check is not None:
+        if args.check == '-' and args.stdin:
+            parser.error("--check - and --stdin both read from stdin")
+        passwords = (line.rstrip("\r\n") for line in sys.stdin) if args.check == '-' else [args.check]
+        return check_passwords(MembershipOracle(engine, data), passwords)
+
+    indexed = args.skip or args.partition or args.checkpoint
+    if indexed and args.order == 'likely':
+        parser.error("--skip, --partition and --checkpoint need the stream order")
+    if args.checkpoint and not args.output:
+        parser.error("--checkpoint needs an output file (-o)")
+
+    checkpoint = None
+    resume = False
+    skipped = 0
+    sizes = None
+    if indexed:
+        # Positions count base words, each followed by its variations
+        size = engine.keyspace_size(data)
+        start, stop = 0, size
+        if args.partition:
+            part, parts = args.partition
+            start, stop = size * (part - 1) // parts, size * part // parts
+        start += args.skip
+        if args.checkpoint:
+            # Everything but the stopping point decides which candidates a run writes
+            options = {key: value for key, value in vars(args).items() if key not in ('limit', 'checkpoint')}
+            settings = {'profile': profile, 'options': options}
+            checkpoint = Checkpoint(args.checkpoint, run_key(settings))
+            state = checkpoint.load()
+            if state and state['done']:
+                print(f"✅ Already complete according to {args.checkpoint}", file=sys.stderr)
+                return 0
+            if state:
+                if state['position'] >= start:
+                    # Candidates of the base word already written before the interruption
+                    start, skipped = state['position'], state.get('skip', 0)
+                # Output files are cut back to what the checkpoint covers
+                sizes = state.get('sizes')
+                resume = True
+                print(f"⏩ Resuming from base word {start}"
+                      + (f", after its first {skipped} candidates" if skipped else ""), file=sys.stderr)
+        candidates = engine.iter_range(data, start, stop)
+        if skipped:
+            candidates = islice(candidates, skipped, None)
+    elif args.order == 'likely':
+        candidates = engine.iter_likely(data)
+    else:
+        candidates = engine.iter_candidates(data)
+    if args.limit is not None:
+        candidates = islice(candidates, args.limit)
+    store = None
+    if args.store:
+        store = CompactSet()
+        candidates = iter_stored(candidates, store)
+
+    if hashes is not None:
+        report = run_audit(hashes, candidates, args.output, args.workers)
+    elif args.output:
+        shard_mode, shard_value = None, 0
+        if args.shards:
+            shard_mode, shard_value = 'count', args.shards
+        elif args.shard_bytes:
+            shard_mode, shard_value = 'bytes', parse_size(args.shard_bytes)
+        elif args.shard_by_length:
+            shard_mode = 'length'
+        # Without a checkpoint, output is written to a temporary file and renamed
+        # into place once synced, so a crash never leaves a truncated wordlist;
+        # a checkpointed run needs its partial output on disk to resume from
+        try:
+            sink = open_sink(args.output, args.compress, header=not args.raw and not resume,
+                             shard_mode=shard_mode, shard_value=shard_value, append=resume,
+                             atomic=not args.checkpoint, sync=True, buffer_size=args.buffer_size, hex=args.hex,
+                             truncate=sizes)
+        except ValueError as e:
+            parser.error(str(e))
+        if checkpoint is not None:
+            candidates = iter_checkpointed(candidates, engine, sink, checkpoint, stop, skipped=skipped)
+        report = sink.consume(candidates)
+        files = report['files']
+        target = files[0] if len(files) == 1 else f"{len(files)} files"
+        print(f"💾 {report['count']} passwords saved to: {target} "
+              f"({report['bytes_per_sec'] / 1e6:.1f} MB/s)", file=sys.stderr)
+    else:
+        if args.compress or args.shards or args.shard_bytes or args.shard_by_length:
+            parser.error("--compress and sharding need an output file (-o)")
+        try:
+            report = StreamSink(sys.stdout.buffer, buffer_size=args.buffer_size or STREAM_BUFFER,
+                                hex=args.hex).consume(candidates)
+        except BrokenPipeError:
+            # Output was cut short by a downstream reader such as head
+            sys.stderr.close()
+            return 0
+
+    if store is not None:
+        store.save(args.store)
+        print(f"🗜️  {len(store)} distinct candidates stored in {args.store} ({store.nbytes} bytes)", file=sys.stderr)
+
+    if stats is not None:
+        # Writing pulls every candidate through the engine, whose time is subtracted
+        stats.add('audit' if hashes is not None else 'output', report['seconds'], report['count'],
+                  upstream=stats.last)
+        write_stats(stats.report(), args.stats)
+
+    dedup_stats = engine.deduplicator.stats
+    if dedup_stats.get('strategy') == 'spill':
+        print(f"🗄️  Dedup spilled {dedup_stats['runs']} runs ({dedup_stats['spilled_bytes']} bytes), "
+              f"deferred {dedup_stats['deferred']}, Bloom false positives {dedup_stats['false_positives']}",
+              file=sys.stderr)
+    if policy is not None:
+        policy_stats = engine.policy_stats
+        print(f"🔒 Policy pruned {policy_stats['pruned']} combinations, filtered {policy_stats['filtered']}, "
+              f"passed {policy_stats['passed']}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+PassCraft Compact Sets
+Sorted candidate sets stored with shared prefixes written once, in memory or in a mappable file
+"""
+
+import heapq
+import mmap
+import os
+import struct
+from array import array
+from typing import Iterable, Iterator, List, Tuple
+
+# Words per block; a block starts with a whole word and lookups decode at most one block
+BLOCK_SIZE = 16
+
+# Words added before they are sorted into a compact segment
+PENDING_LIMIT = 65536
+
+# Segments of one size merged into a segment of the next size
+MERGE_FANIN = 8
+
+# File layout: header, block offsets, then the blocks
+MAGIC = b"PCSET\x001\n"
+HEADER = struct.Struct('<8sQQQ')  # magic, word count, block count, block size
+
+
+def _encode(word: str) -> bytes:
+    return word.encode('utf-8', 'surrogatepass')
+
+
+def _put(out: bytearray, value: int):
+    """Append a varint"""
+    while value >= 0x80:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get(data, pos: int) -> Tuple[int, int]:
+    """Read a varint, returning (value, next position)"""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Segment:
+    """Sorted, distinct words in front-coded blocks: each word is the length shared with the previous word plus the rest"""
+
+    __slots__ = ('data', 'offsets', 'count')
+
+    def __init__(self, data, offsets, count: int):
+        self.data = data  # bytes, or a view of a mapped file
+        self.offsets = offsets  # block starts, plus the end of the last block
+        self.count = count
+
+    @classmethod
+    def from_sorted(cls, words: Iterable[bytes]) -> 'Segment':
+        """Encode sorted words, dropping repeats"""
+        data = bytearray()
+        offsets = array('Q')
+        count = 0
+        prev = None
+        for word in words:
+            if word == prev:
+                continue
+            if count % BLOCK_SIZE == 0:
+                offsets.append(len(data))
+                _put(data, len(word))
+                data += word
+            else:
+                limit = min(len(prev), len(word))
+                # The first differing byte is the highest set byte of the XOR of the two prefixes
+                diff = int.from_bytes(prev[:limit], 'big') ^ int.from_bytes(word[:limit], 'big')
+                shared = limit - (diff.bit_length() + 7) // 8
+                _put(data, shared)
+                _put(data, len(word) - shared)
+                data += word[shared:]
+            prev = word
+            count += 1
+        offsets.append(len(data))
+        return cls(bytes(data), offsets, count)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data) + self.offsets.itemsize * len(self.offsets)
+
+    def _head(self, block: int) -> bytes:
+        """First word of a block"""
+        length, pos = _get(self.data, self.offsets[block])
+        return bytes(self.data[pos:pos + length])
+
+    def _iter_block(self, block: int) -> Iterator[bytes]:
+        data = self.data
+        pos, end = self.offsets[block], self.offsets[block + 1]
+        length, pos = _get(data, pos)
+        word = bytes(data[pos:pos + length])
+        pos += length
+        yield word
+        while pos < end:
+            shared = data[pos]
+            if shared < 0x80:
+                pos += 1
+            else:
+                shared, pos = _get(data, pos)
+            length = data[pos]
+            if length < 0x80:
+                pos += 1
+            else:
+                length, pos = _get(data, pos)
+            word = word[:shared] + bytes(data[pos:pos + length])
+            pos += length
+            yield word
+
+    def __contains__(self, word: bytes) -> bool:
+        # The last block whose first word is not past the word is the only one that can hold it
+        low, high = 0, len(self.offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self._head(middle) <= word:
+                low = middle + 1
+            else:
+                high = middle
+        if low == 0:
+            return False
+        for candidate in self._iter_block(low - 1):
+            if candidate >= word:
+                return candidate == word
+        return False
+
+    def __iter__(self) -> Iterator[bytes]:
+        for block in range(len(self.offsets) - 1):
+            yield from self._iter_block(block)
+
+
+class CompactSet:
+    """Set of candidates built incrementally and kept as sorted front-coded segments"""
+
+    def __init__(self, words: Iterable[str] = ()):
+        # A set of short str costs ~80 bytes per word; shared prefixes are
+        # written once here, leaving a few bytes per word
+        self._pending = set()
+        self._segments: List[Tuple[int, Segment]] = []  # (level, segment), oldest first
+        self._file = None
+        self._views: List[memoryview] = []
+        self.update(words)
+
+    def add(self, word: str):
+        """Add one candidate"""
+        self._pending.add(_encode(word))
+        if len(self._pending) >= PENDING_LIMIT:
+            self._flush()
+
+    def update(self, words: Iterable[str]):
+        """Add candidates from a stream"""
+        pending = self._pending
+        for word in words:
+            pending.add(word.encode('utf-8', 'surrogatepass'))
+            if len(pending) >= PENDING_LIMIT:
+                self._flush()
+
+    def _flush(self):
+        """Sort the pending words into a segment, merging segments of one size as they add up"""
+        if self._pending:
+            self._segments.append((0, Segment.from_sorted(sorted(self._pending))))
+            self._pending.clear()
+        segments = self._segments
+        while len(segments) >= MERGE_FANIN and len({level for level, _ in segments[-MERGE_FANIN:]}) == 1:
+            level = segments[-1][0]
+            merged = Segment.from_sorted(heapq.merge(*(segment for _, segment in segments[-MERGE_FANIN:])))
+            segments[-MERGE_FANIN:] = [(level + 1, merged)]
+
+    def compact(self):
+        """Merge everything into a single segment"""
+        self._flush()
+        if len(self._segments) > 1:
+            level = max(level for level, _ in self._segments)
+            merged = Segment.from_sorted(heapq.merge(*(segment for _, segment in self._segments)))
+            self._segments = [(level + 1, merged)]
+
+    def __contains__(self, word: str) -> bool:
+        key = _encode(word)
+        return key in self._pending or any(key in segment for _, segment in self._segments)
+
+    def __len__(self) -> int:
+        # Segments may share words until they are merged
+        self.compact()
+        return self._segments[0][1].count if self._segments else 0
+
+    def __iter__(self) -> Iterator[str]:
+        """Candidates in sorted order"""
+        self.compact()
+        for _, segment in self._segments:
+            for word in segment:
+                yield word.decode('utf-8', 'surrogatepass')
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the compact segments, not counting pending words or a mapped file"""
+        return sum(segment.nbytes for _, segment in self._segments if not isinstance(segment.data, memoryview))
+
+    def save(self, path: str):
+        """Write the set to one file that load() maps back without reading it"""
+        self.compact()
+        segment = self._segments[0][1] if self._segments else Segment.from_sorted(())
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, segment.count, len(segment.offsets) - 1, BLOCK_SIZE))
+            f.write(array('Q', segment.offsets).tobytes())
+            f.write(segment.data)
+        os.replace(temp, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'CompactSet':
+        """Map a saved set; blocks are read from the file as lookups and iteration reach them"""
+        compact = cls()
+        with open(path, 'rb') as f:
+            try:
+                compact._file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # An empty file cannot be mapped
+                raise ValueError(f"{path} is not a compact set file") from None
+        view = memoryview(compact._file)
+        if len(view) < HEADER.size or HEADER.unpack_from(view)[0] != MAGIC:
+            view.release()
+            compact.close()
+            raise ValueError(f"{path} is not a compact set file")
+        _, count, blocks, _ = HEADER.unpack_from(view)
+        start = HEADER.size + 8 * (blocks + 1)
+        # Offsets are relative to the blocks, which follow them in the file
+        compact._views = [view, view[HEADER.size:start].cast('Q'), view[start:]]
+        compact._segments = [(0, Segment(compact._views[2], compact._views[1], count))]
+        return compact
+
+    def close(self):
+        """Release a mapped file"""
+        if self._file is not None:
+            self._segments = [(level, segment) for level, segment in self._segments
+                              if not isinstance(segment.data, memoryview)]
+            for view in reversed(self._views):
+                view.release()
+            self._views = []
+            self._file.close()
+            self._file = None
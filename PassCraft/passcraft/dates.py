@@ -0,0 +1,138 @@
+"""
+PassCraft Date Ranges
+Expands partial birth dates, such as a year, a month or an age bracket, into lazy date slots
+"""
+
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterator, NamedTuple, Sequence, Tuple, Union
+
+# Widest range accepted, in years; two-digit year forms repeat beyond a century
+MAX_RANGE_YEARS = 100
+
+# String forms of a single day, one lazy slot each
+DAY_FORMS: Dict[str, Callable[[date], str]] = {
+    'full': lambda d: f"{d.year}{d.month:02d}{d.day:02d}",          # yyyymmdd
+    'reversed': lambda d: f"{d.day:02d}{d.month:02d}{d.year}",      # ddmmyyyy
+    'us': lambda d: f"{d.month:02d}{d.day:02d}{d.year}",            # mmddyyyy
+    'ddmmyy': lambda d: f"{d.day:02d}{d.month:02d}{d.year % 100:02d}",
+    'mmddyy': lambda d: f"{d.month:02d}{d.day:02d}{d.year % 100:02d}",
+}
+
+
+def shift_years(day: date, years: int) -> date:
+    """The same calendar day a number of years away, February 29th becoming the 28th"""
+    try:
+        return day.replace(year=day.year + years)
+    except ValueError:
+        return day.replace(year=day.year + years, day=28)
+
+
+class DateSequence(Sequence):
+    """One string form of every day of a range, computed on access instead of stored"""
+
+    __slots__ = ('first', 'days', 'form')
+
+    def __init__(self, first: int, days: int, form: str):
+        self.first = first  # Proleptic Gregorian ordinal of the first day
+        self.days = days
+        self.form = form
+
+    def __len__(self) -> int:
+        return self.days
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.days)
+            if step != 1:
+                return tuple(self[i] for i in range(start, stop, step))
+            return DateSequence(self.first + start, max(stop - start, 0), self.form)
+        if index < 0:
+            index += self.days
+        if not 0 <= index < self.days:
+            raise IndexError("date index out of range")
+        return DAY_FORMS[self.form](date.fromordinal(self.first + index))
+
+    def __iter__(self) -> Iterator[str]:
+        render = DAY_FORMS[self.form]
+        fromordinal = date.fromordinal
+        for ordinal in range(self.first, self.first + self.days):
+            yield render(fromordinal(ordinal))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, DateSequence) and (self.first, self.days, self.form) == (
+            other.first, other.days, other.form)
+
+    def __hash__(self) -> int:
+        return hash((self.first, self.days, self.form))
+
+    def __repr__(self) -> str:
+        return f"DateSequence({date.fromordinal(self.first)}, {self.days} days, {self.form!r})"
+
+
+class UniformWeights(Sequence):
+    """The same weight for every value of a lazy slot"""
+
+    __slots__ = ('weight', 'length')
+
+    def __init__(self, weight: float, length: int):
+        self.weight = weight
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return UniformWeights(self.weight, len(range(*index.indices(self.length))))
+        if not -self.length <= index < self.length:
+            raise IndexError("weight index out of range")
+        return self.weight
+
+
+class DateRange(NamedTuple):
+    """An inclusive range of possible birth dates"""
+    first: date
+    last: date
+
+    @property
+    def days(self) -> int:
+        return self.last.toordinal() - self.first.toordinal() + 1
+
+    def years(self) -> Tuple[str, ...]:
+        """Every year of the range, oldest first"""
+        return tuple(str(year) for year in range(self.first.year, self.last.year + 1))
+
+    def year_shorts(self) -> Tuple[str, ...]:
+        """Two-digit years of the range"""
+        return tuple(dict.fromkeys(year[2:] for year in self.years()))
+
+    def month_days(self, day_first: bool = False) -> Tuple[str, ...]:
+        """Distinct mmdd (or ddmm) strings of the range in calendar order"""
+        if self.days >= 8 * 366:
+            # Eight years always hold every day of the year, a February 29th included
+            pairs = {(d.month, d.day) for d in (date(2000, 1, 1) + timedelta(n) for n in range(366))}
+        else:
+            pairs = {(d.month, d.day) for d in map(date.fromordinal, range(self.first.toordinal(),
+                                                                             self.last.toordinal() + 1))}
+        if day_first:
+            return tuple(f"{day:02d}{month:02d}" for month, day in sorted(pairs))
+        return tuple(f"{month:02d}{day:02d}" for month, day in sorted(pairs))
+
+    def slot(self, form: str) -> DateSequence:
+        """Lazy slot of one string form of every day"""
+        return DateSequence(self.first.toordinal(), self.days, form)
+
+    def components(self) -> dict:
+        """How many date strings the range expands to, counted without building them"""
+        years = len(self.years()) + len(self.year_shorts())
+        month_days = 2 * len(self.month_days())
+        day_strings = len(DAY_FORMS) * self.days
+        return {
+            'first': self.first.isoformat(),
+            'last': self.last.isoformat(),
+            'days': self.days,
+            'years': years,
+            'month_days': month_days,
+            'day_strings': day_strings,
+            'total': years + month_days + day_strings,
+        }
@@ -0,0 +1,189 @@
+"""
+PassCraft Deduplication
+Exact in-memory dedup that spills to disk once a memory limit is reached
+"""
+
+import hashlib
+import heapq
+import math
+import os
+import tempfile
+from typing import Iterable, Iterator, List, Optional
+
+# Rough cost of one short str held in a set, used to turn a memory limit into an item count
+BYTES_PER_ITEM = 100
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+
+
+class BloomFilter:
+    """Bit-array Bloom filter using double hashing over one blake2b digest"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        digest = hashlib.blake2b(item.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        size = self.size
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % size
+
+    def add(self, item: str):
+        """Add an item to the filter"""
+        bits = self.bits
+        for pos in self._positions(item):
+            bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        for pos in self._positions(item):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the bit array"""
+        return len(self.bits)
+
+
+def _iter_run(path: str) -> Iterator[str]:
+    """Read back a sorted run written by _spill_run"""
+    with open(path, 'r', encoding='utf-8', errors='surrogatepass', newline='\n') as f:
+        for line in f:
+            yield line[:-1]
+
+
+# Below the memory limit an exact set is used. Past it, a Bloom filter decides
+# which candidates are certainly new; those are emitted at once while the seen
+# set is spilled to sorted runs on disk. Candidates the filter may have seen
+# are deferred and resolved exactly at the end with an external merge.
+class Deduplicator:
+    """Removes duplicate candidates, keeping the first occurrence of each"""
+
+    def __init__(self, memory_limit: int = DEFAULT_MEMORY_LIMIT, spill_dir: Optional[str] = None,
+                 expected_items: Optional[int] = None, error_rate: float = 0.001):
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self.error_rate = error_rate
+        self.threshold = max(memory_limit // BYTES_PER_ITEM, 1)
+        self.expected_items = expected_items
+        self.stats = {}
+        # True while candidates the Bloom filter may have seen wait to be resolved at the end
+        self.deferring = False
+
+    def _reset_stats(self):
+        self.stats = {
+            'strategy': 'memory',
+            'threshold_items': self.threshold,
+            'input': 0,
+            'unique': 0,
+            'duplicates': 0,
+            'deferred': 0,
+            'false_positives': 0,
+            'runs': 0,
+            'spilled_bytes': 0,
+            'bloom_bytes': 0,
+        }
+
+    def _spill_run(self, items: Iterable[str], runs: List[str]) -> str:
+        """Write items as a sorted run file"""
+        fd, path = tempfile.mkstemp(prefix='passcraft-run-', suffix='.txt', dir=self.spill_dir)
+        runs.append(path)
+        with os.fdopen(fd, 'w', encoding='utf-8', errors='surrogatepass', newline='\n') as f:
+            for item in sorted(items):
+                f.write(item)
+                f.write('\n')
+            self.stats['spilled_bytes'] += f.tell()
+        self.stats['runs'] += 1
+        return path
+
+    def filter(self, candidates: Iterable[str]) -> Iterator[str]:
+        """Yield each distinct candidate once"""
+        self._reset_stats()
+        self.deferring = False
+        stats = self.stats
+        threshold = self.threshold
+        seen = set()
+        iterator = iter(candidates)
+
+        # Exact in-memory phase
+        for word in iterator:
+            stats['input'] += 1
+            if word in seen:
+                continue
+            seen.add(word)
+            yield word
+            if len(seen) >= threshold:
+                break
+        else:
+            stats['unique'] = len(seen)
+            stats['duplicates'] = stats['input'] - stats['unique']
+            return
+
+        # Spill phase: the Bloom filter remembers everything emitted so far
+        stats['strategy'] = 'spill'
+        bloom = BloomFilter(self.expected_items or threshold * 10, self.error_rate)
+        stats['bloom_bytes'] = bloom.nbytes
+        for word in seen:
+            bloom.add(word)
+        emitted_runs: List[str] = []
+        deferred_runs: List[str] = []
+        deferred = set()
+        unique = len(seen)
+
+        try:
+            self._spill_run(seen, emitted_runs)
+            seen.clear()
+
+            for word in iterator:
+                stats['input'] += 1
+                if word in seen or word in deferred:
+                    continue
+                if word in bloom:
+                    self.deferring = True
+                    deferred.add(word)
+                    if len(deferred) >= threshold:
+                        self._spill_run(deferred, deferred_runs)
+                        deferred.clear()
+                    continue
+                bloom.add(word)
+                seen.add(word)
+                unique += 1
+                yield word
+                if len(seen) >= threshold:
+                    self._spill_run(seen, emitted_runs)
+                    seen.clear()
+
+            # Resolve deferred candidates against everything emitted
+            emitted = heapq.merge(*(_iter_run(path) for path in emitted_runs), iter(sorted(seen)))
+            maybes = heapq.merge(*(_iter_run(path) for path in deferred_runs), iter(sorted(deferred)))
+            seen.clear()
+            deferred.clear()
+
+            previous = None
+            current = next(emitted, None)
+            for word in maybes:
+                if word == previous:
+                    continue
+                previous = word
+                stats['deferred'] += 1
+                while current is not None and current < word:
+                    current = next(emitted, None)
+                if current != word:
+                    stats['false_positives'] += 1
+                    unique += 1
+                    yield word
+            self.deferring = False
+        finally:
+            for path in emitted_runs + deferred_runs:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            stats['unique'] = unique
+            stats['duplicates'] = stats['input'] - unique
@@ -0,0 +1,968 @@
+"""
+PassCraft Candidate Engine
+Streams password candidates from parsed personal information
+"""
+
+import re
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from itertools import permutations, product
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Pattern, Tuple, Union
+
+from .dates import DAY_FORMS, MAX_RANGE_YEARS, DateRange, UniformWeights, shift_years
+from .dedup import DEFAULT_MEMORY_LIMIT, Deduplicator
+from .keyspace import plan_size
+from .leet import LeetExpander
+from .policy import NO_EFFECTS, Policy, iter_plan_pruned, iter_plan_pruned_at, new_policy_stats, plan_reachable
+from .rules import STANDARD_RULE_WEIGHTS, STANDARD_RULES, RuleSet, parse_rules
+from .stats import RunStats
+
+if TYPE_CHECKING:
+    from .templates import TemplateSet
+
+# Common suffixes/prefixes
+SUFFIXES = ["", "123", "!", "@123", "123!", "2024", "2025", "007", "111", "999"]
+SEPARATORS = ["", ".", "_", "-", "@", "#"]
+
+# Estimated likelihood of each separator and suffix, used for best-first order
+SEPARATOR_WEIGHTS = {"": 1.0, ".": 0.35, "_": 0.3, "-": 0.2, "@": 0.1, "#": 0.08}
+SUFFIX_WEIGHTS = {
+    "": 1.0, "123": 0.5, "!": 0.45, "123!": 0.25, "@123": 0.15,
+    "2024": 0.12, "2025": 0.1, "111": 0.08, "007": 0.06, "999": 0.06,
+}
+
+# Weight decay for components listed in order of preference
+RANK_DECAY = 0.85
+MIN_WEIGHT = 0.01
+
+# Likelihood of a combination of profile fields, multiplied again per field
+FIELD_WEIGHT = 0.5
+# Most profile fields joined into one candidate by default
+DEFAULT_ARITY = 2
+
+# Profile entries parsed by the dedicated parsers; everything else is a typed field
+CORE_FIELDS = ('name', 'dob', 'city', 'phone')
+
+# Type of well-known profile fields; other fields are treated as text
+FIELD_TYPE_DEFAULTS = {
+    'pet': 'name', 'partner': 'name', 'child': 'name', 'children': 'name',
+    'mother': 'name', 'father': 'name', 'nickname': 'name',
+    'hobby': 'text', 'employer': 'text', 'team': 'text', 'school': 'text', 'street': 'text',
+    'favorite_number': 'number', 'lucky_number': 'number', 'house_number': 'number',
+    'anniversary': 'date', 'hometown': 'city', 'work_phone': 'phone',
+}
+# Other spellings of well-known fields, such as the web version's petName
+FIELD_ALIASES = {'petname': 'pet', 'partnername': 'partner', 'favoritenumber': 'favorite_number'}
+
+# Common city abbreviations, as the command-line version knows them
+CITY_ABBREVIATIONS = {
+    'new york': 'ny',
+    'los angeles': 'la',
+    'san francisco': 'sf',
+    'chicago': 'chi',
+    'london': 'ldn',
+    'mumbai': 'mum',
+    'delhi': 'dlh'
+}
+# The GUI has always known three more
+GUI_CITY_ABBREVIATIONS = {
+    **CITY_ABBREVIATIONS,
+    'tokyo': 'tky',
+    'paris': 'prs',
+    'berlin': 'ber'
+}
+
+
+# ===== Information Parsing =====
+
+NON_DIGITS = re.compile(r'\D')
+
+
+def clean_input(text: str) -> str:
+    """Clean and normalize input text"""
+    if not text:
+        return ""
+    # Remove extra spaces and convert to lowercase
+    return text.strip().lower()
+
+
+def extract_parts(name: str) -> dict:
+    """Extract different parts from name"""
+    # Full name parts
+    name_parts = clean_input(name).split()
+    first = name_parts[0] if len(name_parts) > 0 else ""
+    last = name_parts[-1] if len(name_parts) > 1 else ""
+
+    return {
+        'first': first,
+        'last': last,
+        'middle': name_parts[1] if len(name_parts) > 2 else "",
+        # Initials
+        'first_initial': first[:1],
+        'last_initial': last[:1],
+        # Variations
+        'first_capital': first.capitalize(),
+        'last_capital': last.capitalize(),
+    }
+
+
+class DateFormat(NamedTuple):
+    """A date layout as a precompiled pattern and the order of its groups"""
+    name: str
+    pattern: Pattern
+    order: str
+
+
+# Date formats tried in order, matched as strptime would match them (a day may be space-padded)
+DATE_FORMATS = [
+    DateFormat('%Y-%m-%d', re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2}| \d)"), 'ymd'),
+    DateFormat('%d-%m-%Y', re.compile(r"(\d{1,2}| \d)-(\d{1,2})-(\d{4})"), 'dmy'),
+    DateFormat('%m/%d/%Y', re.compile(r"(\d{1,2})/(\d{1,2}| \d)/(\d{4})"), 'mdy'),
+    DateFormat('%d/%m/%Y', re.compile(r"(\d{1,2}| \d)/(\d{1,2})/(\d{4})"), 'dmy'),
+    DateFormat('%Y/%m/%d', re.compile(r"(\d{4})/(\d{1,2})/(\d{1,2}| \d)"), 'ymd'),
+]
+
+
+def match_date(text: str, fmt: DateFormat) -> dict:
+    """Parse a cleaned date in one format into date parts, or {} if it is not a valid date in that format"""
+    match = fmt.pattern.fullmatch(text)
+    if match is None:
+        return {}
+    values = dict(zip(fmt.order, map(int, match.groups())))
+    year, month, day = values['y'], values['m'], values['d']
+    if year < 1 or not 1 <= month <= 12 or not 1 <= day <= monthrange(year, month)[1]:
+        return {}
+    year_text, month_text, day_text = str(year), f"{month:02d}", f"{day:02d}"
+    return {
+        'year': year_text,
+        'year_short': year_text[2:],  # Last 2 digits
+        'month': month_text,
+        'month_short': str(month),
+        'day': day_text,
+        'day_short': str(day),
+        'full': year_text + month_text + day_text,
+        'reversed': day_text + month_text + year_text,
+        'us': month_text + day_text + year_text,
+    }
+
+
+def parse_dob(dob: str) -> dict:
+    """Parse date of birth into different formats"""
+    dob = clean_input(dob)
+    # Try different date formats
+    for fmt in DATE_FORMATS:
+        parts = match_date(dob, fmt)
+        if parts:
+            return parts
+    return {}
+
+
+# Partial dates of birth: a year or span of years, a month, an age bracket, or two dates
+YEAR_SPAN = re.compile(r"(\d{4})(?:\s*(?:-|\.\.|to)\s*(\d{4}))?")
+YEAR_MONTH = re.compile(r"(\d{4})[-/.](\d{1,2})|(\d{1,2})[-/.](\d{4})")
+AGE_BRACKET = re.compile(r"(age\s*:?\s*)?(\d{1,3})(?:\s*(?:-|\.\.|to)\s*(\d{1,3}))?\s*(y|yrs?|years?)?(?:\s*old)?")
+DATE_SPAN = re.compile(r"(.+?)\s*(?:\.\.|\bto\b)\s*(.+)")
+
+
+def parse_dob_range(dob: str, today: Optional[date] = None) -> Optional[DateRange]:
+    """Parse a partial date of birth into the range of dates it allows, or None if it is not one"""
+    text = clean_input(dob)
+    first = last = None
+    year_span = YEAR_SPAN.fullmatch(text)
+    year_month = YEAR_MONTH.fullmatch(text)
+    age = AGE_BRACKET.fullmatch(text)
+    date_span = DATE_SPAN.fullmatch(text)
+    if year_span:
+        low, high = sorted(int(year) for year in (year_span.group(1), year_span.group(2) or year_span.group(1)))
+        if low >= 1:
+            first, last = date(low, 1, 1), date(high, 12, 31)
+    elif year_month:
+        year, month = (year_month.group(1), year_month.group(2)) if year_month.group(1) else (
+            year_month.group(4), year_month.group(3))
+        year, month = int(year), int(month)
+        if year >= 1 and 1 <= month <= 12:
+            first, last = date(year, month, 1), date(year, month, monthrange(year, month)[1])
+    elif age and (age.group(1) or age.group(4)):
+        # Someone aged 30 to 35 today was born at least 30 and less than 36 years ago
+        youngest, oldest = sorted(int(years) for years in (age.group(2), age.group(3) or age.group(2)))
+        today = today or date.today()
+        first = shift_years(today, -(oldest + 1)) + timedelta(days=1)
+        last = shift_years(today, -youngest)
+    elif date_span:
+        ends = [parse_dob(part) for part in date_span.groups()]
+        if all(ends):
+            first, last = sorted(date(int(parts['year']), int(parts['month']), int(parts['day'])) for parts in ends)
+    if first is None:
+        return None
+    if last.year - first.year >= MAX_RANGE_YEARS:
+        raise ValueError(f"Date of birth range {dob!r} spans more than {MAX_RANGE_YEARS} years")
+    return DateRange(first, last)
+
+
+def parse_phone(phone: str) -> dict:
+    """Extract different parts from phone number"""
+    phone = clean_input(phone)
+    parts = {}
+
+    # Extract only digits
+    digits = NON_DIGITS.sub('', phone)
+
+    if digits:
+        parts['full'] = digits
+        parts['last4'] = digits[-4:] if len(digits) >= 4 else digits
+        parts['last3'] = digits[-3:] if len(digits) >= 3 else digits
+        parts['area_code'] = digits[:3] if len(digits) >= 3 else digits
+
+        # Split into parts if it's a standard format
+        if len(digits) == 10:
+            parts['first3'] = digits[:3]
+            parts['middle3'] = digits[3:6]
+            parts['last4'] = digits[6:]
+
+    return parts
+
+
+def parse_city(city: str, abbreviations: Dict[str, str] = CITY_ABBREVIATIONS) -> dict:
+    """Extract city variations"""
+    city = clean_input(city)
+    parts = {}
+
+    if city:
+        parts['full'] = city
+        parts['capital'] = city.capitalize()
+        parts['upper'] = city.upper()
+        parts['abbrev'] = abbreviations.get(city, city[:3])
+
+    return parts
+
+
+def name_variants(value: str) -> List[str]:
+    """Variants of a name such as a pet or partner: joined, capitalized and first word"""
+    words = clean_input(value).split()
+    if not words:
+        return []
+    variants = ["".join(words), "".join(word.capitalize() for word in words)]
+    if len(words) > 1:
+        variants.extend([words[0], words[0].capitalize()])
+    return variants
+
+
+def text_variants(value: str) -> List[str]:
+    """Variants of free text such as an employer or team, adding its acronym"""
+    variants = name_variants(value)
+    words = clean_input(value).split()
+    if len(words) > 1:
+        acronym = "".join(word[0] for word in words)
+        variants.extend([acronym, acronym.upper()])
+    return variants
+
+
+def number_variants(value: str) -> List[str]:
+    """Variants of a number: its digits, zero-padded and last four"""
+    digits = NON_DIGITS.sub('', value)
+    if not digits:
+        return []
+    variants = [digits]
+    if len(digits) == 1:
+        variants.append(digits.zfill(2))
+    if len(digits) > 4:
+        variants.append(digits[-4:])
+    return variants
+
+
+def date_variants(value: str) -> List[str]:
+    """Variants of a date: long and short year, day and month, full date"""
+    parts = parse_dob(value)
+    if 'year' not in parts:
+        return number_variants(value)
+    return [parts['year'], parts['year_short'], parts['day'] + parts['month'],
+            parts['month'] + parts['day'], parts['full']]
+
+
+def phone_variants(value: str) -> List[str]:
+    """Variants of a phone number: last four digits and all of them"""
+    parts = parse_phone(value)
+    return [parts[key] for key in ('last4', 'full') if key in parts]
+
+
+def city_variants(value: str) -> List[str]:
+    """Variants of a place: full, capitalized and abbreviated"""
+    parts = parse_city(value)
+    return [parts[key] for key in ('full', 'capital', 'abbrev') if key in parts]
+
+
+# Variant extractor per field type
+FIELD_TYPES = {
+    'name': name_variants,
+    'text': text_variants,
+    'number': number_variants,
+    'date': date_variants,
+    'phone': phone_variants,
+    'city': city_variants,
+}
+
+
+def field_name(name: str) -> str:
+    """Normalize a field name: petName, Pet Name and pet_name all become pet_name"""
+    name = re.sub(r'(?<=[a-z0-9])(?=[A-Z])', '_', name.strip())
+    name = re.sub(r'\W+', '_', name.lower()).strip('_')
+    return FIELD_ALIASES.get(name.replace('_', ''), name)
+
+
+def parse_field_key(key: str) -> Tuple[str, str]:
+    """Split a field key such as 'pet' or 'team:text' into its name and type"""
+    name, _, kind = key.partition(':')
+    name = field_name(name)
+    kind = kind.strip().lower() or FIELD_TYPE_DEFAULTS.get(name, 'text')
+    if not name:
+        raise ValueError(f"Invalid field name {key!r}")
+    if kind not in FIELD_TYPES:
+        raise ValueError(f"Unknown type {kind!r} for field {name!r}, expected one of: {', '.join(FIELD_TYPES)}")
+    return name, kind
+
+
+def parse_fields(fields: Dict[str, Union[str, int, Iterable[str]]]) -> Dict[str, Tuple[str, ...]]:
+    """Extract the variants of typed profile fields; a list gives a field several values"""
+    parsed: Dict[str, Tuple[str, ...]] = {}
+    for key, values in fields.items():
+        name, kind = parse_field_key(key)
+        if isinstance(values, (str, int)):
+            values = [values]
+        variants = list(parsed.get(name, ()))
+        for value in values:
+            variants.extend(FIELD_TYPES[kind](str(value)))
+        variants = [variant for variant in dict.fromkeys(variants) if variant]
+        if variants:
+            parsed[name] = tuple(variants)
+    return parsed
+
+
+def profile_fields(profile: dict) -> dict:
+    """Entries of a profile record beyond the core fields and id, for parse_profile"""
+    return {key: value for key, value in profile.items()
+            if key not in CORE_FIELDS and key != 'id' and value not in (None, "", [])}
+
+
+def parse_profile(name: str, dob: str, city: str, phone: str,
+                  fields: Optional[Dict[str, Union[str, int, Iterable[str]]]] = None,
+                  abbreviations: Dict[str, str] = CITY_ABBREVIATIONS) -> dict:
+    """Parse all personal information into component tables"""
+    dob_parts = parse_dob(dob)
+    return {
+        'name': extract_parts(name),
+        'dob': dob_parts,
+        # A partial date of birth, such as a year or an age bracket, becomes a range
+        'dob_range': None if dob_parts else parse_dob_range(dob),
+        'city': parse_city(city, abbreviations),
+        'phone': parse_phone(phone),
+        'fields': parse_fields(fields or {}),
+    }
+
+
+# ===== Combination Plans =====
+
+class Plan(NamedTuple):
+    """A cross product of slots whose joined parts form candidates"""
+    stage: str
+    slots: Tuple[Tuple[str, ...], ...]
+    weights: Tuple[Tuple[float, ...], ...] = ()  # Likelihood of each slot value
+    weight: float = 1.0                          # Likelihood of the template itself
+
+
+def weigh(values: Iterable[str], table: Optional[Dict[str, float]] = None) -> Tuple[Tuple[str, ...], Tuple[float, ...]]:
+    """Pair slot values with weights from a table, or decaying by rank"""
+    values = tuple(values)
+    if table is None:
+        return values, tuple(RANK_DECAY ** i for i in range(len(values)))
+    return values, tuple(table.get(value, MIN_WEIGHT) for value in values)
+
+
+def make_plan(stage: str, weight: float, *slots: Tuple[Tuple[str, ...], Tuple[float, ...]]) -> Plan:
+    """Build a plan from weighted slots"""
+    return Plan(stage, tuple(values for values, _ in slots), tuple(weights for _, weights in slots), weight)
+
+
+def iter_plan(plan: Plan, start: int = 0) -> Iterator[str]:
+    """Yield every candidate of a plan, one at a time, from an optional offset"""
+    if len(plan.slots) == 1:
+        yield from plan.slots[0][start:]
+        return
+    join = "".join
+    if not start:
+        for parts in iter_product(plan.slots):
+            yield join(parts)
+        return
+
+    # Finish the tail of the starting vector slot by slot, right to left,
+    # so nothing before the offset is ever built
+    slots = plan.slots
+    vector = unrank(slots, start)
+    last = len(slots) - 1
+    for depth in range(last, -1, -1):
+        prefix = join(slots[i][vector[i]] for i in range(depth))
+        first = vector[depth] if depth == last else vector[depth] + 1
+        for value in slots[depth][first:]:
+            for rest in iter_product(slots[depth + 1:]):
+                yield prefix + value + join(rest)
+
+
+def iter_product(slots) -> Iterator[tuple]:
+    """Cross product of slots like itertools.product, which would copy a lazy slot into a tuple"""
+    if all(isinstance(values, tuple) for values in slots):
+        return product(*slots)
+    return _iter_lazy_product(slots)
+
+
+def _iter_lazy_product(slots) -> Iterator[tuple]:
+    head, rest = slots[0], slots[1:]
+    for value in head:
+        for parts in iter_product(rest):
+            yield (value,) + parts
+
+
+def unrank(slots: Tuple[Tuple[str, ...], ...], index: int) -> Tuple[int, ...]:
+    """Slot indexes of the candidate at a position of a plan, last slot varying fastest"""
+    vector = []
+    for values in reversed(slots):
+        index, position = divmod(index, len(values))
+        vector.append(position)
+    return tuple(reversed(vector))
+
+
+def build_simple_plans(data: dict) -> List[Plan]:
+    """Build plans for simple password combinations"""
+    passwords = []
+
+    name_parts = data['name']
+    dob_parts = data['dob']
+    phone_parts = data['phone']
+    city_parts = data['city']
+
+    # Basic name variations
+    if name_parts['first']:
+        passwords.extend([
+            name_parts['first'],
+            name_parts['first_capital'],
+            name_parts['first'] + "123",
+            name_parts['first'] + "!",
+            name_parts['first'] + "@123",
+        ])
+
+    if name_parts['last']:
+        passwords.extend([
+            name_parts['last'],
+            name_parts['last_capital'],
+            name_parts['last'] + "123",
+        ])
+
+    # Name + numbers
+    if name_parts['first'] and dob_parts:
+        if 'year' in dob_parts:
+            passwords.extend([
+                name_parts['first'] + dob_parts['year'],
+                name_parts['first_capital'] + dob_parts['year'],
+                name_parts['first'] + dob_parts['year_short'],
+                name_parts['last'] + dob_parts['year'],
+                name_parts['first'] + dob_parts['day'],
+                name_parts['first'] + dob_parts['month'] + dob_parts['day'],
+            ])
+
+    # DOB combinations
+    if dob_parts:
+        if 'full' in dob_parts:
+            passwords.extend([
+                dob_parts['full'],
+                dob_parts['reversed'],
+                dob_parts['us'],
+            ])
+
+        if 'day' in dob_parts and 'month' in dob_parts and 'year_short' in dob_parts:
+            passwords.extend([
+                dob_parts['day'] + dob_parts['month'] + dob_parts['year_short'],
+                dob_parts['month'] + dob_parts['day'] + dob_parts['year_short'],
+            ])
+
+    # Phone combinations
+    if phone_parts:
+        if 'full' in phone_parts:
+            passwords.append(phone_parts['full'])
+
+        if 'last4' in phone_parts:
+            passwords.extend([
+                phone_parts['last4'],
+                "123" + phone_parts['last4'],
+                phone_parts['last4'] + "!",
+            ])
+
+    # City combinations
+    if city_parts.get('full'):
+        passwords.extend([
+            city_parts['full'],
+            city_parts['capital'],
+            city_parts['abbrev'],
+            city_parts['full'] + "123",
+        ])
+
+    return [make_plan('simple', 1.0, weigh(passwords))] if passwords else []
+
+
+def collect_components(data: dict, full_phone: bool = False) -> Tuple[List[str], List[str], List[str]]:
+    """Collect name, number and city components for combination plans"""
+    name_parts = data['name']
+    dob_parts = data['dob']
+    phone_parts = data['phone']
+    city_parts = data['city']
+
+    name_components = []
+    number_components = []
+    special_components = []
+
+    # Collect name components
+    if name_parts['first']:
+        name_components.extend([name_parts['first'], name_parts['first_capital']])
+    if name_parts['last']:
+        name_components.extend([name_parts['last'], name_parts['last_capital']])
+    if name_parts['first_initial'] and name_parts['last_initial']:
+        name_components.append(name_parts['first_initial'] + name_parts['last_initial'])
+        name_components.append(name_parts['first_initial'].upper() + name_parts['last_initial'].upper())
+
+    # Collect number components from DOB
+    if dob_parts:
+        if 'year' in dob_parts:
+            number_components.extend([dob_parts['year'], dob_parts['year_short']])
+        if 'month' in dob_parts:
+            number_components.extend([dob_parts['month'], dob_parts['month_short']])
+        if 'day' in dob_parts:
+            number_components.extend([dob_parts['day'], dob_parts['day_short']])
+
+    # Collect phone components
+    if phone_parts:
+        if 'last4' in phone_parts:
+            number_components.append(phone_parts['last4'])
+        if 'area_code' in phone_parts:
+            number_components.append(phone_parts['area_code'])
+        if full_phone and 'full' in phone_parts:
+            number_components.append(phone_parts['full'])
+
+    # Collect city components
+    if city_parts.get('full'):
+        special_components.extend([city_parts['full'], city_parts['capital'], city_parts['abbrev']])
+
+    return name_components, number_components, special_components
+
+
+def build_advanced_plans(data: dict) -> List[Plan]:
+    """Build plans for more complex password combinations"""
+    plans = []
+
+    name_parts = data['name']
+    dob_parts = data['dob']
+    names, numbers, cities = collect_components(data)
+
+    # Name + separator + number, with and without a suffix
+    if names and numbers:
+        plans.append(make_plan(
+            'advanced', 0.9,
+            weigh(names),
+            weigh(SEPARATORS[:3], SEPARATOR_WEIGHTS),  # Use fewer separators for basic combos
+            weigh(numbers),
+            weigh(SUFFIXES[:5], SUFFIX_WEIGHTS),
+        ))
+
+    # City + number combinations
+    if cities and numbers:
+        top_numbers = weigh(numbers[:3])  # Use top 3 number components
+        plans.append(make_plan('advanced', 0.5, weigh(cities), top_numbers, weigh(["", "123"], SUFFIX_WEIGHTS)))
+        plans.append(make_plan('advanced', 0.3, weigh(c.upper() for c in cities), top_numbers))
+
+    # Reverse combinations, only if number has at least 2 digits
+    long_numbers = [num for num in numbers if len(num) >= 2]
+    if names and long_numbers:
+        plans.append(make_plan('advanced', 0.4, weigh(long_numbers), weigh(names)))
+
+    # Special patterns
+    if name_parts['first'] and dob_parts.get('year_short'):
+        plans.append(make_plan('advanced', 0.6, weigh([
+            f"{name_parts['first']}{dob_parts['year_short']}{name_parts['last_initial'].upper()}",
+            f"{name_parts['first_initial'].upper()}{dob_parts['year_short']}{name_parts['last']}",
+            f"{name_parts['first']}.{dob_parts['year_short']}",
+            f"{name_parts['first']}_{dob_parts['day']}_{dob_parts['month']}",
+        ])))
+
+    return plans
+
+
+def build_extended_plans(data: dict) -> List[Plan]:
+    """Build plans for the wider combinations used by the GUI"""
+    plans = []
+
+    name_parts = data['name']
+    dob_parts = data['dob']
+    names, numbers, cities = collect_components(data, full_phone=True)
+
+    # Name components on their own
+    if names:
+        plans.append(make_plan('extended', 1.0, weigh(names)))
+
+    # With numbers, limited to the first 10
+    if names and numbers:
+        plans.append(make_plan(
+            'extended', 0.9,
+            weigh(names),
+            weigh(SEPARATORS[:3], SEPARATOR_WEIGHTS),
+            weigh(numbers[:10]),
+            weigh(SUFFIXES[:5], SUFFIX_WEIGHTS),
+        ))
+
+    # With cities
+    if names and cities:
+        plans.append(make_plan('extended', 0.3, weigh(cities), weigh(names)))
+        plans.append(make_plan(
+            'extended', 0.5,
+            weigh(names),
+            weigh(SEPARATORS[:2], SEPARATOR_WEIGHTS),
+            weigh(cities),
+            weigh(SUFFIXES[:3], SUFFIX_WEIGHTS),
+        ))
+
+    # Number-only combinations
+    if numbers:
+        plans.append(make_plan('extended', 0.4, weigh(numbers[:5]), weigh(SUFFIXES, SUFFIX_WEIGHTS)))
+
+    # City + number combinations
+    if cities and numbers:
+        plans.append(make_plan('extended', 0.5, weigh(cities), weigh(numbers[:5])))
+        plans.append(make_plan('extended', 0.2, weigh(numbers[:5]), weigh(cities)))
+
+    # Special patterns
+    specials = []
+    if name_parts['first'] and dob_parts.get('year_short'):
+        specials.extend([
+            name_parts['first'] + dob_parts['year_short'],
+            name_parts['first_capital'] + dob_parts['year_short'],
+            name_parts['first'] + name_parts['last_initial'].upper() + dob_parts['year_short'],
+        ])
+    if name_parts['last'] and dob_parts.get('year_short'):
+        specials.extend([
+            name_parts['last'] + dob_parts['year_short'],
+            name_parts['last_capital'] + dob_parts['year_short'],
+        ])
+    if specials:
+        plans.append(make_plan('extended', 0.7, weigh(specials)))
+
+    return plans
+
+
+def core_fields(data: dict) -> Dict[str, Tuple[str, ...]]:
+    """Name and year variants that profile fields are combined with"""
+    name_parts = data['name']
+    dob_parts = data['dob']
+    fields = {}
+    if name_parts['first']:
+        fields['first'] = (name_parts['first'], name_parts['first_capital'])
+    if name_parts['last']:
+        fields['last'] = (name_parts['last'], name_parts['last_capital'])
+    if dob_parts.get('year'):
+        fields['year'] = (dob_parts['year'], dob_parts['year_short'])
+    elif data.get('dob_range'):
+        fields['year'] = data['dob_range'].years() + data['dob_range'].year_shorts()
+    return fields
+
+
+def build_field_plans(data: dict, arity: int = DEFAULT_ARITY) -> Iterator[Plan]:
+    """Lazily yield a plan per ordered combination of up to `arity` fields using a profile field"""
+    custom = data.get('fields') or {}
+    if not custom:
+        return
+    fields = {**core_fields(data), **custom}
+    # Every plan shares these slot tuples, so plans cost a few references each
+    slots = {name: weigh(values) for name, values in fields.items()}
+    for size in range(1, arity + 1):
+        weight = FIELD_WEIGHT ** size
+        for names in permutations(fields, size):
+            # Combinations of core fields alone are covered by the pattern sets
+            if any(name in custom for name in names):
+                yield make_plan('fields', weight, *(slots[name] for name in names))
+
+
+def build_range_plans(data: dict) -> List[Plan]:
+    """Build plans for a date of birth known only as a range, every day a lazy slot value"""
+    dates: DateRange = data['dob_range']
+    names = collect_components(data)[0]
+    # The likelihood of a known date is spread across the days it could be
+    days = (UniformWeights(max(MIN_WEIGHT, 1.0 / dates.days), dates.days),)
+    plans = [make_plan('dates', 0.7, (dates.slot(form),) + days) for form in DAY_FORMS]
+    if names:
+        years = weigh(dates.years() + dates.year_shorts())
+        plans.append(make_plan('dates', 0.9, weigh(names), years))
+        plans.append(make_plan(
+            'dates', 0.6,
+            weigh(names),
+            weigh(SEPARATORS[:3], SEPARATOR_WEIGHTS),
+            years,
+            weigh(SUFFIXES[:5], SUFFIX_WEIGHTS),
+        ))
+        plans.append(make_plan('dates', 0.5, weigh(names), weigh(dates.month_days())))
+        plans.append(make_plan('dates', 0.3, weigh(names), weigh(dates.month_days(day_first=True))))
+        for form in ('reversed', 'full'):
+            plans.append(make_plan('dates', 0.3, weigh(names), (dates.slot(form),) + days))
+    return plans
+
+
+def build_standard_plans(data: dict) -> List[Plan]:
+    """Build the simple and advanced plans used by the command line"""
+    return build_simple_plans(data) + build_advanced_plans(data)
+
+
+# Rules applied to base words by the standard variation stage
+STANDARD_RULESET = RuleSet(parse_rules(STANDARD_RULES).rules, weights=STANDARD_RULE_WEIGHTS)
+
+
+def iter_variations(pwd: str) -> Iterator[str]:
+    """Yield common variations of a password"""
+    return STANDARD_RULESET.iter_variations(pwd)
+
+
+# ===== Streaming Engine =====
+
+# Plan builder and variation stage per pattern set
+PATTERN_SETS = {
+    'standard': (build_standard_plans, STANDARD_RULESET),
+    'extended': (build_extended_plans, LeetExpander()),
+}
+
+
+class CandidateEngine:
+    """Streams candidates through the combination and variation stages"""
+
+    def __init__(self, dedup: bool = True, variations: bool = True, patterns: str = 'standard',
+                 rules: Optional[Union[RuleSet, LeetExpander]] = None,
+                 dedup_memory: int = DEFAULT_MEMORY_LIMIT, spill_dir: Optional[str] = None,
+                 policy: Optional[Policy] = None, stats: Optional[RunStats] = None,
+                 templates: Optional['TemplateSet'] = None, arity: int = DEFAULT_ARITY):
+        if patterns not in PATTERN_SETS:
+            raise ValueError(f"Unknown pattern set: {patterns}")
+        self.dedup = dedup
+        self.variations = variations
+        self.patterns = patterns
+        self.deduplicator = Deduplicator(memory_limit=dedup_memory, spill_dir=spill_dir)
+        self.policy = policy
+        self.policy_stats = new_policy_stats()
+        self.stats = stats
+        self.templates = templates
+        self.arity = arity
+        self.position = 0
+        self._run_plans: List[Plan] = []
+        self._build_plans, self.rules = PATTERN_SETS[patterns]
+        if rules is not None:
+            # A custom rule set or leet expander replaces the built-in variations
+            self.rules = rules
+        if templates is not None:
+            # Compiled templates replace the built-in combination patterns
+            self._build_plans = templates.build_plans
+
+    def build_plans(self, data: dict) -> List[Plan]:
+        """Build every combination plan for parsed information"""
+        plans = self._build_plans(data)
+        if self.templates is None and data.get('dob_range'):
+            plans = plans + build_range_plans(data)
+        if self.templates is None and data.get('fields'):
+            # Templates name the profile fields they use; otherwise fields are combined
+            plans = plans + list(build_field_plans(data, self.arity))
+        return plans
+
+    def _run_plans_for(self, data: dict) -> List[Plan]:
+        """Build the plans for a generation run, timed when stats are collected"""
+        if self.stats is None:
+            return self.build_plans(data)
+        return self.stats.call('plans', self.build_plans, data)
+
+    def iter_base(self, data: dict) -> Iterator[str]:
+        """Yield base words from the simple and advanced stages"""
+        if self.policy is not None:
+            # Skip combinations that no variation could turn into a passing candidate
+            effects = self.rules.effects() if self.variations else NO_EFFECTS
+            for plan in self._run_plans_for(data):
+                yield from iter_plan_pruned(plan.slots, self.policy, effects, self.policy_stats)
+            return
+        for plan in self._run_plans_for(data):
+            yield from iter_plan(plan)
+
+    def iter_indexed(self, data: dict, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """Yield base words by position in a fixed order, tracking the position reached"""
+        # Plans and their slots are built deterministically, so a position
+        # always names the same base word and can be jumped to directly
+        offset = 0
+        self._run_plans = self._run_plans_for(data)
+        effects = self.rules.effects() if self.variations else NO_EFFECTS
+        for plan in self._run_plans:
+            size = plan_size(plan.slots)
+            if stop is not None and offset >= stop:
+                break
+            if offset + size > start:
+                first = max(start - offset, 0)
+                self.position = offset + first
+                if self.policy is not None:
+                    # Pruned positions are skipped over but still counted
+                    last = None if stop is None else stop - offset
+                    for index, word in iter_plan_pruned_at(plan.slots, self.policy, effects,
+                                                           self.policy_stats, first, last):
+                        self.position = offset + index
+                        yield word
+                    offset += size
+                    continue
+                for word in iter_plan(plan, first):
+                    if stop is not None and self.position >= stop:
+                        return
+                    yield word
+                    self.position += 1
+            offset += size
+        self.position = offset if stop is None else min(offset, stop)
+
+    def progress(self) -> dict:
+        """Base words done so far, overall and per stage, in the indexed run in progress"""
+        stages: Dict[str, Tuple[int, int]] = {}
+        stage = None
+        offset = 0
+        for plan in self._run_plans:
+            size = plan_size(plan.slots)
+            done, total = stages.get(plan.stage, (0, 0))
+            stages[plan.stage] = (done + min(max(self.position - offset, 0), size), total + size)
+            if stage is None and self.position < offset + size:
+                stage = plan.stage
+            offset += size
+        return {'stage': stage, 'position': min(self.position, offset), 'total': offset, 'stages': stages}
+
+    def keyspace_size(self, data: dict) -> int:
+        """Number of base word positions available to iter_range"""
+        return sum(plan_size(plan.slots) for plan in self.build_plans(data))
+
+    def iter_candidates(self, data: dict) -> Iterator[str]:
+        """Yield candidates one at a time, optionally without duplicates"""
+        return self._iter_pipeline(self.iter_base(data))
+
+    def iter_range(self, data: dict, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """Yield the candidates of base word positions start to stop, in a fixed order"""
+        self.position = start
+        return self._iter_pipeline(self.iter_indexed(data, start, stop))
+
+    def _iter_pipeline(self, bases: Iterable[str]) -> Iterator[str]:
+        """Run base words through the variation, policy and dedup stages"""
+        vary = self.rules.session() if self.variations else None
+        self.policy_stats = new_policy_stats()
+        bases = self._timed(bases, 'base', 'plans')
+        candidates = self._timed(self._iter_expanded(bases, vary, unique_bases=self.dedup), 'variations', 'base')
+        upstream = 'variations'
+        if self.policy is not None:
+            candidates = self._timed(self.policy.filter(candidates, self.policy_stats), 'policy', upstream)
+            upstream = 'policy'
+        if self.dedup:
+            candidates = self._timed(self.deduplicator.filter(candidates), 'dedup', upstream)
+        if self.stats is not None:
+            candidates = self.stats.finishing(candidates)
+        return candidates
+
+    def _timed(self, stream: Iterable, stage: str, upstream: str) -> Iterable:
+        """Time and count a streaming stage when stats are collected, else pass it through"""
+        if self.stats is None:
+            return stream
+        return self.stats.wrap(stage, stream, upstream)
+
+    def _iter_expanded(self, bases: Iterable[str], vary, unique_bases: bool) -> Iterator[str]:
+        """Yield base words each followed by its variations"""
+        # Base words are far fewer than variations, so an exact set is kept for
+        # them even when the output deduplicator spills to disk
+        expanded = set()
+        for word in bases:
+            if unique_bases:
+                if word in expanded:
+                    continue
+                expanded.add(word)
+            yield word
+            if vary:
+                yield from vary(word)
+
+    def iter_ranked(self, data: dict) -> Iterator[Tuple[float, str]]:
+        """Yield (score, candidate) pairs in descending estimated likelihood"""
+        from .ranking import iter_ranked
+        vary = self.rules.ranked_session() if self.variations else None
+        self.policy_stats = new_policy_stats()
+        plans = self._run_plans_for(data)
+        keep = None
+        if self.policy is not None:
+            plans, keep = self._prune_ranked(plans)
+        ranked = self._timed(iter_ranked(plans, vary, dedup=self.dedup, keep=keep), 'ranking', None)
+        if self.policy is not None:
+            ranked = self._timed(self._filter_ranked(ranked), 'policy', 'ranking')
+        if self.stats is not None:
+            ranked = self.stats.finishing(ranked)
+        return ranked
+
+    def _prune_ranked(self, plans: List[Plan]) -> Tuple[List[Plan], Callable[[str], bool]]:
+        """Drop plans that can never pass the policy, and a check for base words that cannot"""
+        effects = self.rules.effects() if self.variations else NO_EFFECTS
+        policy = self.policy
+        stats = self.policy_stats
+        kept = []
+        for plan in plans:
+            if plan_reachable(plan.slots, policy, effects):
+                kept.append(plan)
+            else:
+                stats['pruned'] += plan_size(plan.slots)
+
+        def keep(word: str) -> bool:
+            # Best-first search still walks through a base word that cannot
+            # pass, since its successors may, but never yields or varies it
+            if policy.reachable(word, effects):
+                return True
+            stats['pruned'] += 1
+            return False
+
+        return kept, keep
+
+    def _filter_ranked(self, ranked: Iterator[Tuple[float, str]]) -> Iterator[Tuple[float, str]]:
+        """Drop ranked candidates that fail the policy"""
+        check = self.policy.check
+        stats = self.policy_stats
+        for score, word in ranked:
+            if check(word):
+                stats['passed'] += 1
+                yield score, word
+            else:
+                stats['filtered'] += 1
+
+    def iter_likely(self, data: dict) -> Iterator[str]:
+        """Yield candidates most likely first"""
+        for _, word in self.iter_ranked(data):
+            yield word
+
+    def count(self, data: dict) -> dict:
+        """Count candidates per stage without generating them, before any policy"""
+        from .keyspace import count_keyspace
+        return count_keyspace(self.build_plans(data), self.rules if self.variations else None)
+
+    def generate(self, name: str, dob: str, city: str, phone: str,
+                 fields: Optional[Dict[str, Union[str, int, Iterable[str]]]] = None) -> Iterator[str]:
+        """Parse information and stream its candidates"""
+        return self.iter_candidates(parse_profile(name, dob, city, phone, fields))
+
+
+def wordlist_header() -> str:
+    """Comment header written at the top of saved wordlists"""
+    return (
+        "# Password Dictionary Generated from Personal Information\n"
+        f"# Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        + "#" * 60 + "\n\n"
+    )
+
+
+def write_candidates(candidates: Iterable[str], f) -> int:
+    """Write candidates to an open text file as they arrive"""
+    count = 0
+    for pwd in candidates:
+        f.write(f"{pwd}\n")
+        count += 1
+        if count == 1:
+            # Make the first candidate visible immediately
+            f.flush()
+    return count
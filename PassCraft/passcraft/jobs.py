@@ -0,0 +1,134 @@
+"""
+PassCraft Jobs
+Single-worker scheduler for cancellable generation jobs with progress events
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Optional, Union
+
+from .engine import CandidateEngine
+from .results import ResultStore
+from .sinks import open_sink
+
+# Seconds between progress events sent by a running generation
+PROGRESS_INTERVAL = 0.05
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once it has been cancelled"""
+
+
+class Job:
+    """A unit of work with a cancel flag and a queue of events for the UI"""
+
+    def __init__(self, func: Callable[['Job'], object]):
+        self.func = func
+        self.events: queue.Queue = queue.Queue()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Ask the job to stop at its next check"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check(self):
+        """Raise JobCancelled if the job has been cancelled"""
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def report(self, kind: str, payload=None):
+        """Send an event to whoever is polling the job"""
+        self.events.put((kind, payload))
+
+
+class JobScheduler:
+    """Runs jobs one at a time on one worker thread; a new job cancels the running one"""
+
+    def __init__(self):
+        self._pending: queue.Queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self.current: Optional[Job] = None
+
+    def submit(self, func: Callable[[Job], object]) -> Job:
+        """Queue a job, cancelling any job that is still running or waiting"""
+        if self.current is not None:
+            self.current.cancel()
+        job = Job(func)
+        self.current = job
+        self._pending.put(job)
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name='passcraft-jobs', daemon=True)
+            self._worker.start()
+        return job
+
+    def cancel(self):
+        """Cancel the current job, if any"""
+        if self.current is not None:
+            self.current.cancel()
+
+    def shutdown(self):
+        """Cancel the current job and stop the worker"""
+        self.cancel()
+        self._pending.put(None)
+
+    def _run(self):
+        while True:
+            job = self._pending.get()
+            if job is None:
+                return
+            try:
+                job.check()
+                result = job.func(job)
+            except JobCancelled:
+                job.report('cancelled')
+            except Exception as e:
+                job.report('error', e)
+            else:
+                job.report('done', result)
+
+
+def generation_job(engine: CandidateEngine, data: dict) -> Callable[[Job], ResultStore]:
+    """Build a job that streams candidates into a ResultStore, reporting progress"""
+    def run(job: Job) -> ResultStore:
+        store = ResultStore()
+        append = store.append
+        next_report = 0.0
+        for word in engine.iter_range(data):
+            # Checking per candidate keeps cancellation within milliseconds
+            job.check()
+            append(word)
+            now = time.monotonic()
+            if now >= next_report:
+                progress = engine.progress()
+                progress['count'] = len(store)
+                job.report('progress', progress)
+                next_report = now + PROGRESS_INTERVAL
+        progress = engine.progress()
+        progress['count'] = len(store)
+        job.report('progress', progress)
+        return store
+
+    return run
+
+
+def export_job(store: ResultStore, path: str, compression: Optional[str] = None,
+               header: Union[bool, str] = True) -> Callable[[Job], dict]:
+    """Build a job that writes a ResultStore to a file in large blocks, syncing it and replacing it atomically"""
+    def run(job: Job) -> dict:
+        sink = open_sink(path, compression, header=header, atomic=True, sync=True)
+        total = len(store)
+
+        def blocks():
+            for block in store.iter_blocks():
+                job.check()
+                yield block
+                job.report('progress', {'count': sink.count, 'total': total})
+
+        return sink.consume_blocks(blocks())
+
+    return run
@@ -0,0 +1,102 @@
+"""
+PassCraft Keyspace
+Counts candidates from plan sizes and slot statistics instead of enumerating them
+"""
+
+import random
+from collections import Counter
+from math import prod
+from typing import Callable, Dict, Hashable, Iterable, List, Sequence, Tuple
+
+# Words drawn per plan when a variation stage can only be estimated
+SAMPLE_SIZE = 64
+
+
+def plan_size(slots: Sequence[Sequence[str]]) -> int:
+    """Number of words in a cross product of slots"""
+    return prod(len(values) for values in slots) if slots else 0
+
+
+def count_product(slots: Sequence[Sequence[str]], feature: Callable[[str], Hashable],
+                  start: Hashable, step: Callable[[Hashable, Hashable], Hashable]) -> Dict[Hashable, int]:
+    """Count the words of a cross product by state, one slot at a time"""
+    # Values are reduced to features first, so the work depends on the
+    # number of distinct states rather than on the size of the product
+    states = {start: 1} if slots else {}
+    for values in slots:
+        features = Counter(feature(value) for value in values)
+        merged: Dict[Hashable, int] = {}
+        for state, count in states.items():
+            for value_feature, value_count in features.items():
+                key = step(state, value_feature)
+                merged[key] = merged.get(key, 0) + count * value_count
+        states = merged
+    return states
+
+
+def sample_words(slots: Sequence[Sequence[str]], size: int = SAMPLE_SIZE) -> List[str]:
+    """Every word of a small product, or a reproducible uniform sample of a large one"""
+    total = plan_size(slots)
+    rng = random.Random(total)
+    if total <= size:
+        indexes: Iterable[int] = range(total)
+    else:
+        indexes = (rng.randrange(total) for _ in range(size))
+    words = []
+    for index in indexes:
+        parts = []
+        for values in reversed(slots):
+            index, position = divmod(index, len(values))
+            parts.append(values[position])
+        words.append("".join(reversed(parts)))
+    return words
+
+
+def estimate_product(slots: Sequence[Sequence[str]], count_word: Callable[[str], int]) -> Tuple[int, bool]:
+    """Sum a per-word count over a product, exactly when it is small enough to walk"""
+    total = plan_size(slots)
+    words = sample_words(slots)
+    counted = sum(count_word(word) for word in words)
+    if len(words) == total:
+        return counted, True
+    return round(counted * total / len(words)), False
+
+
+def count_keyspace(plans, vary=None) -> dict:
+    """Exact pre-dedup counts per stage and a dedup-aware estimate of the output"""
+    stages: Dict[str, Dict[str, int]] = {}
+    plans = [plan for plan in plans if plan.slots and all(plan.slots)]
+    variation_counts = vary.count_variations([plan.slots for plan in plans]) if vary else []
+    exact = True
+    base = variations = 0
+    distinct_plans = {}
+    for index, plan in enumerate(plans):
+        size = plan_size(plan.slots)
+        varied, varied_exact = variation_counts[index] if vary else (0, True)
+        exact = exact and varied_exact
+        stage = stages.setdefault(plan.stage, {'plans': 0, 'base': 0, 'variations': 0})
+        stage['plans'] += 1
+        stage['base'] += size
+        stage['variations'] += varied
+        base += size
+        variations += varied
+
+        # Repeated slot values and plans repeated across stages are the main
+        # source of duplicates, and both are visible without enumerating
+        # Lazy slots, such as the days of a date range, hold distinct values already
+        key = tuple(frozenset(values) if isinstance(values, tuple) else values for values in plan.slots)
+        distinct = plan_size(key)
+        if key not in distinct_plans:
+            distinct_plans[key] = (distinct, varied * distinct // size)
+
+    unique_base = sum(distinct for distinct, _ in distinct_plans.values())
+    unique_variations = sum(varied for _, varied in distinct_plans.values())
+    return {
+        'plans': len(plans),
+        'stages': stages,
+        'base': base,
+        'variations': variations,
+        'total': base + variations,
+        'unique_estimate': unique_base + unique_variations,
+        'exact': exact,
+    }
@@ -0,0 +1,146 @@
+"""
+PassCraft Leetspeak Expansion
+Enumerates every subset of leetspeak substitutions with bitmasks
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .keyspace import count_product
+from .policy import Effects, class_mask
+
+# Leet speak substitutions, shared with the web version (v1/data.js)
+LEET_SUBSTITUTIONS = {
+    'a': '4', 'A': '4',
+    'e': '3', 'E': '3',
+    'i': '1', 'I': '1',
+    'o': '0', 'O': '0',
+    's': '5', 'S': '5',
+    't': '7', 'T': '7',
+    'b': '8', 'B': '8',
+    'g': '9', 'G': '9'
+}
+
+# Likelihood kept per substitution, used for best-first order
+SUBSTITUTION_WEIGHT = 0.3
+
+
+def iter_masks(bits: int) -> Iterator[int]:
+    """Yield every non-empty mask of `bits` bits, fewest bits set first"""
+    full = 1 << bits
+    for ones in range(1, bits + 1):
+        # Gosper's hack walks the masks with `ones` bits set in increasing order
+        mask = (1 << ones) - 1
+        while mask < full:
+            yield mask
+            low = mask & -mask
+            ripple = mask + low
+            mask = (((ripple ^ mask) >> 2) // low) | ripple
+
+
+class LeetExpander:
+    """Lazily expands words into every combination of leetspeak substitutions"""
+
+    def __init__(self, table: Optional[Dict[str, str]] = None,
+                 per_word: Optional[int] = 32, total: Optional[int] = 10000):
+        self.table = dict(LEET_SUBSTITUTIONS if table is None else table)
+        self.per_word = per_word
+        self.total = total
+
+    def positions(self, word: str) -> List[Tuple[int, str]]:
+        """Return the substitutable positions of a word and their replacements"""
+        table = self.table
+        return [(i, table[ch]) for i, ch in enumerate(word) if ch in table and table[ch] != ch]
+
+    def effects(self) -> Effects:
+        """Substitutions replace characters without changing length"""
+        return Effects(classes=class_mask("".join(self.table.values())), changes=True)
+
+    def count(self, word: str) -> int:
+        """Number of leet forms of a word before any budget is applied"""
+        return (1 << len(self.positions(word))) - 1
+
+    def count_variations(self, plans: Iterable[Sequence[Sequence[str]]]) -> List[Tuple[int, bool]]:
+        """Count (leet forms, exact) for each cross product of slots, within both budgets"""
+        # Substitutable positions add up across slots, so the products are
+        # counted by their total number of positions
+        remaining = self.total
+        counts = []
+        for slots in plans:
+            states = count_product(slots, lambda value: len(self.positions(value)), 0, int.__add__)
+            total = 0
+            for positions, words in states.items():
+                forms = (1 << positions) - 1
+                if self.per_word is not None:
+                    forms = min(forms, self.per_word)
+                total += forms * words
+            if remaining is not None:
+                total = min(total, remaining)
+                remaining -= total
+            counts.append((total, True))
+        return counts
+
+    def iter_forms(self, word: str, limit: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """Yield (substitution count, leet form) pairs in a deterministic order"""
+        positions = self.positions(word)
+        if not positions or limit == 0:
+            return
+        emitted = 0
+        for mask in iter_masks(len(positions)):
+            chars = list(word)
+            substitutions = 0
+            bit = 0
+            while mask:
+                if mask & 1:
+                    index, replacement = positions[bit]
+                    chars[index] = replacement
+                    substitutions += 1
+                mask >>= 1
+                bit += 1
+            yield substitutions, "".join(chars)
+            emitted += 1
+            if emitted == limit:
+                return
+
+    def expand(self, word: str, limit: Optional[int] = None) -> Iterator[str]:
+        """Yield leet forms of a word in a deterministic order"""
+        for _, leet in self.iter_forms(word, limit):
+            yield leet
+
+    def iter_variations(self, word: str) -> Iterator[str]:
+        """Yield leet forms of a word within the per-word budget"""
+        return self.expand(word, self.per_word)
+
+    def session(self) -> Callable[[str], Iterator[str]]:
+        """Return a variation stage that also enforces the global budget"""
+        if self.total is None:
+            return self.iter_variations
+        remaining = self.total
+
+        def vary(word: str) -> Iterator[str]:
+            nonlocal remaining
+            if remaining <= 0:
+                return
+            limit = remaining if self.per_word is None else min(remaining, self.per_word)
+            for leet in self.expand(word, limit):
+                remaining -= 1
+                yield leet
+
+        return vary
+
+    def ranked_session(self) -> Callable[[str], Iterator[Tuple[float, str]]]:
+        """Return a weighted variation stage, fewest substitutions first"""
+        remaining = self.total
+
+        def vary(word: str) -> Iterator[Tuple[float, str]]:
+            nonlocal remaining
+            limit = self.per_word
+            if remaining is not None:
+                if remaining <= 0:
+                    return
+                limit = remaining if limit is None else min(remaining, limit)
+            for substitutions, leet in self.iter_forms(word, limit):
+                if remaining is not None:
+                    remaining -= 1
+                yield SUBSTITUTION_WEIGHT ** substitutions, leet
+
+        return vary
@@ -0,0 +1,333 @@
+"""
+PassCraft Membership Oracle
+Decides whether a password is one the engine would generate, without enumerating candidates
+"""
+
+from math import comb
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from .engine import CandidateEngine, Plan, iter_plan
+from .leet import LeetExpander
+from .rules import CHARWISE, LENGTH_CHECKS, Rule, RuleSet, compile_ops, parse_ops
+
+# Slot values by length, for matching a slice of a password in one lookup
+ByLength = Dict[int, Set[str]]
+
+# Slot values by length and leet-folded form, with their position in the slot
+LeetIndex = Dict[int, Dict[str, List[Tuple[int, str]]]]
+
+
+def by_length(values) -> ByLength:
+    """Group slot values by length"""
+    groups: ByLength = {}
+    for value in values:
+        groups.setdefault(len(value), set()).add(value)
+    return groups
+
+
+def leet_fold(table: Dict[str, str]) -> Dict[int, str]:
+    """Translation table sending every character of a group linked by substitutions to one of them"""
+    groups: Dict[str, str] = {}
+
+    def find(ch: str) -> str:
+        while groups.get(ch, ch) != ch:
+            ch = groups[ch]
+        return ch
+
+    for ch, replacement in table.items():
+        if len(replacement) == 1:
+            groups[find(ch)] = find(replacement)
+    return str.maketrans({ch: find(ch) for ch in groups})
+
+
+def tail_ops(ops: Tuple[Tuple[str, tuple], ...]) -> Tuple[Tuple[str, tuple], ...]:
+    """The same operations seen by a part after the start of the word, where capitalizing becomes lowercasing"""
+    return tuple(({'c': 'l', 'C': 'u'}.get(op, op), args) for op, args in ops)
+
+
+def _compile(ops: Tuple[Tuple[str, tuple], ...]) -> Callable[[str], str]:
+    return compile_ops([(op, dict(args)) for op, args in ops], 'oracle')
+
+
+class AffixRule:
+    """A rule reduced to literal prefix + character-wise transform of the base word + literal suffix"""
+
+    __slots__ = ('rule', 'prefix', 'ops', 'suffix', 'gates')
+
+    def __init__(self, rule: Rule, prefix: str, ops: tuple, suffix: str, gates: list):
+        self.rule = rule
+        self.prefix = prefix
+        self.ops = ops
+        self.suffix = suffix
+        self.gates = gates
+
+    def middle(self, password: str) -> Optional[str]:
+        """The transformed base word a password would need, or None if the affixes or checks rule it out"""
+        prefix, suffix = self.prefix, self.suffix
+        if len(password) <= len(prefix) + len(suffix):
+            return None
+        if not (password.startswith(prefix) and password.endswith(suffix)):
+            return None
+        middle = password[len(prefix):len(password) - len(suffix)]
+        for check, n, extra in self.gates:
+            if not check(len(middle) + extra, n):
+                return None
+        return middle
+
+
+def affix_rule(rule: Rule, ops: List[Tuple[str, dict]]) -> Optional[AffixRule]:
+    """Reduce a rule of case, substitution, append, prepend and length check operations, if it is one"""
+    prefix = suffix = ""
+    word_ops = []
+    gates = []
+    for op, args in ops:
+        key = (op, tuple(sorted(args.items())))
+        if op == ':':
+            continue
+        if op in LENGTH_CHECKS:
+            # Checked against the base word's length plus the affixes added so far
+            gates.append((LENGTH_CHECKS[op], args['N'], len(prefix) + len(suffix)))
+        elif op == '$':
+            suffix += args['X']
+        elif op == '^':
+            prefix = args['X'] + prefix
+        elif op in CHARWISE:
+            tail = tail_ops((key,))
+            if prefix:
+                prefix = _compile((key,))(prefix)
+                word_ops.extend(tail)
+            else:
+                word_ops.append(key)
+            suffix = _compile(tail)(suffix)
+        else:
+            return None
+    return AffixRule(rule, prefix, tuple(word_ops), suffix, gates)
+
+
+def mask_rank(mask: int, bits: int) -> int:
+    """Position of a mask in iter_masks order: fewest bits first, then increasing value"""
+    ones = bin(mask).count('1')
+    rank = sum(comb(bits, k) for k in range(1, ones))
+    # Masks with the same number of bits follow the combinatorial number system
+    index = 0
+    position = 0
+    while mask:
+        if mask & 1:
+            index += 1
+            rank += comb(position, index)
+        mask >>= 1
+        position += 1
+    return rank
+
+
+class MembershipOracle:
+    """Answers whether the engine would emit a password for one profile in stream order"""
+
+    def __init__(self, engine: CandidateEngine, data: dict):
+        self.engine = engine
+        self.policy = engine.policy
+        self.plans: List[Plan] = [plan for plan in engine.build_plans(data) if plan.slots and all(plan.slots)]
+        self._bounds = [(sum(min(map(len, values)) for values in plan.slots),
+                         sum(max(map(len, values)) for values in plan.slots)) for plan in self.plans]
+        # Matching transforms slot values one at a time; non-ASCII case mappings
+        # can depend on neighbouring characters, so those plans are enumerated
+        self._ascii = [all(value.isascii() for values in plan.slots for value in values) for plan in self.plans]
+        self._slots: Dict[tuple, Tuple[ByLength, ByLength]] = {}
+        self._leet_slots: Dict[int, LeetIndex] = {}
+        self._funcs: Dict[tuple, Callable[[str], str]] = {}
+
+        self.affixes: List[AffixRule] = []
+        self.leet: Optional[LeetExpander] = None
+        self._fold: Dict[int, str] = {}
+        self._remaining: Optional[Dict[str, int]] = None
+        slow: List[Callable[[str], Optional[str]]] = []
+        rules = engine.rules if engine.variations else None
+        if isinstance(rules, LeetExpander):
+            self.leet = rules
+            self._fold = leet_fold(rules.table)
+            if rules.total is not None:
+                self._remaining = self._leet_budgets(data)
+        elif isinstance(rules, RuleSet):
+            for rule in rules:
+                affix = affix_rule(rule, parse_ops(rule.text))
+                if affix is None:
+                    slow.append(rule.func)
+                else:
+                    self.affixes.append(affix)
+        self._enumerated = self._enumerate(slow)
+        if any(self._matches(plan, "", ()) for plan in self.plans):
+            # An empty base word has no middle for the affix matcher to find
+            for func in [affix.rule.func for affix in self.affixes] + slow:
+                out = func("")
+                if out:
+                    self._enumerated.add(out)
+
+    def _enumerate(self, slow: List[Callable[[str], Optional[str]]]) -> Set[str]:
+        """Outputs the matcher cannot derive: rules outside its grammar, and case rules on non-ASCII plans"""
+        outputs: Set[str] = set()
+        transforming = [affix.rule.func for affix in self.affixes if affix.ops]
+        for plan, ascii_only in zip(self.plans, self._ascii):
+            funcs = slow if ascii_only else slow + transforming
+            if not funcs:
+                continue
+            for word in iter_plan(plan):
+                for func in funcs:
+                    out = func(word)
+                    if out is not None and out != word:
+                        outputs.add(out)
+        return outputs
+
+    def _leet_budgets(self, data: dict) -> Dict[str, int]:
+        """Forms left in the run's leet budget when each base word is first expanded"""
+        leet = self.leet
+        remaining = leet.total
+        budgets = {}
+        for word in self.engine.iter_base(data):
+            if remaining <= 0:
+                break
+            first = word not in budgets
+            if not first and self.engine.dedup:
+                continue
+            # Without dedup a repeated base word is expanded again, using more of the budget
+            if first:
+                budgets[word] = remaining
+            limit = remaining if leet.per_word is None else min(remaining, leet.per_word)
+            remaining -= min(leet.count(word), limit)
+        return budgets
+
+    def _slot(self, values: tuple, ops: tuple) -> Tuple[ByLength, ByLength]:
+        """Slot values after a transform, as the first part of a word and as a later part"""
+        key = (id(values), ops)
+        cached = self._slots.get(key)
+        if cached is None:
+            if ops:
+                head, tail = self._compiled(ops), self._compiled(tail_ops(ops))
+                cached = (by_length(map(head, values)), by_length(map(tail, values)))
+            else:
+                groups = by_length(values)
+                cached = (groups, groups)
+            self._slots[key] = cached
+        return cached
+
+    def _compiled(self, ops: tuple) -> Callable[[str], str]:
+        func = self._funcs.get(ops)
+        if func is None:
+            func = self._funcs[ops] = _compile(ops)
+        return func
+
+    def _matches(self, plan: Plan, word: str, ops: tuple) -> bool:
+        """Whether a word is the transform of some candidate of a plan"""
+        positions = {0}
+        end = len(word)
+        for values in plan.slots:
+            head, tail = self._slot(values, ops)
+            reached = set()
+            for position in positions:
+                for length, group in (head if position == 0 else tail).items():
+                    if position + length <= end and word[position:position + length] in group:
+                        reached.add(position + length)
+            if not reached:
+                return False
+            positions = reached
+        return end in positions
+
+    def _plans_for(self, length: int, ascii_only: bool = False) -> Iterator[Plan]:
+        """Plans whose candidates can have a length, skipping non-ASCII ones for case transforms"""
+        for plan, (low, high), is_ascii in zip(self.plans, self._bounds, self._ascii):
+            if low <= length <= high and (is_ascii or not ascii_only):
+                yield plan
+
+    def base_plan(self, word: str, ops: tuple = ()) -> Optional[Plan]:
+        """The first plan with a candidate whose transform is the word"""
+        for plan in self._plans_for(len(word), ascii_only=bool(ops)):
+            if self._matches(plan, word, ops):
+                return plan
+        return None
+
+    def _leet_slot(self, values) -> LeetIndex:
+        """Slot values indexed by length and leet-folded form, so a slice of a password finds its matches in one lookup"""
+        index = self._leet_slots.get(id(values))
+        if index is None:
+            index = self._leet_slots[id(values)] = {}
+            fold = self._fold
+            for position, value in enumerate(values):
+                index.setdefault(len(value), {}).setdefault(value.translate(fold), []).append((position, value))
+        return index
+
+    def _iter_leet_bases(self, plan: Plan, password: str) -> Iterator[str]:
+        """Candidates of a plan that match the password up to leet substitutions"""
+        table = self.leet.table
+        fold = self._fold
+        slots = [self._leet_slot(values) for values in plan.slots]
+        end = len(password)
+
+        def fits(value: str, position: int) -> bool:
+            for offset, ch in enumerate(value):
+                target = password[position + offset]
+                if target != ch and target != table.get(ch):
+                    return False
+            return True
+
+        def walk(depth: int, position: int, prefix: str) -> Iterator[str]:
+            if depth == len(slots):
+                if position == end:
+                    yield prefix
+                return
+            # A substitution maps a character within its folded group, so only
+            # values folding to the same form as the slice can match it; they
+            # are tried in slot order, as enumerating the plan would
+            matches = []
+            for length, group in slots[depth].items():
+                if position + length <= end:
+                    matches.extend(group.get(password[position:position + length].translate(fold), ()))
+            matches.sort()
+            for _, value in matches:
+                if fits(value, position):
+                    yield from walk(depth + 1, position + len(value), prefix + value)
+
+        yield from walk(0, 0, "")
+
+    def _leet_source(self, password: str) -> Optional[Tuple[Plan, str]]:
+        """A plan and base word the leet stage turns into the password within its budgets"""
+        leet = self.leet
+        for plan in self._plans_for(len(password)):
+            for base in self._iter_leet_bases(plan, password):
+                positions = leet.positions(base)
+                # The substituted positions form the mask the expander enumerates
+                mask = 0
+                for bit, (index, replacement) in enumerate(positions):
+                    if password[index] != base[index]:
+                        mask |= 1 << bit
+                if not mask:
+                    continue
+                limit = leet.per_word
+                if self._remaining is not None:
+                    remaining = self._remaining.get(base, 0)
+                    limit = remaining if limit is None else min(limit, remaining)
+                if limit is None or mask_rank(mask, len(positions)) < limit:
+                    return plan, base
+        return None
+
+    def explain(self, password: str) -> Optional[dict]:
+        """Describe how the engine generates a password, or None if it never does"""
+        if self.policy is not None and not self.policy.check(password):
+            return None
+        plan = self.base_plan(password)
+        if plan is not None:
+            return {'stage': plan.stage, 'variation': None}
+        for affix in self.affixes:
+            middle = affix.middle(password)
+            if middle is not None:
+                plan = self.base_plan(middle, affix.ops)
+                if plan is not None:
+                    return {'stage': plan.stage, 'variation': affix.rule.text}
+        if self.leet is not None:
+            source = self._leet_source(password)
+            if source is not None:
+                return {'stage': source[0].stage, 'variation': 'leet', 'base': source[1]}
+        if password in self._enumerated:
+            return {'stage': None, 'variation': None}
+        return None
+
+    def __contains__(self, password: str) -> bool:
+        return self.explain(password) is not None
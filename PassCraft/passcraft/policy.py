@@ -0,0 +1,258 @@
+"""
+PassCraft Password Policies
+Checks target password policies and prunes combinations that can never pass
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Character class bits
+LOWER = 1
+UPPER = 2
+DIGIT = 4
+SPECIAL = 8
+ALL_CLASSES = LOWER | UPPER | DIGIT | SPECIAL
+
+CLASS_NAMES = {'lower': LOWER, 'upper': UPPER, 'digit': DIGIT, 'special': SPECIAL}
+
+
+def class_mask(text: str) -> int:
+    """Character classes present in a string"""
+    mask = 0
+    for ch in text:
+        if ch.islower():
+            mask |= LOWER
+        elif ch.isupper():
+            mask |= UPPER
+        elif ch.isdigit():
+            mask |= DIGIT
+        else:
+            mask |= SPECIAL
+        if mask == ALL_CLASSES:
+            break
+    return mask
+
+
+class Effects(NamedTuple):
+    """What a variation stage can do to a base word, for safe pruning"""
+    mult: int = 1          # Output length is at most mult * length + add
+    add: int = 0
+    shrink: bool = False   # May remove characters
+    classes: int = 0       # Character classes it may introduce
+    changes: bool = False  # May replace existing characters
+
+    def combine(self, other: 'Effects') -> 'Effects':
+        """Effects of either stage, whichever is looser"""
+        return Effects(max(self.mult, other.mult), max(self.add, other.add),
+                       self.shrink or other.shrink, self.classes | other.classes,
+                       self.changes or other.changes)
+
+
+NO_EFFECTS = Effects()
+
+
+class Policy:
+    """Constraints a candidate must satisfy to be emitted"""
+
+    def __init__(self, min_length: int = 0, max_length: Optional[int] = None,
+                 require: Iterable[str] = (), min_classes: int = 0,
+                 banned: str = "", pattern: Optional[str] = None):
+        unknown = [name for name in require if name not in CLASS_NAMES]
+        if unknown:
+            raise ValueError(f"Unknown character class: {', '.join(unknown)}")
+        self.min_length = min_length
+        self.max_length = max_length
+        self.require = 0
+        for name in require:
+            self.require |= CLASS_NAMES[name]
+        self.min_classes = min_classes
+        self.banned = frozenset(banned)
+        self.pattern = re.compile(pattern) if pattern else None
+
+    def check(self, word: str) -> bool:
+        """True when a candidate satisfies the policy"""
+        length = len(word)
+        if length < self.min_length:
+            return False
+        if self.max_length is not None and length > self.max_length:
+            return False
+        if self.require or self.min_classes:
+            mask = class_mask(word)
+            if mask & self.require != self.require:
+                return False
+            if bin(mask).count('1') < self.min_classes:
+                return False
+        if self.banned and not self.banned.isdisjoint(word):
+            return False
+        if self.pattern is not None and not self.pattern.search(word):
+            return False
+        return True
+
+    def filter(self, candidates: Iterable[str], stats: Dict[str, int]) -> Iterator[str]:
+        """Yield candidates that pass, counting those filtered out"""
+        check = self.check
+        for word in candidates:
+            if check(word):
+                stats['passed'] += 1
+                yield word
+            else:
+                stats['filtered'] += 1
+
+    def reachable(self, word: str, effects: Effects) -> bool:
+        """True when a base word, or some variation of it, could pass"""
+        length = len(word)
+        if effects.mult * length + effects.add < self.min_length:
+            return False
+        if not effects.shrink and self.max_length is not None and length > self.max_length:
+            return False
+        if self.require or self.min_classes:
+            mask = class_mask(word) | effects.classes
+            if mask & self.require != self.require:
+                return False
+            if bin(mask).count('1') < self.min_classes:
+                return False
+        if self.banned and not (effects.changes or effects.shrink) and not self.banned.isdisjoint(word):
+            return False
+        return True
+
+
+def new_policy_stats() -> Dict[str, int]:
+    """Counters reported for a policy run"""
+    return {'pruned': 0, 'filtered': 0, 'passed': 0}
+
+
+def _plan_bounds(slots, policy: Policy, effects: Effects):
+    """Slot values that can still pass with their slot index, length and classes, and a check on partial combinations"""
+    # Slot values that can never pass are dropped up front when no variation can fix them
+    drop_banned = policy.banned and not (effects.changes or effects.shrink)
+    table = [[(n, value, len(value), class_mask(value)) for n, value in enumerate(values)
+              if not (drop_banned and not policy.banned.isdisjoint(value))]
+             for values in slots]
+    if not all(table):
+        return table, None, None
+
+    # Bounds on what the remaining slots can still contribute
+    depth = len(table)
+    suffix_min = [0] * (depth + 1)
+    suffix_max = [0] * (depth + 1)
+    suffix_classes = [0] * (depth + 1)
+    suffix_count = [1] * (depth + 1)
+    for i in range(depth - 1, -1, -1):
+        suffix_min[i] = suffix_min[i + 1] + min(length for _, _, length, _ in table[i])
+        suffix_max[i] = suffix_max[i + 1] + max(length for _, _, length, _ in table[i])
+        mask = 0
+        for _, _, _, value_mask in table[i]:
+            mask |= value_mask
+        suffix_classes[i] = suffix_classes[i + 1] | mask
+        suffix_count[i] = suffix_count[i + 1] * len(table[i])
+
+    min_length = policy.min_length
+    max_length = None if effects.shrink else policy.max_length
+    require = policy.require & ~effects.classes
+    min_classes = policy.min_classes
+    mult, add, added_classes = effects.mult, effects.add, effects.classes
+
+    def viable(index: int, length: int, mask: int) -> bool:
+        if mult * (length + suffix_max[index]) + add < min_length:
+            return False
+        if max_length is not None and length + suffix_min[index] > max_length:
+            return False
+        reachable = mask | suffix_classes[index]
+        if require and reachable & require != require:
+            return False
+        if min_classes and bin(reachable | added_classes).count('1') < min_classes:
+            return False
+        return True
+
+    return table, viable, suffix_count
+
+
+def iter_plan_pruned(slots, policy: Policy, effects: Effects, stats: Dict[str, int]) -> Iterator[str]:
+    """Yield a plan's combinations, skipping branches that can never pass the policy"""
+    depth = len(slots)
+    if not depth or not all(slots):
+        return
+
+    table, viable, suffix_count = _plan_bounds(slots, policy, effects)
+    before = 1
+    for values in slots:
+        before *= len(values)
+    if viable is None:
+        stats['pruned'] += before
+        return
+    stats['pruned'] += before - suffix_count[0]
+
+    def walk(index: int, prefix: str, length: int, mask: int) -> Iterator[str]:
+        if index == depth:
+            yield prefix
+            return
+        for _, value, value_length, value_mask in table[index]:
+            new_length = length + value_length
+            new_mask = mask | value_mask
+            if viable(index + 1, new_length, new_mask):
+                yield from walk(index + 1, prefix + value, new_length, new_mask)
+            else:
+                stats['pruned'] += suffix_count[index + 1]
+
+    if viable(0, 0, 0):
+        yield from walk(0, "", 0, 0)
+    else:
+        stats['pruned'] += suffix_count[0]
+
+
+def iter_plan_pruned_at(slots, policy: Policy, effects: Effects, stats: Dict[str, int],
+                        start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """Yield (position, combination) pairs of a plan from start to stop, skipping branches that can never pass"""
+    # Positions count every combination, pruned or not, so they match iter_plan's
+    depth = len(slots)
+    if not depth or not all(slots):
+        return
+    sizes = [1] * (depth + 1)
+    for i in range(depth - 1, -1, -1):
+        sizes[i] = sizes[i + 1] * len(slots[i])
+    if stop is None or stop > sizes[0]:
+        stop = sizes[0]
+    if start >= stop:
+        return
+
+    table, viable, _ = _plan_bounds(slots, policy, effects)
+    if viable is None or not viable(0, 0, 0):
+        stats['pruned'] += stop - start
+        return
+
+    def walk(index: int, prefix: str, length: int, mask: int, base: int) -> Iterator[Tuple[int, str]]:
+        if index == depth:
+            yield base, prefix
+            return
+        size = sizes[index + 1]
+        for n, value, value_length, value_mask in table[index]:
+            first = base + n * size
+            if first >= stop:
+                return
+            if first + size <= start:
+                continue
+            new_length = length + value_length
+            new_mask = mask | value_mask
+            if viable(index + 1, new_length, new_mask):
+                yield from walk(index + 1, prefix + value, new_length, new_mask, first)
+
+    # Whatever falls between two yielded positions was pruned
+    expected = start
+    for position, word in walk(0, "", 0, 0, 0):
+        stats['pruned'] += position - expected
+        expected = position + 1
+        yield position, word
+    stats['pruned'] += stop - expected
+
+
+def plan_reachable(slots, policy: Policy, effects: Effects) -> bool:
+    """True when some combination of a plan could still pass the policy"""
+    if not slots or not all(slots):
+        return False
+    _, viable, _ = _plan_bounds(slots, policy, effects)
+    return viable is not None and viable(0, 0, 0)
+
+
+def parse_require(text: str) -> List[str]:
+    """Parse a comma separated list of character classes"""
+    return [name.strip() for name in text.split(',') if name.strip()]
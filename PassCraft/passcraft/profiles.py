@@ -0,0 +1,291 @@
+"""
+PassCraft Profile Parsing
+Parses many profile records at once, detecting each column's date format a single time
+"""
+
+import time
+from datetime import date
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .dates import DateRange
+from .engine import (
+    CORE_FIELDS, DATE_FORMATS, FIELD_TYPES, DateFormat, clean_input, extract_parts, match_date, number_variants,
+    parse_city, parse_dob_range, parse_field_key, parse_phone, profile_fields,
+)
+
+# Records read before the date formats are fixed
+DETECT_SAMPLE = 1000
+
+# Distinct values remembered per column; the cache starts over once it is full
+CACHE_LIMIT = 100000
+
+# Issues kept as examples for the report; all of them are counted
+ISSUE_LIMIT = 1000
+
+# Value types a profile entry can hold, alone or in a list for a typed field
+SCALARS = (str, int, float)
+
+
+class ProfileIssue(NamedTuple):
+    """A profile entry that could not be parsed, and why"""
+    row: int
+    id: str
+    field: str
+    reason: str
+
+
+class DateColumn:
+    """Dates of one column, tried in the column's detected format first"""
+
+    def __init__(self):
+        self.format: Optional[DateFormat] = None
+        self.order: List[DateFormat] = DATE_FORMATS
+        self._cache: Dict[str, dict] = {}
+
+    def detect(self, values: Iterable[str]) -> Optional[DateFormat]:
+        """Pick the format matching most sample values; ties go to parse_dob's order"""
+        texts = [clean_input(value) for value in values if value]
+        best, best_count = None, 0
+        for fmt in DATE_FORMATS:
+            count = sum(1 for text in texts if match_date(text, fmt))
+            if count > best_count:
+                best, best_count = fmt, count
+        if best is not None:
+            self.format = best
+            # A day-first column reads 03/04/1990 as the 3rd of April, not March 4th
+            self.order = [best] + [fmt for fmt in DATE_FORMATS if fmt is not best]
+            self._cache.clear()
+        return best
+
+    def parse(self, value: str) -> dict:
+        """Date parts of a value, or {} when no format matches"""
+        parts = self._cache.get(value)
+        if parts is None:
+            text = clean_input(value)
+            for fmt in self.order:
+                parts = match_date(text, fmt)
+                if parts:
+                    break
+            if len(self._cache) >= CACHE_LIMIT:
+                self._cache.clear()
+            self._cache[value] = parts
+        return parts
+
+
+def _miss(cache: dict, value, parse: Callable):
+    """Parse a value missing from a per-column cache and remember it"""
+    if len(cache) >= CACHE_LIMIT:
+        cache.clear()
+    result = cache[value] = parse(str(value))
+    return result
+
+
+class ProfileParser:
+    """Parses profile records in bulk, caching repeated values and collecting issues"""
+
+    def __init__(self, sample: int = DETECT_SAMPLE):
+        self.sample = sample
+        self.dates: Dict[str, DateColumn] = {'dob': DateColumn()}
+        self._names: Dict[str, dict] = {}
+        self._cities: Dict[str, dict] = {}
+        self._phones: Dict[str, dict] = {}
+        self._ranges: Dict[str, Union[DateRange, str]] = {}
+        # Age brackets are counted back from the day the run started
+        self.today = date.today()
+        self._keys: Dict[str, Union[Tuple[str, str], str]] = {}
+        self._layouts: Dict[tuple, Tuple[List[tuple], bool]] = {}
+        self._values: Dict[str, Dict[object, Tuple[Tuple[str, ...], str]]] = {}
+        self.count = 0
+        self.seconds = 0.0
+        self.issues: List[ProfileIssue] = []
+        self.issue_count = 0
+
+    def detect(self, profiles: List[dict]):
+        """Fix the date format of the dob column and of every date-typed field from sample records"""
+        columns: Dict[str, List[str]] = {'dob': []}
+        for profile in profiles:
+            if not isinstance(profile, dict):
+                continue
+            columns['dob'].append(str(profile.get('dob') or ""))
+            for key, value in profile_fields(profile).items():
+                field = self._field_key(key)
+                if isinstance(field, tuple) and field[1] == 'date':
+                    values = value if isinstance(value, list) else [value]
+                    columns.setdefault(key, []).extend(str(item) for item in values)
+        for column, values in columns.items():
+            self.dates.setdefault(column, DateColumn()).detect(values)
+
+    def _field_key(self, key) -> Union[Tuple[str, str], str]:
+        """Name and type of a field column, or why the column cannot be used"""
+        field = self._keys.get(key)
+        if field is None:
+            if key is None:
+                # csv.DictReader files the values of a row longer than the header under None
+                field = "more values than column headers"
+            elif not isinstance(key, str):
+                field = f"invalid field name {key!r}"
+            else:
+                try:
+                    field = parse_field_key(key)
+                except ValueError as e:
+                    field = str(e)
+            self._keys[key] = field
+        return field
+
+    def _issue(self, row: int, profile: dict, field: str, reason: str):
+        self.issue_count += 1
+        if len(self.issues) < ISSUE_LIMIT:
+            self.issues.append(ProfileIssue(row, str(profile.get('id') or ""), field, reason))
+
+    def parse(self, profile: dict, row: int = 0) -> dict:
+        """Parse one record into the component tables parse_profile returns"""
+        start = time.perf_counter()
+        get = profile.get
+        name, dob, city, phone = get('name') or "", get('dob') or "", get('city') or "", get('phone') or ""
+        if not (type(name) is str and type(dob) is str and type(city) is str and type(phone) is str):
+            name, dob, city, phone = (self._scalar(row, profile, field, value)
+                                      for field, value in zip(CORE_FIELDS, (name, dob, city, phone)))
+        # Repeated values share one parsed table; the engine only reads them
+        name_parts = self._names.get(name)
+        if name_parts is None:
+            name_parts = _miss(self._names, name, extract_parts)
+        city_parts = self._cities.get(city)
+        if city_parts is None:
+            city_parts = _miss(self._cities, city, parse_city)
+        phone_parts = self._phones.get(phone)
+        if phone_parts is None:
+            phone_parts = _miss(self._phones, phone, parse_phone)
+        dob_parts = self.dates['dob'].parse(str(dob)) if dob else {}
+        dob_range = None
+        if dob and not dob_parts:
+            dob_range = self._ranges.get(dob)
+            if dob_range is None:
+                dob_range = _miss(self._ranges, dob, self._parse_range)
+            if isinstance(dob_range, str):
+                self._issue(row, profile, 'dob', dob_range)
+                dob_range = None
+        fields = self._parse_fields(profile, row)
+        if phone and not phone_parts:
+            self._issue(row, profile, 'phone', f"no digits in {phone!r}")
+        if not (name_parts['first'] or dob_parts or dob_range or city_parts or phone_parts or fields):
+            self._issue(row, profile, '', "no usable fields")
+        self.count += 1
+        self.seconds += time.perf_counter() - start
+        return {'name': name_parts, 'dob': dob_parts, 'dob_range': dob_range, 'city': city_parts,
+                'phone': phone_parts, 'fields': fields}
+
+    def _scalar(self, row: int, profile: dict, field: str, value) -> Union[str, int, float]:
+        """A core field's value, or "" with an issue when it is an object or a list"""
+        if isinstance(value, SCALARS):
+            return value
+        self._issue(row, profile, field, f"expected text or a number, got {type(value).__name__}")
+        return ""
+
+    def _parse_range(self, dob: str) -> Union[DateRange, str]:
+        """A partial date of birth as a range, or why it is not a date"""
+        try:
+            return parse_dob_range(dob, self.today) or f"unrecognized date {dob!r}"
+        except ValueError as e:
+            return str(e)
+
+    def _layout(self, keys: Tuple[str, ...]) -> Tuple[List[tuple], bool]:
+        """Typed field columns of a record layout as (key, name, type, error), and whether names repeat"""
+        columns = []
+        for key in keys:
+            if key in CORE_FIELDS or key == 'id':
+                continue
+            field = self._field_key(key)
+            if isinstance(field, str):
+                columns.append((key, "", "", field))
+            else:
+                columns.append((key, field[0], field[1], ""))
+        names = [column[1] for column in columns if not column[3]]
+        return columns, len(set(names)) < len(names)
+
+    def _parse_fields(self, profile: dict, row: int) -> Dict[str, Tuple[str, ...]]:
+        """Variants of the typed fields, merged as parse_fields merges them"""
+        keys = tuple(profile)
+        layout = self._layouts.get(keys)
+        if layout is None:
+            layout = self._layouts[keys] = self._layout(keys)
+        columns, repeated = layout
+        parsed: Dict[str, Tuple[str, ...]] = {}
+        for key, name, kind, error in columns:
+            value = profile[key]
+            if value in (None, "", []):
+                continue
+            if error:
+                self._issue(row, profile, key, error)
+                continue
+            if isinstance(value, list):
+                variants = []
+                for item in value:
+                    if isinstance(item, SCALARS):
+                        variants.extend(self._variants(key, kind, item, row, profile))
+                    else:
+                        self._issue(row, profile, key, f"expected text or a number in the list, got {type(item).__name__}")
+            elif not isinstance(value, SCALARS):
+                # Objects and other values that cannot be a field are skipped, not parsed
+                self._issue(row, profile, key, f"expected text, a number or a list, got {type(value).__name__}")
+                continue
+            else:
+                variants = self._variants(key, kind, value, row, profile)
+                if not repeated:
+                    # A single value of a field of its own needs no merging
+                    if variants:
+                        parsed[name] = variants
+                    continue
+                variants = list(variants)
+            variants = [variant for variant in dict.fromkeys(list(parsed.get(name, ())) + variants) if variant]
+            if variants:
+                parsed[name] = tuple(variants)
+        return parsed
+
+    def _variants(self, key: str, kind: str, value, row: int, profile: dict) -> Tuple[str, ...]:
+        """Variants of one field value, cached per column along with any issue it raises"""
+        cache = self._values.setdefault(key, {})
+        entry = cache.get(value)
+        if entry is None:
+            text = str(value)
+            reason = ""
+            if kind == 'date':
+                # Date fields use their column's format instead of parse_dob's trial loop
+                parts = self.dates.setdefault(key, DateColumn()).parse(text)
+                if not parts:
+                    reason = f"unrecognized date {text!r}"
+                    variants = number_variants(text)
+                else:
+                    variants = [parts['year'], parts['year_short'], parts['day'] + parts['month'],
+                                parts['month'] + parts['day'], parts['full']]
+            else:
+                variants = FIELD_TYPES[kind](text)
+            if len(cache) >= CACHE_LIMIT:
+                cache.clear()
+            entry = cache[value] = (tuple(variant for variant in dict.fromkeys(variants) if variant), reason)
+        if entry[1]:
+            self._issue(row, profile, key, entry[1])
+        return entry[0]
+
+    def parse_all(self, profiles: Iterable) -> Iterator[Tuple[dict, dict]]:
+        """Yield (record, parsed data) pairs, detecting date formats from the first records"""
+        iterator = iter(profiles)
+        head = list(islice(iterator, self.sample))
+        self.detect(head)
+        for row, profile in enumerate(chain(head, iterator), 1):
+            if not isinstance(profile, dict):
+                self._issue(row, {}, '', f"not a record: {type(profile).__name__}")
+                continue
+            yield profile, self.parse(profile, row)
+
+    def report(self) -> dict:
+        """Records parsed, detected date formats, throughput and issues"""
+        return {
+            'records': self.count,
+            'seconds': round(self.seconds, 4),
+            'records_per_sec': int(self.count / self.seconds) if self.seconds else 0,
+            'date_formats': {column: dates.format.name if dates.format else None
+                             for column, dates in self.dates.items()},
+            'issue_count': self.issue_count,
+            'issues': [issue._asdict() for issue in self.issues],
+        }
@@ -0,0 +1,110 @@
+"""
+PassCraft Best-First Ranking
+Emits candidates in descending estimated likelihood without building the full set
+"""
+
+import heapq
+from itertools import count
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .engine import Plan
+
+# Heap entry kinds
+_PRODUCT = 0
+_VARIATION = 1
+
+
+class _RankedPlan:
+    """A plan with every slot sorted by descending weight"""
+
+    __slots__ = ('slots', 'weights', 'weight')
+
+    def __init__(self, plan: Plan):
+        slots = []
+        weights = []
+        for index, values in enumerate(plan.slots):
+            slot_weights = plan.weights[index] if plan.weights else (1.0,) * len(values)
+            if not isinstance(values, tuple):
+                # Lazy slots weigh every value the same, so they are already in order
+                slots.append(values)
+                weights.append(slot_weights)
+                continue
+            order = sorted(range(len(values)), key=lambda i: -slot_weights[i])
+            slots.append(tuple(values[i] for i in order))
+            weights.append(tuple(slot_weights[i] for i in order))
+        self.slots = slots
+        self.weights = weights
+        self.weight = plan.weight
+
+    def score(self, vector: Tuple[int, ...]) -> float:
+        """Likelihood of the candidate at a vector of slot indexes"""
+        score = self.weight
+        for weights, i in zip(self.weights, vector):
+            score *= weights[i]
+        return score
+
+    def word(self, vector: Tuple[int, ...]) -> str:
+        """Join the slot values at a vector of slot indexes"""
+        return "".join(values[i] for values, i in zip(self.slots, vector))
+
+
+def iter_ranked(plans: Iterable[Plan],
+                vary: Optional[Callable[[str], Iterator[Tuple[float, str]]]] = None,
+                dedup: bool = True,
+                keep: Optional[Callable[[str], bool]] = None) -> Iterator[Tuple[float, str]]:
+    """Yield (score, candidate) pairs, most likely first, skipping base words keep rejects"""
+    ranked = [_RankedPlan(plan) for plan in plans if plan.slots and all(plan.slots)]
+    tiebreak = count()
+    heap: List[tuple] = []
+
+    for plan in ranked:
+        root = (0,) * len(plan.slots)
+        heap.append((-plan.score(root), next(tiebreak), _PRODUCT, plan, root))
+    heapq.heapify(heap)
+
+    seen = set()
+    expanded = set()
+
+    while heap:
+        neg_score, _, kind, source, state = heapq.heappop(heap)
+        score = -neg_score
+
+        if kind == _PRODUCT:
+            plan, vector = source, state
+            word = plan.word(vector)
+
+            # Each vector has one parent, found by decrementing its last
+            # non-zero index, so children only advance from that slot on
+            last = len(vector) - 1
+            while last > 0 and vector[last] == 0:
+                last -= 1
+            for j in range(last, len(vector)):
+                if vector[j] + 1 < len(plan.slots[j]):
+                    child = vector[:j] + (vector[j] + 1,) + vector[j + 1:]
+                    heapq.heappush(heap, (-plan.score(child), next(tiebreak), _PRODUCT, plan, child))
+
+            if keep is not None and not keep(word):
+                continue
+            if dedup:
+                if word in expanded:
+                    continue
+                expanded.add(word)
+            if vary is not None:
+                # Variations score no higher than their base word, so each
+                # word's chain is pushed lazily, one variation at a time
+                chain = vary(word)
+                for weight, variation in chain:
+                    heapq.heappush(heap, (-score * weight, next(tiebreak), _VARIATION, (chain, score), variation))
+                    break
+        else:
+            word = state
+            chain, base_score = source
+            for weight, variation in chain:
+                heapq.heappush(heap, (-base_score * weight, next(tiebreak), _VARIATION, source, variation))
+                break
+
+        if dedup:
+            if word in seen:
+                continue
+            seen.add(word)
+        yield score, word
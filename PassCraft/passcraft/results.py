@@ -0,0 +1,103 @@
+"""
+PassCraft Result Store
+Compact, indexable storage for large candidate lists shown in the GUI
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, Tuple
+
+# Candidates decoded at a time when iterating over the store
+ITER_BLOCK = 65536
+
+# Bytes handed to a writer at a time when exporting the store
+WRITE_BLOCK = 1 << 20
+
+
+class ResultStore:
+    """Append-only list of candidates kept as one UTF-8 buffer plus line offsets"""
+
+    def __init__(self, candidates: Iterable[str] = ()):
+        # Millions of short str objects cost ~60 bytes each; one buffer and an
+        # offset per entry costs about the length of the candidate plus 8
+        self._data = bytearray()
+        self._offsets = array('Q', [0])
+        self._folded = None
+        self.extend(candidates)
+
+    def append(self, word: str):
+        """Add one candidate"""
+        self._data += word.encode('utf-8', 'surrogatepass')
+        self._data += b"\n"
+        self._offsets.append(len(self._data))
+
+    def extend(self, candidates: Iterable[str]):
+        """Add candidates from a stream"""
+        data = self._data
+        offsets = self._offsets
+        for word in candidates:
+            data += word.encode('utf-8', 'surrogatepass')
+            data += b"\n"
+            offsets.append(len(data))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("result index out of range")
+        start, end = self._offsets[index], self._offsets[index + 1] - 1
+        return self._data[start:end].decode('utf-8', 'surrogatepass')
+
+    def __iter__(self) -> Iterator[str]:
+        # Decode in blocks so iterating never copies the whole buffer at once
+        offsets = self._offsets
+        count = len(self)
+        for first in range(0, count, ITER_BLOCK):
+            last = min(first + ITER_BLOCK, count)
+            block = self._data[offsets[first]:offsets[last] - 1].decode('utf-8', 'surrogatepass')
+            yield from block.split("\n")
+
+    def iter_blocks(self, size: int = WRITE_BLOCK) -> Iterator[Tuple[bytes, int]]:
+        """Yield (encoded lines, line count) blocks of about `size` bytes, split at line ends"""
+        offsets = self._offsets
+        count = len(self)
+        first = 0
+        while first < count:
+            # The first line ending past the block size closes the block
+            last = bisect_right(offsets, offsets[first] + size, first + 1, count + 1) - 1
+            last = max(last, first + 1)
+            yield bytes(self._data[offsets[first]:offsets[last]]), last - first
+            first = last
+
+    def text(self) -> str:
+        """Every candidate, one per line"""
+        return self._data[:-1].decode('utf-8', 'surrogatepass')
+
+    def iter_matches(self, query: str, ignore_case: bool = True) -> Iterator[int]:
+        """Yield the indexes of candidates containing a substring, in order"""
+        needle = query.encode('utf-8', 'surrogatepass')
+        if not needle:
+            yield from range(len(self))
+            return
+        data = self._data
+        if ignore_case:
+            # bytes.lower only folds ASCII, so offsets stay valid for the buffer
+            if self._folded is None or len(self._folded) != len(data):
+                self._folded = bytes(data).lower()
+            data = self._folded
+            needle = needle.lower()
+        # The regex engine skips non-matching lines without a Python-level step
+        pattern = re.compile(rb"^[^\n]*?" + re.escape(needle), re.MULTILINE)
+        offsets = self._offsets
+        for match in pattern.finditer(data):
+            yield bisect_right(offsets, match.start()) - 1
+
+    def clear(self):
+        """Remove every candidate"""
+        self._data = bytearray()
+        self._offsets = array('Q', [0])
+        self._folded = None
@@ -0,0 +1,402 @@
+"""
+PassCraft Rule Engine
+Compiles hashcat/John style mangling rules into fast Python functions
+"""
+
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .keyspace import count_product, estimate_product
+from .policy import ALL_CLASSES, LOWER, NO_EFFECTS, UPPER, Effects, class_mask
+
+# Built-in rule sets replacing the hard-coded variation code
+STANDARD_RULES = [
+    "sa@ sA@ se3 sE3 si1 sI1 so0 sO0 ss$ sS$",  # Leetspeak substitutions
+    "<8 u",                                      # Case variations for short passwords
+    "<8 c",
+    "$!",                                        # Add special characters
+    "$@",
+    "$#",
+    "$1 $2 $3",
+]
+# Estimated likelihood of each standard rule, used for best-first order
+STANDARD_RULE_WEIGHTS = [0.3, 0.2, 0.5, 0.4, 0.1, 0.1, 0.5]
+
+# Weight decay for rules listed in order of effectiveness, as in most rule files
+RANK_DECAY = 0.97
+
+
+class RuleError(ValueError):
+    """Raised when a rule cannot be parsed"""
+
+
+def to_position(char: str) -> int:
+    """Convert a hashcat position character (0-9, A-Z) to an integer"""
+    if '0' <= char <= '9':
+        return ord(char) - ord('0')
+    if 'A' <= char <= 'Z':
+        return ord(char) - ord('A') + 10
+    raise RuleError(f"Invalid position: {char!r}")
+
+
+# Operations by argument layout; each template updates or checks the word `w`.
+# N and M are positions, X and Y are literal characters.
+NO_ARGS = {
+    ':': [],
+    'l': ["w = w.lower()"],
+    'u': ["w = w.upper()"],
+    'c': ["w = w.capitalize()"],
+    'C': ["w = w[:1].lower() + w[1:].upper()"],
+    't': ["w = w.swapcase()"],
+    'E': ["w = ' '.join(p[:1].upper() + p[1:] for p in w.lower().split(' '))"],
+    'r': ["w = w[::-1]"],
+    'd': ["w = w + w"],
+    'f': ["w = w + w[::-1]"],
+    '{': ["w = w[1:] + w[:1]"],
+    '}': ["w = w[-1:] + w[:-1]"],
+    '[': ["w = w[1:]"],
+    ']': ["w = w[:-1]"],
+    'q': ["w = ''.join(ch + ch for ch in w)"],
+    'k': ["w = w[1:2] + w[:1] + w[2:]"],
+    'K': ["w = w[:-2] + w[-1:] + w[-2:-1] if len(w) > 1 else w"],
+}
+POSITION_ARG = {
+    'T': ["if {N} < len(w): w = w[:{N}] + w[{N}].swapcase() + w[{N} + 1:]"],
+    'p': ["w = w * ({N} + 1)"],
+    'D': ["w = w[:{N}] + w[{N} + 1:]"],
+    "'": ["w = w[:{N}]"],
+    'z': ["w = w[:1] * {N} + w"],
+    'Z': ["w = w + w[-1:] * {N}"],
+    'y': ["if {N} <= len(w): w = w[:{N}] + w"],
+    'Y': ["if {N} <= len(w): w = w + w[len(w) - {N}:]"],
+    '+': ["if {N} < len(w): w = w[:{N}] + chr((ord(w[{N}]) + 1) % 0x110000) + w[{N} + 1:]"],
+    '-': ["if {N} < len(w): w = w[:{N}] + chr((ord(w[{N}]) - 1) % 0x110000) + w[{N} + 1:]"],
+    '.': ["if {N} + 1 < len(w): w = w[:{N}] + w[{N} + 1] + w[{N} + 1:]"],
+    ',': ["if 0 < {N} < len(w): w = w[:{N}] + w[{N} - 1] + w[{N} + 1:]"],
+    '<': ["if len(w) > {N}: return None"],
+    '>': ["if len(w) < {N}: return None"],
+    '_': ["if len(w) != {N}: return None"],
+}
+CHAR_ARG = {
+    '$': ["w = w + {X}"],
+    '^': ["w = {X} + w"],
+    '@': ["w = w.replace({X}, '')"],
+    '!': ["if {X} in w: return None"],
+    '/': ["if {X} not in w: return None"],
+    '(': ["if not w.startswith({X}): return None"],
+    ')': ["if not w.endswith({X}): return None"],
+}
+TWO_POSITION_ARGS = {
+    'x': ["if {N} < len(w): w = w[{N}:{N} + {M}]"],
+    'O': ["if {N} < len(w): w = w[:{N}] + w[{N} + {M}:]"],
+    '*': ["if {N} < len(w) and {M} < len(w) and {N} != {M}:",
+          "    chars = list(w); chars[{N}], chars[{M}] = chars[{M}], chars[{N}]; w = ''.join(chars)"],
+}
+POSITION_CHAR_ARGS = {
+    'i': ["if {N} <= len(w): w = w[:{N}] + {X} + w[{N}:]"],
+    'o': ["if {N} < len(w): w = w[:{N}] + {X} + w[{N} + 1:]"],
+    '=': ["if w[{N}:{N} + 1] != {X}: return None"],
+    '%': ["if w.count({X}) < {N}: return None"],
+}
+TWO_CHAR_ARGS = {
+    's': ["w = w.replace({X}, {Y})"],
+}
+TEMPLATES = {**NO_ARGS, **POSITION_ARG, **CHAR_ARG, **TWO_POSITION_ARGS, **POSITION_CHAR_ARGS, **TWO_CHAR_ARGS}
+
+
+class Rule:
+    """A single compiled rule"""
+
+    __slots__ = ('text', 'func', 'effects')
+
+    def __init__(self, text: str, func: Callable[[str], Optional[str]], effects: Effects = NO_EFFECTS):
+        self.text = text
+        self.func = func
+        self.effects = effects
+
+    def __call__(self, word: str) -> Optional[str]:
+        """Apply the rule, returning None when the word is rejected"""
+        return self.func(word)
+
+    def __repr__(self) -> str:
+        return f"Rule({self.text!r})"
+
+
+def parse_ops(text: str) -> List[Tuple[str, dict]]:
+    """Split a rule into (function, arguments) pairs"""
+    ops = []
+    pos = 0
+    length = len(text)
+
+    def take(what: str) -> str:
+        nonlocal pos
+        if pos >= length:
+            raise RuleError(f"Missing {what} in rule {text!r}")
+        char = text[pos]
+        pos += 1
+        return char
+
+    while pos < length:
+        op = text[pos]
+        pos += 1
+        if op in ' \t':
+            continue
+        if op in NO_ARGS:
+            args = {}
+        elif op in POSITION_ARG:
+            args = {'N': to_position(take('position'))}
+        elif op in CHAR_ARG:
+            args = {'X': take('character')}
+        elif op in TWO_POSITION_ARGS:
+            n = to_position(take('position'))
+            args = {'N': n, 'M': to_position(take('position'))}
+        elif op in POSITION_CHAR_ARGS:
+            n = to_position(take('position'))
+            args = {'N': n, 'X': take('character')}
+        elif op in TWO_CHAR_ARGS:
+            x = take('character')
+            args = {'X': x, 'Y': take('character')}
+        else:
+            raise RuleError(f"Unsupported rule function {op!r} in rule {text!r}")
+        ops.append((op, args))
+
+    return ops
+
+
+def translate_rule(text: str) -> List[str]:
+    """Translate a rule into Python statements operating on `w`"""
+    return translate_ops(parse_ops(text))
+
+
+def translate_ops(ops: List[Tuple[str, dict]]) -> List[str]:
+    """Translate parsed operations into Python statements operating on `w`"""
+    lines = []
+    for op, args in ops:
+        templates = TEMPLATES[op]
+        args = {key: repr(value) if key in 'XY' else value for key, value in args.items()}
+        lines.extend(template.format(**args) for template in templates)
+    return lines
+
+
+def rule_effects(text: str) -> Effects:
+    """Bound what a rule can do to a word's length and character classes"""
+    mult, add, shrink, classes, changes = 1, 0, False, 0, False
+    for op, args in parse_ops(text):
+        op_mult, op_add = 1, 0
+        if op in 'dfq':
+            op_mult = 2
+        elif op == 'p':
+            op_mult = args['N'] + 1
+        elif op in '$^i':
+            op_add = 1
+        elif op in 'zZyY':
+            op_add = args['N']
+        mult, add = mult * op_mult, add * op_mult + op_add
+
+        if op in "[]D'xO@":
+            shrink = True
+        if op in 'lucCtTEos+-.,':
+            changes = True
+
+        if op == 'l':
+            classes |= LOWER
+        elif op == 'u':
+            classes |= UPPER
+        elif op in 'cCtTE':
+            classes |= LOWER | UPPER
+        elif op in '$^io':
+            classes |= class_mask(args['X'])
+        elif op == 's':
+            classes |= class_mask(args['Y'])
+        elif op in '+-.,':
+            classes |= ALL_CLASSES
+    return Effects(mult, add, shrink, classes, changes)
+
+
+def compile_ops(ops: List[Tuple[str, dict]], name: str) -> Callable[[str], Optional[str]]:
+    """Compile parsed operations into a single Python function"""
+    body = translate_ops(ops) or ["pass"]
+    source = "def rule(w):\n" + "".join(f"    {line}\n" for line in body) + "    return w\n"
+    namespace = {}
+    exec(compile(source, f"<rule {name!r}>", 'exec'), namespace)
+    return namespace['rule']
+
+
+def compile_rule(text: str) -> Rule:
+    """Compile a rule into a single Python function"""
+    return Rule(text, compile_ops(parse_ops(text), text), rule_effects(text))
+
+
+# Operations by how they change the length of a word, for counting without enumeration
+LENGTH_CHECKS = {'<': lambda length, n: length <= n,
+                 '>': lambda length, n: length >= n,
+                 '_': lambda length, n: length == n}
+CHARWISE = set('lutcCs')
+GROWING = set('$^')
+GROWING_NONEMPTY = set('dfqpzZ')
+SHRINKING_OR_CHECKS = set("[]D'xO@!/()=%<>_")
+
+
+def rule_counter(rule: Rule) -> Optional[Callable[[Sequence[Sequence[str]]], int]]:
+    """Return an exact counter of the words a rule changes in a cross product, if the rule allows one"""
+    ops = parse_ops(rule.text)
+    gates = []
+    while ops and (ops[0][0] in LENGTH_CHECKS or ops[0][0] == ':'):
+        op, args = ops.pop(0)
+        if op != ':':
+            gates.append((LENGTH_CHECKS[op], args['N']))
+    ops = [(op, args) for op, args in ops if op != ':']
+    names = {op for op, _ in ops}
+
+    def accepted(length: int) -> bool:
+        return all(check(length, n) for check, n in gates)
+
+    if not ops:
+        return lambda slots: 0
+
+    if names <= CHARWISE:
+        # Character-wise rules transform a joined word part by part: the first
+        # non-empty part sees the whole rule, later parts only its tail, where
+        # capitalizing becomes lowercasing and the reverse
+        head = compile_ops(ops, rule.text)
+        tail = compile_ops([({'c': 'l', 'C': 'u'}.get(op, op), args) for op, args in ops], rule.text)
+
+        def feature(value: str) -> tuple:
+            return len(value), bool(value), head(value) != value, tail(value) != value
+
+        def step(state: tuple, value: tuple) -> tuple:
+            length, started, changed = state
+            value_length, nonempty, head_changed, tail_changed = value
+            if nonempty:
+                changed = changed or (tail_changed if started else head_changed)
+            return length + value_length, started or nonempty, changed
+
+        def count_charwise(slots: Sequence[Sequence[str]]) -> int:
+            states = count_product(slots, feature, (0, False, False), step)
+            return sum(count for (length, _, changed), count in states.items() if changed and accepted(length))
+
+        return count_charwise
+
+    growing = names & GROWING or any(op in GROWING_NONEMPTY and args.get('N', 1) > 0 for op, args in ops)
+    if growing and not names & SHRINKING_OR_CHECKS:
+        # The word only gets longer, so the rule changes every word it grows
+        always = bool(names & GROWING)
+
+        def count_growing(slots: Sequence[Sequence[str]]) -> int:
+            states = count_product(slots, len, 0, int.__add__)
+            return sum(count for length, count in states.items()
+                       if accepted(length) and (always or length > 0))
+
+        return count_growing
+
+    return None
+
+
+class RuleSet:
+    """An ordered list of compiled rules applied to every base word"""
+
+    def __init__(self, rules: Iterable[Rule] = (), skipped: Iterable[str] = (),
+                 weights: Optional[Iterable[float]] = None):
+        self.rules = list(rules)
+        self.skipped = list(skipped)
+        if weights is None:
+            self.weights = [RANK_DECAY ** i for i in range(len(self.rules))]
+        else:
+            self.weights = list(weights)
+        self._funcs = [rule.func for rule in self.rules]
+        self._ranked = sorted(zip(self.weights, self._funcs), key=lambda pair: -pair[0])
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __iter__(self) -> Iterator[Rule]:
+        return iter(self.rules)
+
+    def apply(self, word: str) -> Iterator[str]:
+        """Yield the output of every rule that does not reject the word"""
+        for func in self._funcs:
+            out = func(word)
+            if out is not None:
+                yield out
+
+    def iter_variations(self, word: str) -> Iterator[str]:
+        """Yield rule outputs that differ from the word itself"""
+        for func in self._funcs:
+            out = func(word)
+            if out is not None and out != word:
+                yield out
+
+    __call__ = iter_variations
+
+    def effects(self) -> Effects:
+        """Combined effects of every rule, used to prune safely under a policy"""
+        effects = NO_EFFECTS
+        for rule in self.rules:
+            effects = effects.combine(rule.effects)
+        return effects
+
+    def iter_ranked(self, word: str) -> Iterator[Tuple[float, str]]:
+        """Yield (weight, variation) pairs, most likely rule first"""
+        for weight, func in self._ranked:
+            out = func(word)
+            if out is not None and out != word:
+                yield weight, out
+
+    def session(self) -> Callable[[str], Iterator[str]]:
+        """Return the variation stage for one generation run"""
+        return self.iter_variations
+
+    def ranked_session(self) -> Callable[[str], Iterator[Tuple[float, str]]]:
+        """Return the weighted variation stage for one best-first run"""
+        return self.iter_ranked
+
+    def count_variations(self, plans: Iterable[Sequence[Sequence[str]]]) -> List[Tuple[int, bool]]:
+        """Count (variations, exact) for each cross product of slots"""
+        counters = []
+        fallback = []
+        for rule in self.rules:
+            counter = rule_counter(rule)
+            if counter is None:
+                fallback.append(rule.func)
+            else:
+                counters.append(counter)
+
+        def changed_by_fallback(word: str) -> int:
+            changed = 0
+            for func in fallback:
+                out = func(word)
+                if out is not None and out != word:
+                    changed += 1
+            return changed
+
+        counts = []
+        for slots in plans:
+            total = sum(counter(slots) for counter in counters)
+            exact = True
+            if fallback:
+                estimate, exact = estimate_product(slots, changed_by_fallback)
+                total += estimate
+            counts.append((total, exact))
+        return counts
+
+
+def parse_rules(lines: Iterable[str], strict: bool = True) -> RuleSet:
+    """Compile rule lines, skipping blanks and comments"""
+    rules = []
+    skipped = []
+    for line in lines:
+        text = line.rstrip('\r\n')
+        if not text.strip() or text.startswith('#'):
+            continue
+        try:
+            rules.append(compile_rule(text))
+        except RuleError:
+            if strict:
+                raise
+            skipped.append(text)
+    return RuleSet(rules, skipped)
+
+
+def load_rules(path: str, strict: bool = False) -> RuleSet:
+    """Load a rule file, skipping unsupported rules unless strict"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return parse_rules(f, strict=strict)
@@ -0,0 +1,313 @@
+"""
+PassCraft Check Service
+Long-running local server answering whether a password derives from a profile
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .engine import CORE_FIELDS, DEFAULT_ARITY, PATTERN_SETS, CandidateEngine, parse_profile, profile_fields
+from .leet import LeetExpander
+from .oracle import MembershipOracle
+from .rules import load_rules
+from .templates import load_templates
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_TTL = 300.0
+
+# Largest request body accepted, in bytes
+MAX_BODY = 64 * 1024
+
+# Check latencies kept for the percentiles in /stats
+LATENCY_WINDOW = 10000
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large'}
+
+
+class ProfileCache:
+    """LRU cache of compiled per-profile oracles whose entries expire after a time to live"""
+
+    def __init__(self, build: Callable[[dict], MembershipOracle], size: int = DEFAULT_CACHE_SIZE,
+                 ttl: float = DEFAULT_TTL, clock: Callable[[], float] = time.monotonic):
+        self.build = build
+        self.size = size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: 'OrderedDict[str, Tuple[float, MembershipOracle]]' = OrderedDict()
+        # Builds in progress, shared by every request for the same profile
+        self._building: Dict[str, 'asyncio.Future[MembershipOracle]'] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, profile: dict) -> Tuple[MembershipOracle, bool]:
+        """Return the oracle for a profile and whether it came from the cache"""
+        key = json.dumps(profile, sort_keys=True)
+        oracle = self._lookup(key)
+        if oracle is not None:
+            return oracle, True
+        self.misses += 1
+        oracle = self.build(profile)
+        self._store(key, oracle)
+        return oracle, False
+
+    async def fetch(self, profile: dict) -> Tuple[MembershipOracle, bool]:
+        """Like get, but a missing oracle is built in a worker thread so the event loop keeps serving"""
+        key = json.dumps(profile, sort_keys=True)
+        oracle = self._lookup(key)
+        if oracle is not None:
+            return oracle, True
+        self.misses += 1
+        future = self._building.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(None, self.build, profile)
+            self._building[key] = future
+            future.add_done_callback(lambda done: self._built(key, done))
+        # A request that goes away must not cancel a build others are waiting on
+        return await asyncio.shield(future), False
+
+    def _built(self, key: str, future: 'asyncio.Future[MembershipOracle]'):
+        del self._building[key]
+        if not future.cancelled() and future.exception() is None:
+            self._store(key, future.result())
+
+    def _lookup(self, key: str) -> Optional[MembershipOracle]:
+        """A live cached oracle, counting the hit"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] > self.clock():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        del self._entries[key]
+        self.expirations += 1
+        return None
+
+    def _store(self, key: str, oracle: MembershipOracle):
+        now = self.clock()
+        self._entries[key] = (now + self.ttl, oracle)
+        self._expire(now)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _expire(self, now: float):
+        # Sweep from the least recently used end; an expired entry behind a
+        # live one is dropped when it is next looked up
+        while self._entries:
+            key, (expires, _) = next(iter(self._entries.items()))
+            if expires > now:
+                return
+            del self._entries[key]
+            self.expirations += 1
+
+    def stats(self) -> dict:
+        """Size and hit rate of the cache"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'building': len(self._building),
+            'size': self.size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+class LatencyWindow:
+    """The most recent latencies, summarized as percentiles"""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=size)
+        self.count = 0
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+        self.count += 1
+
+    def percentiles(self) -> dict:
+        """p50, p90, p99 and max of the window, in microseconds"""
+        samples = sorted(self._samples)
+        if not samples:
+            return {}
+
+        def at(fraction: float) -> float:
+            return round(samples[min(int(fraction * len(samples)), len(samples) - 1)] * 1e6, 1)
+
+        return {'p50': at(0.50), 'p90': at(0.90), 'p99': at(0.99), 'max': round(samples[-1] * 1e6, 1)}
+
+
+class CheckService:
+    """Answers password checks over HTTP, keeping compiled profiles in a cache"""
+
+    def __init__(self, engine: CandidateEngine, cache_size: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_TTL):
+        self.engine = engine
+        self.cache = ProfileCache(self.compile_profile, cache_size, ttl)
+        self.latency = LatencyWindow()
+        self.started = time.time()
+
+    def compile_profile(self, profile: dict) -> MembershipOracle:
+        """Parse a profile and build its oracle"""
+        data = parse_profile(*(str(profile.get(field) or "") for field in CORE_FIELDS), profile_fields(profile))
+        return MembershipOracle(self.engine, data)
+
+    async def check(self, profile: dict, password: str) -> dict:
+        """Whether a password derives from a profile, and from which pattern"""
+        start = time.perf_counter()
+        oracle, cached = await self.cache.fetch(profile)
+        source = oracle.explain(password)
+        elapsed = time.perf_counter() - start
+        self.latency.record(elapsed)
+        result = {'derivable': source is not None, 'cached': cached, 'micros': round(elapsed * 1e6, 1)}
+        if source is not None:
+            result['stage'] = source['stage']
+            result['variation'] = source['variation']
+        return result
+
+    def stats(self) -> dict:
+        """Checks served, cache hit rate and latency percentiles"""
+        return {
+            'checks': self.latency.count,
+            'uptime': round(time.time() - self.started, 1),
+            'cache': self.cache.stats(),
+            'latency_us': self.latency.percentiles(),
+        }
+
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, dict]:
+        """Dispatch a request to a handler, returning (status, JSON document)"""
+        if path == '/stats':
+            if method != 'GET':
+                return 405, {'error': 'use GET'}
+            return 200, self.stats()
+        if path != '/check':
+            return 404, {'error': f"unknown path {path}"}
+        if method != 'POST':
+            return 405, {'error': 'use POST'}
+        try:
+            request = json.loads(body)
+            profile, password = request['profile'], request['password']
+            if not isinstance(profile, dict) or not isinstance(password, str):
+                raise TypeError
+            return 200, await self.check(profile, password)
+        except (ValueError, KeyError, TypeError) as e:
+            # A profile field of an unknown type also raises ValueError
+            detail = str(e) if isinstance(e, ValueError) and not isinstance(e, json.JSONDecodeError) else ""
+            return 400, {'error': detail or 'expected a JSON object with "profile" and "password"'}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve HTTP/1.1 requests on one connection, keeping it open between requests"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, target, version = line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {'error': 'request too large'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, document = await self.route(method, target.split('?', 1)[0], body)
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version.upper() == 'HTTP/1.1')
+                await self._respond(writer, status, document, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            # Truncated or malformed requests close the connection
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, document: dict, keep_alive: bool):
+        payload = json.dumps(document).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT, socket_path: Optional[str] = None):
+        """Listen on a Unix socket or a local TCP port until cancelled"""
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            # Passwords and profiles cross this socket, so only the owner may
+            # connect; the socket is created with those permissions, leaving no
+            # moment in which anyone else could
+            umask = os.umask(0o177)
+            try:
+                server = await asyncio.start_unix_server(self.handle, path=socket_path)
+            finally:
+                os.umask(umask)
+            where = socket_path
+        else:
+            server = await asyncio.start_server(self.handle, host=host, port=port)
+            where = f"http://{host}:{port}"
+        print(f"🛡️  PassCraft check service listening on {where}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point for the check service"""
+    parser = argparse.ArgumentParser(
+        prog='passcraft.service',
+        description='Answer POST /check {"profile": {...}, "password": "..."} with whether the password '
+                    'derives from the profile; GET /stats reports cache hit rate and latency.')
+    parser.add_argument('--host', default='127.0.0.1', help='address to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'TCP port (default: {DEFAULT_PORT})')
+    parser.add_argument('--socket', metavar='PATH', help='listen on a Unix socket instead of TCP')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE, metavar='N',
+                        help=f'compiled profiles kept (default: {DEFAULT_CACHE_SIZE})')
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL, metavar='SECONDS',
+                        help=f'seconds a compiled profile is kept (default: {DEFAULT_TTL:g})')
+    parser.add_argument('-p', '--patterns', choices=sorted(PATTERN_SETS), default='standard',
+                        help='pattern set the checks follow')
+    parser.add_argument('-t', '--templates', metavar='FILE', help='template file replacing the combination patterns')
+    parser.add_argument('-r', '--rules', metavar='FILE', help='hashcat/John rule file replacing the built-in variations')
+    parser.add_argument('--leet', action='store_true', help='use leetspeak expansion as the variation stage')
+    parser.add_argument('--arity', type=int, default=DEFAULT_ARITY, metavar='N',
+                        help=f'most fields joined into one candidate (default: {DEFAULT_ARITY})')
+    args = parser.parse_args(argv)
+
+    rules = None
+    if args.leet:
+        rules = LeetExpander()
+    if args.rules:
+        rules = load_rules(args.rules)
+    templates = load_templates(args.templates) if args.templates else None
+    engine = CandidateEngine(patterns=args.patterns, rules=rules, templates=templates, arity=args.arity)
+    service = CheckService(engine, cache_size=args.cache_size, ttl=args.ttl)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+"""
+PassCraft Output Sinks
+Plain, compressed and sharded wordlist writers fed from a candidate stream
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+import time
+from functools import partial
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+
+from .engine import wordlist_header
+
+# Compression name -> (opener, file extension)
+COMPRESSORS = {
+    'gzip': (partial(gzip.open, compresslevel=6), '.gz'),
+    'bz2': (bz2.open, '.bz2'),
+    'lzma': (lzma.open, '.xz'),
+}
+
+SHARD_MODES = ['count', 'bytes', 'length']
+
+# Bytes of candidates joined into one block before it is written
+DEFAULT_BUFFER = 1 << 20
+
+# Smaller blocks for stdout, where a reader may be waiting, and per shard, of which there can be many
+STREAM_BUFFER = 1 << 16
+SHARD_BUFFER = 1 << 16
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """Guess the compression from a file extension"""
+    for name, (_, extension) in COMPRESSORS.items():
+        if path.endswith(extension):
+            return name
+    return None
+
+
+def open_binary(path: Union[str, BinaryIO], compression: Optional[str] = None, append: bool = False) -> BinaryIO:
+    """Open a file, or wrap an open one, for binary writing, compressed if requested"""
+    mode = 'ab' if append else 'wb'
+    if compression is None:
+        return open(path, mode) if isinstance(path, str) else path
+    if compression not in COMPRESSORS:
+        raise ValueError(f"Unknown compression: {compression}")
+    opener, _ = COMPRESSORS[compression]
+    # Appending to a compressed file adds a new stream, which readers join
+    return opener(path, mode)
+
+
+def parse_size(text: str) -> int:
+    """Parse a byte size such as 500K, 64M or 2G"""
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def hex_encode(word: str) -> str:
+    """hashcat's $HEX[...] form of a candidate with non-ASCII or control characters, others unchanged"""
+    if word.isascii() and word.isprintable() and not word.startswith('$HEX['):
+        return word
+    return f"$HEX[{word.encode('utf-8', 'surrogatepass').hex()}]"
+
+
+def truncate_output(path: str, size: int):
+    """Cut a file back to a size recorded earlier, dropping whatever was written after it"""
+    current = os.path.getsize(path) if os.path.exists(path) else 0
+    if current < size:
+        raise ValueError(f"{path} is shorter than its checkpoint records ({current} < {size} bytes)")
+    if current > size:
+        os.truncate(path, size)
+
+
+def fsync_directory(path: str):
+    """Make a rename into the directory holding a path survive a crash, where the platform allows it"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class Sink:
+    """Base class for wordlist outputs"""
+
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def write(self, word: str):
+        """Write one candidate"""
+        raise NotImplementedError
+
+    def write_all(self, candidates: Iterable[str]):
+        """Write every candidate from a stream"""
+        write = self.write
+        for word in candidates:
+            write(word)
+
+    def write_block(self, data: bytes, count: int):
+        """Write `count` already encoded, newline terminated candidates"""
+        for line in data.decode('utf-8', 'surrogatepass').split("\n")[:count]:
+            self.write(line)
+
+    def flush(self):
+        """Push buffered candidates to disk"""
+
+    def mark(self) -> Dict[str, int]:
+        """Flush and return the size of each output file, a point the files can be cut back to"""
+        self.flush()
+        return {}
+
+    def close(self):
+        """Flush and close the output"""
+
+    def abort(self):
+        """Close after a failed or cancelled write"""
+        self.close()
+
+    @property
+    def files(self) -> List[str]:
+        """Paths written by this sink"""
+        return []
+
+    def consume(self, candidates: Iterable[str]) -> dict:
+        """Write every candidate from a stream, close the sink and report"""
+        start = time.perf_counter()
+        try:
+            self.write_all(candidates)
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self.close()
+            self.seconds = time.perf_counter() - start
+        return self.report()
+
+    def consume_blocks(self, blocks: Iterable[Tuple[bytes, int]]) -> dict:
+        """Write (encoded lines, count) blocks from a stream, close the sink and report"""
+        start = time.perf_counter()
+        try:
+            for data, count in blocks:
+                self.write_block(data, count)
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self.close()
+            self.seconds = time.perf_counter() - start
+        return self.report()
+
+    def report(self) -> dict:
+        """Counts, sizes and throughput of the sink"""
+        files = self.files
+        disk_bytes = sum(os.path.getsize(path) for path in files if os.path.exists(path))
+        seconds = self.seconds or 1e-9
+        return {
+            'count': self.count,
+            'bytes': self.bytes,
+            'disk_bytes': disk_bytes,
+            'seconds': round(self.seconds, 4),
+            'bytes_per_sec': int(self.bytes / seconds),
+            'files': files,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StreamSink(Sink):
+    """Writes candidates to an already open binary stream such as stdout, joined into large blocks"""
+
+    def __init__(self, stream: BinaryIO, header: Union[bool, str] = False, buffer_size: int = DEFAULT_BUFFER,
+                 hex: bool = False):
+        super().__init__()
+        self.stream = stream
+        self.buffer_size = buffer_size
+        # Candidates with non-ASCII or control characters are written as $HEX[...]
+        self.hex = hex
+        self._lines: List[str] = []
+        self._size = 0
+        if header:
+            # True writes the standard header; a string is written as given
+            text = wordlist_header() if header is True else header
+            self.stream.write(text.encode('utf-8'))
+
+    def write(self, word: str):
+        if self.hex:
+            word = hex_encode(word)
+        self._lines.append(word)
+        self._size += len(word) + 1
+        if self._size >= self.buffer_size:
+            self._drain()
+
+    def write_all(self, candidates: Iterable[str]):
+        # One join and one encode per block instead of a call, an f-string
+        # and an encode per candidate
+        if self.hex:
+            candidates = map(hex_encode, candidates)
+        lines = self._lines
+        append = lines.append
+        limit = self.buffer_size
+        size = self._size
+        for word in candidates:
+            append(word)
+            size += len(word) + 1
+            if size >= limit:
+                self._drain()
+                size = 0
+        self._size = size
+
+    def _drain(self):
+        """Write the collected candidates as one block"""
+        lines = self._lines
+        if lines:
+            lines.append("")
+            data = "\n".join(lines).encode('utf-8', 'surrogatepass')
+            self.stream.write(data)
+            self.count += len(lines) - 1
+            self.bytes += len(data)
+            # Cleared in place, as write_all holds the list while a checkpoint flushes it
+            lines.clear()
+        self._size = 0
+
+    def write_block(self, data: bytes, count: int):
+        self._drain()
+        self.stream.write(data)
+        self.count += count
+        self.bytes += len(data)
+
+    def flush(self):
+        self._drain()
+        self.stream.flush()
+
+    def close(self):
+        self.flush()
+
+
+class FileSink(StreamSink):
+    """Writes candidates to one file, optionally compressed"""
+
+    def __init__(self, path: str, compression: Optional[str] = None, header: Union[bool, str] = True,
+                 append: bool = False, atomic: bool = False, sync: bool = False,
+                 buffer_size: int = DEFAULT_BUFFER, hex: bool = False, truncate: Optional[int] = None):
+        self.path = path
+        self.compression = compression if compression is not None else detect_compression(path)
+        # An atomic sink writes beside the target and renames over it when
+        # closed, so readers never see a half-written wordlist
+        self.atomic = atomic and not append
+        # A synced sink reaches the disk before it is renamed or reported done
+        self.sync = sync
+        if self.compression is not None and self.compression not in COMPRESSORS:
+            raise ValueError(f"Unknown compression: {self.compression}")
+        self._write_path = f"{path}.{os.getpid()}.tmp" if self.atomic else path
+        if append and truncate is not None:
+            # A resumed run drops what the interrupted one wrote after its checkpoint
+            truncate_output(path, truncate)
+        self._file = open(self._write_path, 'ab' if append else 'wb')
+        super().__init__(open_binary(self._file, self.compression, append), header=header,
+                         buffer_size=buffer_size, hex=hex)
+        self._closed = False
+
+    def flush(self):
+        super().flush()
+        if self.sync:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def mark(self) -> Dict[str, int]:
+        self._drain()
+        compressed = self.stream is not self._file
+        if compressed:
+            # A compressed file can only be cut back where a stream ends, so
+            # the current one is finished and appending starts another
+            self.stream.close()
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+        size = self._file.tell()
+        if compressed:
+            self.stream = open_binary(self._file, self.compression, append=True)
+        return {self.path: size}
+
+    def _close_files(self):
+        # A compressor writes its trailer when closed but leaves the file open
+        if self.stream is not self._file:
+            self.stream.close()
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+        self._file.close()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._drain()
+            self._close_files()
+            if self.atomic:
+                os.replace(self._write_path, self.path)
+                if self.sync:
+                    fsync_directory(self.path)
+
+    def abort(self):
+        if not self._closed:
+            self._closed = True
+            if self.atomic:
+                self._lines.clear()
+                self.stream.close()
+                self._file.close()
+                os.remove(self._write_path)
+            else:
+                # A plain file keeps what was generated before the failure
+                self._drain()
+                self._close_files()
+
+    @property
+    def files(self) -> List[str]:
+        return [self.path]
+
+
+class ShardedSink(Sink):
+    """Splits candidates across several files"""
+
+    def __init__(self, path: str, mode: str = 'count', value: int = 2, compression: Optional[str] = None,
+                 header: Union[bool, str] = True, append: bool = False, atomic: bool = False, sync: bool = False,
+                 buffer_size: int = SHARD_BUFFER, hex: bool = False, truncate: Optional[Dict[str, int]] = None):
+        super().__init__()
+        # 'count' deals candidates round-robin into `value` files, 'bytes' starts
+        # a new file once one reaches `value` bytes, 'length' writes one file per
+        # candidate length
+        if mode not in SHARD_MODES:
+            raise ValueError(f"Unknown shard mode: {mode}")
+        if mode != 'length' and value < 1:
+            raise ValueError("Shard count and size must be positive")
+        self.mode = mode
+        self.value = value
+        self.header = header
+        self.append = append
+        self.atomic = atomic
+        self.sync = sync
+        self.buffer_size = buffer_size
+        self.hex = hex
+        # Shards missing from a resumed run's sizes were started after its checkpoint
+        self.truncate = truncate
+        self.compression = compression if compression is not None else detect_compression(path)
+
+        # Split 'out.txt.gz' into 'out' and '.txt.gz' so shard names stay readable
+        extension = COMPRESSORS[self.compression][1] if self.compression else ''
+        stem = path[:len(path) - len(extension)] if extension and path.endswith(extension) else path
+        stem, suffix = os.path.splitext(stem)
+        self._stem = stem
+        self._suffix = suffix + extension
+
+        self.shards: Dict[object, FileSink] = {}
+        self._current = 0
+        self._current_bytes = 0
+
+    def _shard_path(self, key) -> str:
+        if self.mode == 'length':
+            return f"{self._stem}.len{key:02d}{self._suffix}"
+        return f"{self._stem}.{key:03d}{self._suffix}"
+
+    def _shard(self, key) -> FileSink:
+        shard = self.shards.get(key)
+        if shard is None:
+            path = self._shard_path(key)
+            truncate = None if self.truncate is None else self.truncate.get(path, 0)
+            shard = FileSink(path, self.compression, header=self.header, append=self.append,
+                             atomic=self.atomic, sync=self.sync, buffer_size=self.buffer_size, truncate=truncate)
+            self.shards[key] = shard
+        return shard
+
+    def write(self, word: str):
+        # Shards are keyed on the candidate; its $HEX[] form is what they write
+        line = hex_encode(word) if self.hex else word
+        size = (len(line) if line.isascii() else len(line.encode('utf-8', 'surrogatepass'))) + 1
+        if self.mode == 'count':
+            key = self.count % self.value
+        elif self.mode == 'length':
+            key = len(word)
+        else:
+            key = self._current
+            if self._current_bytes and self._current_bytes + size > self.value:
+                self.shards[key].close()
+                self._current += 1
+                self._current_bytes = 0
+                key = self._current
+            self._current_bytes += size
+        self._shard(key).write(line)
+        self.count += 1
+        self.bytes += size
+
+    def flush(self):
+        for shard in self.shards.values():
+            if not shard._closed:
+                shard.flush()
+
+    def mark(self) -> Dict[str, int]:
+        sizes = {}
+        for shard in self.shards.values():
+            if shard._closed:
+                sizes[shard.path] = os.path.getsize(shard.path)
+            else:
+                sizes.update(shard.mark())
+        return sizes
+
+    def close(self):
+        for shard in self.shards.values():
+            shard.close()
+
+    def abort(self):
+        for shard in self.shards.values():
+            shard.abort()
+
+    @property
+    def files(self) -> List[str]:
+        return [shard.path for shard in self.shards.values()]
+
+
+def open_sink(path: str, compression: Optional[str] = None, header: Union[bool, str] = True,
+              shard_mode: Optional[str] = None, shard_value: int = 0, append: bool = False,
+              atomic: bool = False, sync: bool = False, buffer_size: Optional[int] = None,
+              hex: bool = False, truncate: Optional[Dict[str, int]] = None) -> Sink:
+    """Create the sink matching the output options"""
+    if compression and not detect_compression(path):
+        path += COMPRESSORS[compression][1]
+    if shard_mode:
+        return ShardedSink(path, shard_mode, shard_value, compression, header, append, atomic, sync,
+                           buffer_size or SHARD_BUFFER, hex, truncate)
+    return FileSink(path, compression, header, append, atomic, sync, buffer_size or DEFAULT_BUFFER, hex,
+                    None if truncate is None else truncate.get(path, 0))
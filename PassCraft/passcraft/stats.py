@@ -0,0 +1,112 @@
+"""
+PassCraft Run Statistics
+Opt-in wall time and candidate counts for each stage of the generation pipeline
+"""
+
+import time
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+
+class RunStats:
+    """Collects per-stage timings and counts; stages are only wrapped when one is given"""
+
+    def __init__(self, callback: Optional[Callable[[dict], None]] = None):
+        self.callback = callback
+        self.stages: Dict[str, dict] = {}
+        self.last: Optional[str] = None
+
+    def _stage(self, name: str, upstream: Optional[str]) -> dict:
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = {'out': 0, 'seconds': 0.0, 'upstream': upstream}
+            self.stages[name] = stage
+        return stage
+
+    def call(self, name: str, func: Callable, *args):
+        """Run a one-shot stage such as parsing, timing it and counting its result"""
+        stage = self._stage(name, None)
+        start = time.perf_counter()
+        result = func(*args)
+        stage['seconds'] += time.perf_counter() - start
+        stage['out'] += len(result) if hasattr(result, '__len__') else 1
+        return result
+
+    def add(self, name: str, seconds: float, count: int, upstream: Optional[str] = None):
+        """Record a stage measured elsewhere, such as writing the output"""
+        stage = self._stage(name, upstream)
+        stage['seconds'] += seconds
+        stage['out'] += count
+
+    def wrap(self, name: str, iterable: Iterable, upstream: Optional[str] = None) -> Iterator:
+        """Time every step of a streaming stage; its time includes the upstream stage's"""
+        self.last = name
+        return self._iter_timed(self._stage(name, upstream), iterable)
+
+    def _iter_timed(self, stage: dict, iterable: Iterable) -> Iterator:
+        clock = time.perf_counter
+        iterator = iter(iterable)
+        count = 0
+        seconds = 0.0
+        try:
+            while True:
+                start = clock()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    seconds += clock() - start
+                    break
+                seconds += clock() - start
+                count += 1
+                yield item
+        finally:
+            stage['seconds'] += seconds
+            stage['out'] += count
+
+    def finishing(self, iterable: Iterable) -> Iterator:
+        """Pass a finished pipeline through, calling finish once it is exhausted"""
+        yield from iterable
+        self.finish()
+
+    def report(self) -> dict:
+        """Per-stage exclusive time, candidates in and out, and dedup hit rate"""
+        # Stages are listed upstream first, whatever order they started in
+        ordered = []
+        remaining = dict(self.stages)
+        while remaining:
+            ready = [name for name, stage in remaining.items()
+                     if stage['upstream'] not in remaining]
+            for name in ready:
+                ordered.append((name, remaining.pop(name)))
+
+        stages = []
+        total = 0.0
+        for name, stage in ordered:
+            upstream = self.stages.get(stage['upstream']) if stage['upstream'] else None
+            # Streaming stages pull from their upstream, so its time is subtracted
+            seconds = stage['seconds'] - (upstream['seconds'] if upstream else 0.0)
+            total += seconds
+            entry = {
+                'stage': name,
+                'seconds': round(max(seconds, 0.0), 6),
+                'in': upstream['out'] if upstream else None,
+                'out': stage['out'],
+            }
+            if seconds > 0:
+                entry['per_sec'] = int(stage['out'] / seconds)
+            stages.append(entry)
+        report = {'stages': stages, 'seconds': round(total, 6)}
+        dedup = self.stages.get('dedup')
+        if dedup is not None and dedup['upstream'] in self.stages:
+            seen = self.stages[dedup['upstream']]['out']
+            report['dedup'] = {
+                'in': seen,
+                'unique': dedup['out'],
+                'duplicates': seen - dedup['out'],
+                'hit_rate': round((seen - dedup['out']) / seen, 4) if seen else 0.0,
+            }
+        return report
+
+    def finish(self):
+        """Hand the report to the callback once the engine stages have finished"""
+        if self.callback is not None:
+            self.callback(self.report())
@@ -0,0 +1,251 @@
+"""
+PassCraft Templates
+Compiles readable patterns such as {firstName}{birthYear} into combination plans
+"""
+
+import re
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .dates import DateRange
+from .engine import (
+    SEPARATOR_WEIGHTS, SEPARATORS, SUFFIX_WEIGHTS, SUFFIXES, Plan, collect_components, field_name, make_plan,
+    weigh,
+)
+
+# Special characters, shared with the web version (v1/data.js)
+SPECIAL_CHARACTERS = ['!', '@', '#', '$', '%', '&', '*', '_', '-', '.', '+', '=', '?']
+
+# Stage and weight of templates listed before any [section] header
+DEFAULT_STAGE = 'template'
+
+CASE_FORMS = {
+    'lower': str.lower,
+    'cap': str.capitalize,
+    'upper': str.upper,
+}
+
+
+class TemplateError(ValueError):
+    """Raised when a template cannot be compiled"""
+
+
+def _pick(table: str, *keys: str) -> Callable[[dict], List[str]]:
+    """Resolver returning the listed entries of a parsed component table that are present"""
+    def resolve(data: dict) -> List[str]:
+        parts = data[table]
+        return [parts[key] for key in keys if parts.get(key)]
+    return resolve
+
+
+def _dob(keys: Tuple[str, ...], ranged: Callable[[DateRange], List[str]]) -> Callable[[dict], List[str]]:
+    """Resolver for parts of the date of birth, taking every possible value when only a range is known"""
+    pick = _pick('dob', *keys)
+
+    def resolve(data: dict) -> List[str]:
+        dates = data.get('dob_range')
+        if dates is not None and not data['dob']:
+            return ranged(dates)
+        return pick(data)
+    return resolve
+
+
+def _with_short(values: Iterable[str]) -> List[str]:
+    """Two-digit forms followed by the distinct forms without a leading zero"""
+    values = list(dict.fromkeys(values))
+    return values + [value[1:] for value in values if value.startswith('0')]
+
+
+def _initials(data: dict) -> List[str]:
+    """Lower and upper case initials, when both names are known"""
+    name = data['name']
+    if not (name['first_initial'] and name['last_initial']):
+        return []
+    initials = name['first_initial'] + name['last_initial']
+    return [initials, initials.upper()]
+
+
+# Placeholder -> (values from a parsed profile, weight table or None for rank decay)
+FIELDS: Dict[str, Tuple[Callable[[dict], List[str]], Optional[Dict[str, float]]]] = {
+    'first': (_pick('name', 'first', 'first_capital'), None),
+    'last': (_pick('name', 'last', 'last_capital'), None),
+    'middle': (_pick('name', 'middle'), None),
+    'initials': (_initials, None),
+    'name': (lambda data: collect_components(data)[0], None),
+    'year': (_dob(('year', 'year_short'), lambda dates: list(dates.years() + dates.year_shorts())), None),
+    'year_short': (_dob(('year_short',), lambda dates: list(dates.year_shorts())), None),
+    'month': (_dob(('month', 'month_short'),
+                   lambda dates: _with_short(sorted(pair[:2] for pair in dates.month_days()))), None),
+    'day': (_dob(('day', 'day_short'), lambda dates: _with_short(sorted(pair[2:] for pair in dates.month_days()))),
+            None),
+    'date': (_dob(('full', 'reversed', 'us'),
+                  lambda dates: [day for form in ('full', 'reversed', 'us') for day in dates.slot(form)]), None),
+    'phone': (_pick('phone', 'last4', 'area_code'), None),
+    'phone_full': (_pick('phone', 'full'), None),
+    'number': (lambda data: collect_components(data)[1], None),
+    'city': (_pick('city', 'full', 'capital', 'abbrev'), None),
+    'sep': (lambda data: SEPARATORS, SEPARATOR_WEIGHTS),
+    'suffix': (lambda data: SUFFIXES, SUFFIX_WEIGHTS),
+    'special': (lambda data: SPECIAL_CHARACTERS, None),
+}
+
+# Names used by the web version's passwordPatterns
+ALIASES = {
+    'firstname': 'first',
+    'lastname': 'last',
+    'birthyear': 'year',
+    'birthmonth': 'month',
+    'birthday': 'day',
+    'specialchar': 'special',
+}
+
+PLACEHOLDER = re.compile(r"\{\{|\}\}|\{([^{}]*)\}|[{}]")
+
+
+class Placeholder(NamedTuple):
+    """A template slot: a field, an optional case form and an optional limit"""
+    field: str
+    case: Optional[str] = None
+    limit: Optional[int] = None
+
+
+class Template(NamedTuple):
+    """A compiled template: literal text and placeholders in order"""
+    text: str
+    stage: str
+    weight: float
+    parts: Tuple[Union[str, Placeholder], ...]
+
+
+def compile_placeholder(spec: str, text: str) -> Placeholder:
+    """Compile the inside of a {field:modifier} placeholder"""
+    name, *modifiers = [part.strip() for part in spec.split(':')]
+    if not re.fullmatch(r"\w+", name):
+        raise TemplateError(f"Invalid field {name!r} in template {text!r}")
+    # Names outside the built-in fields refer to the profile's own typed fields
+    field = field_name(name)
+    field = ALIASES.get(field.replace('_', ''), field)
+    # The case of the name selects a case form, as {FirstName} does in the web version
+    case = None
+    if len(name) > 1 and name.isupper():
+        case = 'upper'
+    elif name[:1].isupper():
+        case = 'cap'
+    limit = None
+    for modifier in modifiers:
+        if modifier.isdigit():
+            limit = int(modifier)
+        elif modifier in CASE_FORMS:
+            case = modifier
+        else:
+            raise TemplateError(f"Unknown modifier {modifier!r} in template {text!r}")
+    return Placeholder(field, case, limit)
+
+
+def compile_template(text: str, stage: str = DEFAULT_STAGE, weight: float = 1.0) -> Template:
+    """Split a template into literal text and placeholders, merging adjacent literals"""
+    parts: List[Union[str, Placeholder]] = []
+    literal = ""
+    pos = 0
+    for match in PLACEHOLDER.finditer(text):
+        literal += text[pos:match.start()]
+        pos = match.end()
+        token = match.group(0)
+        if token in ('{{', '}}'):
+            literal += token[0]
+        elif match.group(1) is None:
+            raise TemplateError(f"Unbalanced brace in template {text!r}")
+        else:
+            if literal:
+                parts.append(literal)
+                literal = ""
+            parts.append(compile_placeholder(match.group(1), text))
+    literal += text[pos:]
+    if literal:
+        parts.append(literal)
+    if not parts:
+        raise TemplateError("Empty template")
+    return Template(text, stage, weight, tuple(parts))
+
+
+class TemplateSet:
+    """Compiled templates that build combination plans for any number of profiles"""
+
+    def __init__(self, templates: Iterable[Template]):
+        self.templates = list(templates)
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def resolve(self, data: dict, placeholder: Placeholder) -> Tuple[Tuple[str, ...], Tuple[float, ...]]:
+        """Weighted values of a placeholder for a parsed profile"""
+        if placeholder.field in FIELDS:
+            values_for, table = FIELDS[placeholder.field]
+            values = values_for(data)
+        else:
+            values, table = list(data.get('fields', {}).get(placeholder.field, ())), None
+        if placeholder.case:
+            form = CASE_FORMS[placeholder.case]
+            # Case forms can collapse variants, such as John and JOHN with upper
+            values = list(dict.fromkeys(form(value) for value in values))
+        if placeholder.limit is not None:
+            values = values[:placeholder.limit]
+        return weigh(values, table)
+
+    def build_plans(self, data: dict) -> List[Plan]:
+        """Build one plan per template whose fields are all known for the profile"""
+        resolved: Dict[Placeholder, Tuple[Tuple[str, ...], Tuple[float, ...]]] = {}
+        plans = []
+        for template in self.templates:
+            slots = []
+            prefix = ""
+            for part in template.parts:
+                if isinstance(part, str):
+                    prefix += part
+                    continue
+                slot = resolved.get(part)
+                if slot is None:
+                    slot = resolved[part] = self.resolve(data, part)
+                if not slot[0]:
+                    break
+                if prefix:
+                    # Literal text is folded into the next slot instead of adding a slot
+                    slot = (tuple(prefix + value for value in slot[0]), slot[1])
+                    prefix = ""
+                slots.append(slot)
+            else:
+                if not slots:
+                    slots.append(((prefix,), (1.0,)))
+                elif prefix:
+                    values, weights = slots[-1]
+                    slots[-1] = (tuple(value + prefix for value in values), weights)
+                plans.append(make_plan(template.stage, template.weight, *slots))
+        return plans
+
+
+def parse_templates(lines: Iterable[str]) -> TemplateSet:
+    """Compile template lines, with [stage weight] section headers, blanks and comments"""
+    templates = []
+    stage, weight = DEFAULT_STAGE, 1.0
+    for number, line in enumerate(lines, 1):
+        text = line.strip()
+        if not text or text.startswith('#'):
+            continue
+        header = re.fullmatch(r"\[\s*(\w+)(?:\s+([0-9.]+))?\s*\]", text)
+        if header:
+            stage = header.group(1)
+            try:
+                weight = float(header.group(2)) if header.group(2) else 1.0
+            except ValueError:
+                raise TemplateError(f"Invalid weight in section header on line {number}: {text!r}")
+            continue
+        try:
+            templates.append(compile_template(text, stage, weight))
+        except TemplateError as e:
+            raise TemplateError(f"Line {number}: {e}") from None
+    return TemplateSet(templates)
+
+
+def load_templates(path: str) -> TemplateSet:
+    """Load and compile a template file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_templates(f)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the shared engine the way the front ends do, from the PassCraft directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
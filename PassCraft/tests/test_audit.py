@@ -0,0 +1,50 @@
+import base64
+import hashlib
+
+import pytest
+
+from passcraft import audit
+from passcraft.audit import Auditor, parse_hashes
+
+WORDS = [f"word{i}" for i in range(40)]
+
+
+def django_hash(password: str, salt: str, iterations: int = 10) -> str:
+    key = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), iterations)
+    return f"pbkdf2_sha256${iterations}${salt}${base64.b64encode(key).decode()}"
+
+
+def hash_list():
+    return parse_hashes([
+        f"alice:{django_hash('word3', 'salt1')}",
+        f"bob:{django_hash('word25', 'salt2')}",
+        f"carol:{hashlib.md5(b'word7').hexdigest()}",
+    ])
+
+
+def test_found_accounts_are_not_hashed_again(monkeypatch):
+    calls = []
+    pbkdf2 = hashlib.pbkdf2_hmac
+
+    def counting(digest, data, salt, iterations, length):
+        calls.append(salt)
+        return pbkdf2(digest, data, salt, iterations, length)
+
+    hashes = hash_list()
+    monkeypatch.setattr(audit.hashlib, 'pbkdf2_hmac', counting)
+    auditor = Auditor(hashes, workers=1, chunk=10)
+    matches = list(auditor.iter_matches(WORDS))
+    assert sorted(matches) == [('alice', 'pbkdf2-sha256', 'word3'), ('bob', 'pbkdf2-sha256', 'word25'),
+                               ('carol', 'md5', 'word7')]
+    # alice stops being checked after word3 and bob after word25
+    assert calls.count(b'salt1') == 4
+    assert calls.count(b'salt2') == 26
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_audit_matches_every_account_once(workers):
+    auditor = Auditor(hash_list(), workers=workers, chunk=4)
+    matches = list(auditor.iter_matches(WORDS + WORDS))
+    assert sorted(matches) == [('alice', 'pbkdf2-sha256', 'word3'), ('bob', 'pbkdf2-sha256', 'word25'),
+                               ('carol', 'md5', 'word7')]
+    assert auditor.done
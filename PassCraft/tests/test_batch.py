@@ -0,0 +1,51 @@
+import json
+
+from passcraft.batch import load_profiles, run_batch
+from passcraft.profiles import ProfileParser
+
+
+def parse_file(path) -> tuple:
+    parser = ProfileParser()
+    parsed = list(parser.parse_all(load_profiles(str(path))))
+    return parsed, parser.report()
+
+
+def test_ragged_csv_row_is_reported_and_the_rest_parsed(tmp_path):
+    path = tmp_path / 'targets.csv'
+    path.write_text("id,name,dob,pet\n"
+                    "1,John Smith,1990-05-15,rex\n"
+                    "2,Jane Doe,1985-01-02,tom,extra,values\n", encoding='utf-8')
+    parsed, report = parse_file(path)
+    assert len(parsed) == 2
+    data = parsed[1][1]
+    assert data['name']['first'] == 'jane' and data['dob']['year'] == '1985'
+    assert data['fields']['pet'] == ('tom', 'Tom')
+    assert [(issue['row'], issue['id'], issue['field']) for issue in report['issues']] == [(2, '2', None)]
+    assert 'column headers' in report['issues'][0]['reason']
+
+
+def test_jsonl_object_and_list_values_are_reported_and_skipped(tmp_path):
+    path = tmp_path / 'targets.jsonl'
+    rows = [
+        {'id': 'a', 'name': 'John Smith', 'pet': {'name': 'rex'}, 'team': 'eagles'},
+        {'id': 'b', 'name': {'first': 'Jane'}, 'dob': '1985-01-02', 'pet': ['tom', {'x': 1}, 'max']},
+        {'id': 'c', 'name': 'Ann Lee', 'city': ['Paris']},
+    ]
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding='utf-8')
+    parsed, report = parse_file(path)
+    assert len(parsed) == 3
+    first, second, third = (data for _, data in parsed)
+    assert 'pet' not in first['fields'] and first['fields']['team'] == ('eagles', 'Eagles')
+    assert second['name']['first'] == "" and second['dob']['year'] == '1985'
+    assert second['fields']['pet'] == ('tom', 'Tom', 'max', 'Max')
+    assert third['city'] == {} and third['name']['first'] == 'ann'
+    assert [(issue['id'], issue['field']) for issue in report['issues']] == [
+        ('a', 'pet'), ('b', 'name'), ('b', 'pet'), ('c', 'city')]
+
+
+def test_batch_run_keeps_going_past_bad_rows(tmp_path):
+    path = tmp_path / 'targets.csv'
+    path.write_text("id,name,dob\n1,John Smith,1990-05-15,extra\n2,Jane Doe,1985-01-02\n", encoding='utf-8')
+    manifest = run_batch(str(path), str(tmp_path / 'out'), workers=1)
+    assert manifest['targets'] == 2 and all(entry['count'] for entry in manifest['files'])
+    assert manifest['parsing']['issue_count'] == 1
@@ -0,0 +1,132 @@
+import gzip
+from functools import partial
+from itertools import islice
+
+import pytest
+
+from passcraft import cli
+from passcraft.checkpoint import Checkpoint, iter_checkpointed
+from passcraft.cli import main
+from passcraft.dedup import BYTES_PER_ITEM
+from passcraft.engine import CandidateEngine, parse_profile
+from passcraft.sinks import FileSink
+
+PROFILE = ['--name', 'John', '--dob', '1990-05-15', '--raw']
+
+
+def lines(path) -> list:
+    with open(path, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def run(*argv):
+    assert main(PROFILE + list(argv)) == 0
+
+
+@pytest.mark.parametrize('limit', [1, 3, 503, 1000])
+def test_resumed_run_matches_uninterrupted_run(tmp_path, limit):
+    full, resumed, state = tmp_path / 'full.txt', tmp_path / 'resumed.txt', str(tmp_path / 'run.json')
+    run('--no-dedup', '-o', str(full))
+    # --limit stops the first run part-way through a base word's variations
+    run('--no-dedup', '-o', str(resumed), '--checkpoint', state, '--limit', str(limit))
+    run('--no-dedup', '-o', str(resumed), '--checkpoint', state)
+    assert lines(resumed) == lines(full)
+
+
+def test_resumed_run_with_dedup_loses_nothing(tmp_path):
+    full, resumed, state = tmp_path / 'full.txt', tmp_path / 'resumed.txt', str(tmp_path / 'run.json')
+    run('-o', str(full))
+    run('-o', str(resumed), '--checkpoint', state, '--limit', '503')
+    run('-o', str(resumed), '--checkpoint', state)
+    # Dedup starts over on resume, so only the set of lines is the same
+    assert set(lines(resumed)) == set(lines(full))
+
+
+def test_crash_between_checkpoints_resumes_after_last_saved_candidate(tmp_path):
+    engine = CandidateEngine(dedup=False)
+    data = parse_profile("John", "1990-05-15", "", "")
+    expected = list(engine.iter_range(data))
+    end = engine.keyspace_size(data)
+    path = str(tmp_path / 'out.txt')
+    checkpoint = Checkpoint(str(tmp_path / 'run.json'), 'key')
+
+    def crashing():
+        for count, word in enumerate(engine.iter_range(data)):
+            if count == 400:
+                raise KeyboardInterrupt
+            yield word
+
+    sink = FileSink(path, header=False)
+    with pytest.raises(KeyboardInterrupt):
+        sink.consume(iter_checkpointed(crashing(), engine, sink, checkpoint, end, every=7))
+    # The aborted sink writes out everything it was handed, past the last checkpoint
+    assert len(lines(path)) == 400
+    state = checkpoint.load()
+    assert state['skip'] > 0
+
+    sink = FileSink(path, header=False, append=True, truncate=state['sizes'][path])
+    rest = islice(engine.iter_range(data, state['position']), state['skip'], None)
+    sink.consume(iter_checkpointed(rest, engine, sink, checkpoint, end, skipped=state['skip']))
+    assert lines(path) == expected
+    assert checkpoint.load()['done']
+
+
+def read_outputs(directory, name) -> list:
+    words = []
+    for path in sorted(directory.glob(name)):
+        with (gzip.open(path, 'rt', encoding='utf-8') if path.suffix == '.gz' else open(path, encoding='utf-8')) as f:
+            words += f.read().splitlines()
+    return words
+
+
+@pytest.mark.parametrize('output,pattern,options', [
+    ('out.txt', 'out.txt', []),
+    ('out.txt.gz', 'out.txt.gz', []),
+    ('out.txt', 'out.len*.txt', ['--shard-by-length']),
+])
+def test_interrupted_run_resumes_without_repeating_candidates(tmp_path, monkeypatch, output, pattern, options):
+    full, resumed, state = tmp_path / 'full', tmp_path / 'resumed', str(tmp_path / 'run.json')
+    full.mkdir()
+    resumed.mkdir()
+    run('--no-dedup', '-o', str(full / output), *options)
+
+    monkeypatch.setattr(cli, 'iter_checkpointed', partial(iter_checkpointed, every=100))
+    iter_range = CandidateEngine.iter_range
+
+    def interrupted(self, *args):
+        for count, word in enumerate(iter_range(self, *args)):
+            if count == 1234:
+                raise KeyboardInterrupt
+            yield word
+
+    monkeypatch.setattr(CandidateEngine, 'iter_range', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        main(PROFILE + ['--no-dedup', '-o', str(resumed / output), '--checkpoint', state] + options)
+    # The interrupted run wrote past its last checkpoint
+    assert len(read_outputs(resumed, pattern)) == 1234
+
+    monkeypatch.setattr(CandidateEngine, 'iter_range', iter_range)
+    run('--no-dedup', '-o', str(resumed / output), '--checkpoint', state, *options)
+    assert read_outputs(resumed, pattern) == read_outputs(full, pattern)
+
+
+def test_spilled_dedup_holds_checkpoint_until_deferred_candidates_are_written(tmp_path):
+    data = parse_profile("John", "1990-05-15", "", "")
+    expected = set(CandidateEngine().iter_range(data))
+    engine = CandidateEngine(dedup_memory=100 * BYTES_PER_ITEM, spill_dir=str(tmp_path))
+    # A loose filter defers plenty of new candidates as possible repeats
+    engine.deduplicator.error_rate = 0.3
+    end = engine.keyspace_size(data)
+    path = str(tmp_path / 'out.txt')
+    checkpoint = Checkpoint(str(tmp_path / 'run.json'), 'key')
+
+    sink = FileSink(path, header=False)
+    sink.consume(iter_checkpointed(islice(engine.iter_range(data), 500), engine, sink, checkpoint, end, every=50))
+    assert engine.deduplicator.deferring
+    state = checkpoint.load()
+
+    engine = CandidateEngine(dedup_memory=100 * BYTES_PER_ITEM, spill_dir=str(tmp_path))
+    sink = FileSink(path, header=False, append=True, truncate=state['sizes'][path])
+    rest = islice(engine.iter_range(data, state['position']), state['skip'], None)
+    sink.consume(iter_checkpointed(rest, engine, sink, checkpoint, end, skipped=state['skip']))
+    assert set(lines(path)) == expected
@@ -0,0 +1,23 @@
+from passcraft.engine import GUI_CITY_ABBREVIATIONS, CandidateEngine, parse_city, parse_profile
+
+
+def test_command_line_city_abbreviations_are_unchanged():
+    assert parse_city("Paris")['abbrev'] == 'par'
+    assert parse_city("Berlin")['abbrev'] == 'ber'
+    assert parse_city("New York")['abbrev'] == 'ny'
+
+
+def test_gui_knows_more_city_abbreviations():
+    assert parse_city("Paris", GUI_CITY_ABBREVIATIONS)['abbrev'] == 'prs'
+    assert parse_city("Tokyo", GUI_CITY_ABBREVIATIONS)['abbrev'] == 'tky'
+
+
+def test_gui_table_only_changes_abbreviated_candidates():
+    engine = CandidateEngine(variations=False)
+    cli = set(engine.iter_candidates(parse_profile("John Smith", "1990-05-15", "Paris", "")))
+    gui = set(engine.iter_candidates(parse_profile("John Smith", "1990-05-15", "Paris", "",
+                                                   abbreviations=GUI_CITY_ABBREVIATIONS)))
+    assert 'par1990' in cli and 'par1990' not in gui
+    assert 'prs1990' in gui and 'prs1990' not in cli
+    assert all('par' in word.lower() for word in cli - gui)
+    assert all('prs' in word.lower() for word in gui - cli)
@@ -0,0 +1,30 @@
+import pytest
+
+from passcraft.dates import DateSequence
+from passcraft.engine import CandidateEngine, parse_profile
+from passcraft.leet import LeetExpander
+from passcraft.oracle import MembershipOracle
+
+PASSWORDS = ['abcdefgh', 'j0hn1990', 'J0HN1975', 'zzzzzzzz', 'j0hn15051985', '5m1th1960!']
+
+
+@pytest.mark.parametrize('engine', [CandidateEngine(patterns='extended'), CandidateEngine(rules=LeetExpander())],
+                         ids=['extended', 'leet'])
+def test_leet_checks_with_a_date_range_do_not_enumerate_dates(engine, monkeypatch):
+    oracle = MembershipOracle(engine, parse_profile("John Smith", "1960-2000", "", ""))
+    # The first checks build the per-slot lookup tables
+    expected = [oracle.explain(password) for password in PASSWORDS]
+    assert expected[1] is not None and expected[0] is None
+
+    def enumerated(*args):
+        raise AssertionError("a check walked every day of a date slot")
+
+    monkeypatch.setattr(DateSequence, '__iter__', enumerated)
+    monkeypatch.setattr(DateSequence, '__getitem__', enumerated)
+    assert [oracle.explain(password) for password in PASSWORDS] == expected
+
+
+def test_leet_matches_substituted_dates():
+    oracle = MembershipOracle(CandidateEngine(rules=LeetExpander()), parse_profile("John Smith", "1980-1990", "", ""))
+    assert oracle.explain('j0hn1985')['base'] == 'john1985'
+    assert 'j0hn1979' not in oracle
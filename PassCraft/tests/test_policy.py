@@ -0,0 +1,30 @@
+import pytest
+
+from passcraft.engine import CandidateEngine, parse_profile
+from passcraft.policy import Policy
+
+PROFILE = parse_profile("John Parker", "1990-05-14", "London", "5551234")
+POLICIES = [Policy(min_length=10), Policy(max_length=6), Policy(require=['upper', 'digit'], min_length=8),
+            Policy(banned='0'), Policy(min_length=12, max_length=14, banned='a')]
+
+
+@pytest.mark.parametrize('policy', POLICIES)
+@pytest.mark.parametrize('start,stop', [(0, None), (37, 400)])
+def test_indexed_order_prunes_without_moving_positions(policy, start, stop):
+    plain = CandidateEngine(variations=False, dedup=False)
+    expected = [(plain.position, word) for word in plain.iter_range(PROFILE, start, stop) if policy.check(word)]
+    engine = CandidateEngine(variations=False, dedup=False, policy=policy)
+    assert [(engine.position, word) for word in engine.iter_range(PROFILE, start, stop)] == expected
+    stats = engine.policy_stats
+    assert stats['pruned'] > 0 and stats['filtered'] == 0
+    total = plain.keyspace_size(PROFILE) if stop is None else stop
+    assert stats['pruned'] + stats['passed'] == total - start
+
+
+@pytest.mark.parametrize('policy', POLICIES)
+def test_likely_order_prunes_base_words(policy):
+    plain = CandidateEngine(variations=False)
+    expected = [pair for pair in plain.iter_ranked(PROFILE) if policy.check(pair[1])]
+    engine = CandidateEngine(variations=False, policy=policy)
+    assert list(engine.iter_ranked(PROFILE)) == expected
+    assert engine.policy_stats['pruned'] > 0
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import os
+import stat
+import sys
+import time
+
+import pytest
+
+from passcraft.engine import CandidateEngine
+from passcraft.service import CheckService
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="Unix sockets")
+def test_unix_socket_is_private_from_creation(tmp_path, monkeypatch):
+    path = str(tmp_path / 'check.sock')
+    seen = []
+    # Only the mode the socket is created with counts, not a chmod after the fact
+    monkeypatch.setattr(os, 'chmod', lambda *args, **kwargs: None)
+
+    async def probe():
+        serving = asyncio.ensure_future(CheckService(CandidateEngine()).serve(socket_path=path))
+        while not os.path.exists(path):
+            await asyncio.sleep(0.01)
+        seen.append((stat.S_IMODE(os.stat(path).st_mode), os.umask(0)))
+        serving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await serving
+
+    # A permissive umask must neither reach the socket nor be left changed
+    previous = os.umask(0)
+    try:
+        asyncio.run(probe())
+    finally:
+        os.umask(previous)
+    assert seen == [(0o600, 0)]
+
+
+async def request(path: str, method: str, target: str, document=None) -> dict:
+    reader, writer = await asyncio.open_unix_connection(path)
+    body = json.dumps(document).encode() if document is not None else b""
+    writer.write(f"{method} {target} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                 + body)
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="Unix sockets")
+def test_profile_builds_leave_the_service_responsive(tmp_path):
+    path = str(tmp_path / 'check.sock')
+    service = CheckService(CandidateEngine())
+    builds = []
+    compile_profile = service.cache.build
+
+    def slow_build(profile):
+        builds.append(profile)
+        time.sleep(0.5)
+        return compile_profile(profile)
+
+    service.cache.build = slow_build
+    check = {'profile': {'name': 'John Smith', 'dob': '1990-05-15'}, 'password': 'john1990'}
+
+    async def probe():
+        serving = asyncio.ensure_future(service.serve(socket_path=path))
+        while not os.path.exists(path):
+            await asyncio.sleep(0.01)
+        checks = [asyncio.ensure_future(request(path, 'POST', '/check', check)) for _ in range(2)]
+        await asyncio.sleep(0.1)
+        stats = await request(path, 'GET', '/stats')
+        results = await asyncio.gather(*checks)
+        serving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await serving
+        return stats, results
+
+    stats, results = asyncio.run(probe())
+    # /stats is answered while the build is still running, and both checks share it
+    assert stats['checks'] == 0
+    assert stats['cache']['building'] == 1
+    assert len(builds) == 1
+    assert all(result['derivable'] for result in results)
@@ -0,0 +1,25 @@
+import os
+
+from passcraft.engine import CandidateEngine, parse_profile
+from passcraft.templates import load_templates, parse_templates
+
+WEB_TEMPLATES = os.path.join(os.path.dirname(__file__), '..', 'templates', 'web.txt')
+
+
+def candidates(templates, dob: str) -> set:
+    engine = CandidateEngine(variations=False, templates=templates)
+    return set(engine.iter_candidates(parse_profile("John Smith", dob, "", "")))
+
+
+def test_date_placeholders_take_every_day_of_a_partial_date():
+    templates = parse_templates(["{first}{year}", "{first}{month}{day}", "{first}{date}"])
+    words = candidates(templates, "1990-05")
+    assert {'john1990', 'john90', 'john0515', 'john515', 'john0531', 'john19900515', 'john05151990'} <= words
+    assert 'john0615' not in words
+
+
+def test_partial_date_covers_every_exact_date_within_it():
+    templates = load_templates(WEB_TEMPLATES)
+    exact = candidates(templates, "1990-05-15")
+    assert candidates(templates, "1990") >= exact
+    assert candidates(templates, "1990-05") >= exact
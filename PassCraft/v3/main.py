@@ -3,14 +3,161 @@ Personal Information Password Generator - GUI Version
 Generates password combinations from user's personal information
 """
 
-import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext, filedialog
-import itertools
-import re
+from array import array
 from datetime import datetime
-from typing import List, Set
-import threading
+from itertools import islice
+from typing import Iterator, List
+import queue
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from passcraft.engine import GUI_CITY_ABBREVIATIONS, CandidateEngine, parse_profile
+from passcraft.jobs import JobScheduler, export_job, generation_job
+from passcraft.results import ResultStore
+
+# tkinter is loaded when the GUI starts, so the module imports on headless machines
+tk = ttk = messagebox = scrolledtext = filedialog = None
+
+
+def load_tkinter():
+    """Import tkinter on demand"""
+    global tk, ttk, messagebox, scrolledtext, filedialog
+    import tkinter as tk
+    import tkinter.font
+    from tkinter import ttk, messagebox, scrolledtext, filedialog
+
+
+# Matches collected per idle callback while filtering, so typing stays responsive
+SEARCH_CHUNK = 20000
+
+# Milliseconds between checks of a running job's progress queue
+POLL_INTERVAL = 50
+
+# Save formats offered in the GUI and their compression
+SAVE_FORMATS = {'Text': None, 'gzip': 'gzip', 'bz2': 'bz2', 'lzma': 'lzma'}
+
+
+class VirtualList:
+    """Scrollable list that renders only the visible rows of a ResultStore"""
+
+    def __init__(self, parent, font=('Courier', 10)):
+        self.frame = ttk.Frame(parent)
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(0, weight=1)
+
+        self.listbox = tk.Listbox(self.frame,
+                                  font=font,
+                                  height=15,
+                                  bg='white',
+                                  relief=tk.SUNKEN,
+                                  borderwidth=1,
+                                  activestyle='none')
+        self.listbox.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar = ttk.Scrollbar(self.frame, command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+
+        self.store = ResultStore()
+        self.matches = None  # Store indexes passing the filter, or None for all
+        self.top = 0
+        self.rows = 15
+        self.line_height = tk.font.Font(font=font).metrics('linespace') + 1
+        self._search_job = None
+
+        self.listbox.bind('<Configure>', self._on_resize)
+        self.listbox.bind('<MouseWheel>', lambda e: self.scroll(-1 if e.delta > 0 else 1, 'units'))
+        self.listbox.bind('<Button-4>', lambda e: self.scroll(-1, 'units'))
+        self.listbox.bind('<Button-5>', lambda e: self.scroll(1, 'units'))
+        self.listbox.bind('<Prior>', lambda e: self.scroll(-1, 'pages'))
+        self.listbox.bind('<Next>', lambda e: self.scroll(1, 'pages'))
+        self.listbox.bind('<Home>', lambda e: self.yview('moveto', 0))
+        self.listbox.bind('<End>', lambda e: self.yview('moveto', 1))
+
+    def grid(self, **kwargs):
+        """Place the list in its parent"""
+        self.frame.grid(**kwargs)
+
+    def __len__(self):
+        return len(self.store) if self.matches is None else len(self.matches)
+
+    def set_store(self, store):
+        """Show a new result store from the top"""
+        self.cancel_search()
+        self.store = store
+        self.matches = None
+        self.top = 0
+        self.refresh()
+
+    def refresh(self):
+        """Redraw the visible rows and the scrollbar"""
+        total = len(self)
+        self.top = max(0, min(self.top, total - self.rows))
+        end = min(self.top + self.rows, total)
+        rows = []
+        for position in range(self.top, end):
+            index = position if self.matches is None else self.matches[position]
+            rows.append(f"{index + 1:4}. {self.store[index]}")
+        self.listbox.delete(0, tk.END)
+        if rows:
+            self.listbox.insert(tk.END, *rows)
+        if total:
+            self.scrollbar.set(self.top / total, end / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def yview(self, *args):
+        """Scrollbar callback: 'moveto fraction' or 'scroll n units|pages'"""
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * len(self))
+            self.refresh()
+        elif args[0] == 'scroll':
+            self.scroll(int(args[1]), args[2])
+
+    def scroll(self, amount, what):
+        """Move by rows or by pages"""
+        self.top += amount * (self.rows if what == 'pages' else 1)
+        self.refresh()
+        return 'break'
+
+    def _on_resize(self, event):
+        rows = max(1, event.height // self.line_height)
+        if rows != self.rows:
+            self.rows = rows
+            self.refresh()
+
+    def set_filter(self, query, on_progress=None):
+        """Show only rows containing the query, matched incrementally in the background"""
+        self.cancel_search()
+        self.top = 0
+        if not query:
+            self.matches = None
+            self.refresh()
+            if on_progress:
+                on_progress(len(self), True)
+            return
+        self.matches = array('Q')
+        self._search_step(self.store.iter_matches(query), on_progress)
+
+    def _search_step(self, matches, on_progress):
+        found = len(self.matches)
+        self.matches.extend(islice(matches, SEARCH_CHUNK))
+        done = len(self.matches) - found < SEARCH_CHUNK
+        if found < self.top + self.rows:
+            # Only redraw while the new matches can still reach the visible rows
+            self.refresh()
+        else:
+            self.scrollbar.set(self.top / len(self), min(self.top + self.rows, len(self)) / len(self))
+        if on_progress:
+            on_progress(len(self.matches), done)
+        self._search_job = None if done else self.listbox.after(1, self._search_step, matches, on_progress)
+
+    def cancel_search(self):
+        """Stop a filter that is still collecting matches"""
+        if self._search_job is not None:
+            self.listbox.after_cancel(self._search_job)
+            self._search_job = None
+
 
 class PasswordGeneratorGUI:
     def __init__(self, root):
@@ -32,7 +179,13 @@ class PasswordGeneratorGUI:
         self.main_container.columnconfigure(1, weight=1)
         
         # Initialize variables
-        self.generated_passwords = []
+        self.engine = CandidateEngine(patterns='extended')
+        self.results = ResultStore()
+        self.scheduler = JobScheduler()
+        self.exporter = JobScheduler()
+        self.job = None
+        self.export = None
+        self._search_after = None
         self.setup_variables()
         
         # Build UI
@@ -83,6 +236,10 @@ class PasswordGeneratorGUI:
         self.status_var = tk.StringVar(value="Ready")
         self.password_count_var = tk.StringVar(value="0 passwords generated")
         self.progress_var = tk.IntVar(value=0)
+        self.format_var = tk.StringVar(value="Text")
+        self.raw_var = tk.BooleanVar(value=False)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', self.on_search_changed)
         
     def center_window(self):
         """Center the window on screen"""
@@ -180,6 +337,13 @@ class PasswordGeneratorGUI:
                                  command=self.start_generation)
         generate_btn.pack(side=tk.LEFT, padx=(0, 10))
         
+        # Cancel Button
+        self.cancel_btn = ttk.Button(button_frame,
+                                    text="⏹ Cancel",
+                                    command=self.cancel_generation,
+                                    state='disabled')
+        self.cancel_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
         # Clear Button
         clear_btn = ttk.Button(button_frame,
                               text="Clear All",
@@ -226,34 +390,26 @@ class PasswordGeneratorGUI:
         results_frame.grid(row=4, column=0, columnspan=3, 
                           sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 15))
         results_frame.columnconfigure(0, weight=1)
-        results_frame.rowconfigure(0, weight=1)
-        
-        # Create Text Widget with Scrollbar
-        text_frame = ttk.Frame(results_frame)
-        text_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        text_frame.columnconfigure(0, weight=1)
-        text_frame.rowconfigure(0, weight=1)
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(text_frame)
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        
-        # Text Widget
-        self.results_text = tk.Text(text_frame,
-                                   wrap=tk.WORD,
-                                   yscrollcommand=scrollbar.set,
-                                   font=('Courier', 10),
-                                   height=15,
-                                   bg='white',
-                                   relief=tk.SUNKEN,
-                                   borderwidth=1)
-        self.results_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        
-        scrollbar.config(command=self.results_text.yview)
+        results_frame.rowconfigure(1, weight=1)
+        
+        # Search Frame
+        search_frame = ttk.Frame(results_frame)
+        search_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
+        ttk.Label(search_frame, text="🔍 Filter:").pack(side=tk.LEFT)
+        search_entry = ttk.Entry(search_frame,
+                                textvariable=self.search_var,
+                                width=30)
+        search_entry.pack(side=tk.LEFT, padx=(5, 10))
+        self.match_label = ttk.Label(search_frame, text="")
+        self.match_label.pack(side=tk.LEFT)
+        
+        # Results List, rendering only the visible rows
+        self.results_view = VirtualList(results_frame)
+        self.results_view.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Save Button Frame
         save_frame = ttk.Frame(results_frame)
-        save_frame.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
+        save_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
         
         # Filename Entry
         ttk.Label(save_frame, text="Save as:").pack(side=tk.LEFT)
@@ -268,6 +424,18 @@ class PasswordGeneratorGUI:
                                command=self.browse_file)
         browse_btn.pack(side=tk.LEFT, padx=(0, 10))
         
+        # Format Options
+        format_box = ttk.Combobox(save_frame,
+                                 textvariable=self.format_var,
+                                 values=list(SAVE_FORMATS),
+                                 state='readonly',
+                                 width=6)
+        format_box.pack(side=tk.LEFT, padx=(0, 5))
+        raw_check = ttk.Checkbutton(save_frame,
+                                   text="Raw",
+                                   variable=self.raw_var)
+        raw_check.pack(side=tk.LEFT, padx=(0, 10))
+        
         # Save Button
         self.save_btn = ttk.Button(save_frame,
                                   text="💾 Save to File",
@@ -295,224 +463,14 @@ class PasswordGeneratorGUI:
         
     # ===== Password Generation Methods =====
     
-    def clean_input(self, text: str) -> str:
-        """Clean and normalize input text"""
-        if not text:
-            return ""
-        return text.strip().lower()
-    
-    def extract_parts(self, name: str) -> dict:
-        """Extract different parts from name"""
-        name = self.clean_input(name)
-        parts = {}
-        
-        name_parts = name.split()
-        parts['first'] = name_parts[0] if len(name_parts) > 0 else ""
-        parts['last'] = name_parts[-1] if len(name_parts) > 1 else ""
-        parts['middle'] = name_parts[1] if len(name_parts) > 2 else ""
-        
-        parts['first_initial'] = parts['first'][0] if parts['first'] else ""
-        parts['last_initial'] = parts['last'][0] if parts['last'] else ""
-        
-        parts['first_capital'] = parts['first'].capitalize() if parts['first'] else ""
-        parts['last_capital'] = parts['last'].capitalize() if parts['last'] else ""
-        
-        return parts
-    
-    def parse_dob(self, dob: str) -> dict:
-        """Parse date of birth into different formats"""
-        dob = self.clean_input(dob)
-        parts = {}
-        
-        try:
-            for fmt in ['%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d']:
-                try:
-                    date_obj = datetime.strptime(dob, fmt)
-                    parts['year'] = str(date_obj.year)
-                    parts['year_short'] = parts['year'][2:]
-                    parts['month'] = f"{date_obj.month:02d}"
-                    parts['month_short'] = str(date_obj.month)
-                    parts['day'] = f"{date_obj.day:02d}"
-                    parts['day_short'] = str(date_obj.day)
-                    parts['full'] = date_obj.strftime('%Y%m%d')
-                    parts['reversed'] = date_obj.strftime('%d%m%Y')
-                    parts['us'] = date_obj.strftime('%m%d%Y')
-                    break
-                except ValueError:
-                    continue
-        except:
-            numbers = re.findall(r'\d+', dob)
-            if numbers:
-                parts['numbers'] = numbers
-                
-        return parts
-    
-    def parse_phone(self, phone: str) -> dict:
-        """Extract different parts from phone number"""
-        phone = self.clean_input(phone)
-        parts = {}
-        
-        digits = re.sub(r'\D', '', phone)
-        
-        if digits:
-            parts['full'] = digits
-            parts['last4'] = digits[-4:] if len(digits) >= 4 else digits
-            parts['last3'] = digits[-3:] if len(digits) >= 3 else digits
-            parts['area_code'] = digits[:3] if len(digits) >= 3 else digits
-            
-            if len(digits) == 10:
-                parts['first3'] = digits[:3]
-                parts['middle3'] = digits[3:6]
-                parts['last4'] = digits[6:]
-        
-        return parts
-    
-    def parse_city(self, city: str) -> dict:
-        """Extract city variations"""
-        city = self.clean_input(city)
-        parts = {}
-        
-        if city:
-            parts['full'] = city
-            parts['capital'] = city.capitalize()
-            parts['upper'] = city.upper()
-            
-            abbrev_map = {
-                'new york': 'ny',
-                'los angeles': 'la',
-                'san francisco': 'sf',
-                'chicago': 'chi',
-                'london': 'ldn',
-                'mumbai': 'mum',
-                'delhi': 'dlh',
-                'tokyo': 'tky',
-                'paris': 'prs',
-                'berlin': 'ber'
-            }
-            
-            parts['abbrev'] = abbrev_map.get(city, city[:3])
-            
-        return parts
+    def iter_passwords(self, name: str, dob: str, city: str, phone: str) -> Iterator[str]:
+        """Stream passwords from information one at a time"""
+        return self.engine.iter_candidates(parse_profile(name, dob, city, phone,
+                                                         abbreviations=GUI_CITY_ABBREVIATIONS))
     
     def generate_passwords(self, name: str, dob: str, city: str, phone: str) -> List[str]:
         """Generate passwords from information"""
-        # Parse all information
-        name_data = self.extract_parts(name)
-        dob_data = self.parse_dob(dob)
-        city_data = self.parse_city(city)
-        phone_data = self.parse_phone(phone)
-        
-        data = {
-            'name': name_data,
-            'dob': dob_data,
-            'city': city_data,
-            'phone': phone_data
-        }
-        
-        # Generate passwords
-        passwords = set()
-        
-        # Basic components
-        components = []
-        
-        # Name components
-        if name_data['first']:
-            components.append(name_data['first'])
-            components.append(name_data['first_capital'])
-        if name_data['last']:
-            components.append(name_data['last'])
-            components.append(name_data['last_capital'])
-        if name_data['first_initial'] and name_data['last_initial']:
-            components.append(name_data['first_initial'] + name_data['last_initial'])
-            components.append(name_data['first_initial'].upper() + name_data['last_initial'].upper())
-        
-        # Number components
-        numbers = []
-        if dob_data:
-            if 'year' in dob_data:
-                numbers.extend([dob_data['year'], dob_data['year_short']])
-            if 'month' in dob_data:
-                numbers.extend([dob_data['month'], dob_data['month_short']])
-            if 'day' in dob_data:
-                numbers.extend([dob_data['day'], dob_data['day_short']])
-        
-        if phone_data:
-            if 'last4' in phone_data:
-                numbers.append(phone_data['last4'])
-            if 'area_code' in phone_data:
-                numbers.append(phone_data['area_code'])
-            if 'full' in phone_data:
-                numbers.append(phone_data['full'])
-        
-        # City components
-        cities = []
-        if city_data.get('full'):
-            cities.extend([city_data['full'], city_data['capital'], city_data['abbrev']])
-        
-        # Common suffixes
-        suffixes = ["", "123", "!", "@123", "123!", "2024", "2025", "007", "111", "999"]
-        separators = ["", ".", "_", "-", "@", "#"]
-        
-        # Generate combinations
-        for comp in components:
-            # Simple combinations
-            passwords.add(comp)
-            
-            # With numbers
-            for num in numbers[:10]:  # Limit to first 10 numbers
-                passwords.add(comp + num)
-                for sep in separators[:3]:
-                    passwords.add(comp + sep + num)
-                    for suffix in suffixes[:5]:
-                        passwords.add(comp + sep + num + suffix)
-            
-            # With cities
-            for city in cities:
-                passwords.add(comp + city)
-                passwords.add(city + comp)
-                for sep in separators[:2]:
-                    passwords.add(comp + sep + city)
-                    for suffix in suffixes[:3]:
-                        passwords.add(comp + sep + city + suffix)
-        
-        # Number-only combinations
-        for num in numbers[:5]:
-            passwords.add(num)
-            for suffix in suffixes:
-                passwords.add(num + suffix)
-        
-        # City + number combinations
-        for city in cities:
-            for num in numbers[:5]:
-                passwords.add(city + num)
-                passwords.add(num + city)
-        
-        # Special patterns
-        if name_data['first'] and dob_data.get('year_short'):
-            passwords.add(name_data['first'] + dob_data['year_short'])
-            passwords.add(name_data['first_capital'] + dob_data['year_short'])
-            passwords.add(name_data['first'] + name_data['last_initial'].upper() + dob_data['year_short'])
-        
-        if name_data['last'] and dob_data.get('year_short'):
-            passwords.add(name_data['last'] + dob_data['year_short'])
-            passwords.add(name_data['last_capital'] + dob_data['year_short'])
-        
-        # Leetspeak variations
-        leet_passwords = set()
-        for pwd in list(passwords)[:200]:  # Limit leetspeak to first 200
-            leet = (pwd.replace('a', '@').replace('A', '@')
-                       .replace('e', '3').replace('E', '3')
-                       .replace('i', '1').replace('I', '1')
-                       .replace('o', '0').replace('O', '0')
-                       .replace('s', '$').replace('S', '$'))
-            if leet != pwd:
-                leet_passwords.add(leet)
-        
-        passwords.update(leet_passwords)
-        
-        # Convert to sorted list
-        password_list = sorted(list(passwords))
-        return password_list
+        return list(self.iter_passwords(name, dob, city, phone))
     
     # ===== GUI Event Handlers =====
     
@@ -529,53 +487,78 @@ class PasswordGeneratorGUI:
         self.save_btn.config(state='disabled')
         
         # Clear previous results
-        self.results_text.delete(1.0, tk.END)
+        self.results_view.set_store(ResultStore())
         self.password_count_var.set("Generating...")
         self.status_var.set("Generating passwords...")
         self.progress_var.set(0)
         
-        # Start generation in separate thread
-        thread = threading.Thread(target=self.generate_passwords_thread)
-        thread.daemon = True
-        thread.start()
-    
-    def generate_passwords_thread(self):
-        """Thread function for password generation"""
         try:
-            # Get inputs
-            name = self.name_var.get()
-            dob = self.dob_var.get()
-            city = self.city_var.get()
-            phone = self.phone_var.get()
-            
-            # Update progress
-            self.root.after(0, lambda: self.progress_var.set(25))
-            self.root.after(0, lambda: self.status_var.set("Parsing information..."))
-            
-            # Generate passwords
-            passwords = self.generate_passwords(name, dob, city, phone)
-            
-            # Update progress
-            self.root.after(0, lambda: self.progress_var.set(75))
-            self.root.after(0, lambda: self.status_var.set("Formatting results..."))
-            
-            # Store passwords
-            self.generated_passwords = passwords
-            
-            # Update UI in main thread
-            self.root.after(0, self.update_results_ui, passwords)
-            
-        except Exception as e:
-            self.root.after(0, lambda: self.show_error(str(e)))
+            data = parse_profile(self.name_var.get(), self.dob_var.get(),
+                                 self.city_var.get(), self.phone_var.get(), abbreviations=GUI_CITY_ABBREVIATIONS)
+        except ValueError as e:
+            # A date of birth range wider than a century is rejected before any job starts
+            self.scheduler.cancel()
+            self.job = None
+            self.cancel_btn.config(state='disabled')
+            self.show_error(str(e))
+            return
+        
+        # Run generation on the single worker; this cancels any job still running
+        self.job = self.scheduler.submit(generation_job(self.engine, data))
+        self.cancel_btn.config(state='normal')
+        self.root.after(POLL_INTERVAL, self.poll_job, self.job)
+    
+    def cancel_generation(self):
+        """Stop the running generation"""
+        self.scheduler.cancel()
+    
+    def poll_job(self, job):
+        """Apply the events a generation job has reported since the last poll"""
+        if job is not self.job:
+            # A newer job replaced this one; its events no longer matter
+            return
+        while True:
+            try:
+                kind, payload = job.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                self.show_progress(payload)
+            elif kind == 'done':
+                self.job = None
+                self.cancel_btn.config(state='disabled')
+                self.update_results_ui(payload)
+                return
+            elif kind == 'cancelled':
+                self.job = None
+                self.cancel_btn.config(state='disabled')
+                self.progress_var.set(0)
+                self.password_count_var.set("Generation cancelled")
+                self.status_var.set("Generation cancelled")
+                return
+            elif kind == 'error':
+                self.job = None
+                self.cancel_btn.config(state='disabled')
+                self.show_error(str(payload))
+                return
+        self.root.after(POLL_INTERVAL, self.poll_job, job)
+    
+    def show_progress(self, progress):
+        """Show how far the engine has got, overall and in the current stage"""
+        total = progress['total']
+        self.progress_var.set(int(100 * progress['position'] / total) if total else 100)
+        self.password_count_var.set(f"{progress['count']} passwords so far")
+        stage = progress['stage']
+        if stage is not None:
+            done, stage_total = progress['stages'][stage]
+            self.status_var.set(f"Generating {stage} patterns: {done}/{stage_total} base words")
     
     def update_results_ui(self, passwords):
         """Update UI with generated passwords"""
-        # Clear text widget
-        self.results_text.delete(1.0, tk.END)
-        
-        # Insert passwords
-        for i, pwd in enumerate(passwords, 1):
-            self.results_text.insert(tk.END, f"{i:4}. {pwd}\n")
+        # Only the visible rows are drawn, however many passwords there are
+        self.results = passwords
+        self.results_view.set_store(passwords)
+        self.apply_filter()
         
         # Update counters
         count = len(passwords)
@@ -595,7 +578,7 @@ class PasswordGeneratorGUI:
     
     def save_to_file(self):
         """Save generated passwords to file"""
-        if not self.generated_passwords:
+        if not self.results:
             messagebox.showwarning("No Passwords", 
                                  "No passwords to save. Generate passwords first.")
             return
@@ -604,28 +587,54 @@ class PasswordGeneratorGUI:
         if not filename:
             filename = "generated_passwords.txt"
         
-        try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(f"# Password Dictionary Generated from Personal Information\n")
-                f.write(f"# Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"# Total Passwords: {len(self.generated_passwords)}\n")
-                f.write("#" * 60 + "\n\n")
-                
-                for pwd in self.generated_passwords:
-                    f.write(f"{pwd}\n")
-            
-            self.status_var.set(f"Saved {len(self.generated_passwords)} passwords to {filename}")
-            messagebox.showinfo("Success", 
-                              f"Passwords saved to:\n{os.path.abspath(filename)}")
-            
-        except Exception as e:
-            messagebox.showerror("Save Error", f"Error saving file: {e}")
+        # Raw wordlists leave out the comment header, as on the command line
+        header = False
+        if not self.raw_var.get():
+            header = ("# Password Dictionary Generated from Personal Information\n"
+                      f"# Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                      f"# Total Passwords: {len(self.results)}\n"
+                      + "#" * 60 + "\n\n")
+        
+        # Write on the background writer so the window stays responsive
+        self.save_btn.config(state='disabled')
+        self.status_var.set("Saving passwords...")
+        self.export = self.exporter.submit(export_job(self.results, filename,
+                                                      SAVE_FORMATS[self.format_var.get()], header))
+        self.root.after(POLL_INTERVAL, self.poll_export, self.export)
+    
+    def poll_export(self, job):
+        """Apply the events a save job has reported since the last poll"""
+        if job is not self.export:
+            return
+        while True:
+            try:
+                kind, payload = job.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                self.status_var.set(f"Saving passwords... {payload['count']}/{payload['total']}")
+                continue
+            self.export = None
+            self.save_btn.config(state='normal')
+            if kind == 'done':
+                filename = payload['files'][0]
+                self.status_var.set(f"Saved {payload['count']} passwords to {filename}")
+                messagebox.showinfo("Success", 
+                                  f"Passwords saved to:\n{os.path.abspath(filename)}")
+            elif kind == 'error':
+                self.status_var.set("Save failed")
+                messagebox.showerror("Save Error", f"Error saving file: {payload}")
+            else:
+                self.status_var.set("Save cancelled")
+            return
+        self.root.after(POLL_INTERVAL, self.poll_export, job)
     
     def browse_file(self):
         """Open file dialog to choose save location"""
         filename = filedialog.asksaveasfilename(
             defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+            filetypes=[("Text files", "*.txt"), ("Compressed files", "*.gz *.bz2 *.xz"),
+                       ("All files", "*.*")],
             initialfile=self.filename_var.get()
         )
         if filename:
@@ -633,19 +642,36 @@ class PasswordGeneratorGUI:
     
     def copy_to_clipboard(self):
         """Copy generated passwords to clipboard"""
-        if not self.generated_passwords:
+        if not self.results:
             messagebox.showwarning("No Passwords", 
                                  "No passwords to copy. Generate passwords first.")
             return
         
-        # Get first 100 passwords for clipboard
-        passwords_to_copy = "\n".join(self.generated_passwords[:100])
-        
+        # The store already holds the passwords as lines, so this is one decode
         self.root.clipboard_clear()
-        self.root.clipboard_append(passwords_to_copy)
+        self.root.clipboard_append(self.results.text())
         
-        self.status_var.set("Copied first 100 passwords to clipboard")
-        messagebox.showinfo("Copied", "First 100 passwords copied to clipboard!")
+        count = len(self.results)
+        self.status_var.set(f"Copied {count} passwords to clipboard")
+        messagebox.showinfo("Copied", f"All {count} passwords copied to clipboard!")
+    
+    def on_search_changed(self, *args):
+        """Filter the results shortly after typing pauses"""
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+        self._search_after = self.root.after(150, self.apply_filter)
+    
+    def apply_filter(self):
+        """Show only the passwords containing the search text"""
+        self._search_after = None
+        query = self.search_var.get()
+        self.results_view.set_filter(query, self.update_match_count if query else None)
+        if not query:
+            self.match_label.config(text="")
+    
+    def update_match_count(self, count, done):
+        """Show how many passwords match the filter so far"""
+        self.match_label.config(text=f"{count} matches" + ("" if done else "..."))
     
     def clear_fields(self):
         """Clear all input fields"""
@@ -654,7 +680,9 @@ class PasswordGeneratorGUI:
         self.city_var.set("")
         self.phone_var.set("")
         self.filename_var.set("generated_passwords.txt")
-        self.results_text.delete(1.0, tk.END)
+        self.results = ResultStore()
+        self.results_view.set_store(self.results)
+        self.search_var.set("")
         self.password_count_var.set("0 passwords generated")
         self.progress_var.set(0)
         self.status_var.set("Ready")
@@ -677,6 +705,7 @@ class PasswordGeneratorGUI:
 
 def main():
     """Main function to run the GUI"""
+    load_tkinter()
     root = tk.Tk()
     app = PasswordGeneratorGUI(root)
     root.mainloop()